@@ -0,0 +1,81 @@
+-- Archive of closed orders, partitioned by quarter
+--
+-- `Order`, OrderItem and Payment keep only recent and open orders, so
+-- day-to-day queries and order placement work on a small, hot set of rows.
+-- archive.py moves closed orders older than a few months into these
+-- tables, in the same transaction that deletes them from the live tables.
+--
+-- InnoDB cannot partition tables with foreign keys, so the live tables
+-- stay unpartitioned; the archive tables have none and are partitioned by
+-- RANGE COLUMNS(order_date), one partition per quarter (items and payments
+-- carry their order's date for this). Queries that filter on order_date
+-- read only the quarters they need, and a whole quarter can be exported
+-- and dropped at once. p_max stays empty: `archive.py roll` splits the new
+-- quarters off it before any rows arrive.
+--
+-- OrderHistory and PaymentHistory combine live and archived rows for
+-- reports over all history. OrderItemHistory does the same for items; it
+-- carries product_key, so Products.sql creates it once OrderItem has one.
+
+DROP VIEW IF EXISTS PaymentHistory;
+DROP VIEW IF EXISTS OrderHistory;
+
+CREATE TABLE OrderArchive (
+    order_id 		INT NOT NULL,
+    customer_id 	INT NOT NULL,
+    order_date 		DATETIME NOT NULL,
+    order_status 	VARCHAR(20) NOT NULL,
+    total_amount 	DECIMAL(8,2) NOT NULL,
+    PRIMARY KEY (order_id, order_date),
+    INDEX idx_order_archive_customer (customer_id)
+) ROW_FORMAT=COMPRESSED
+PARTITION BY RANGE COLUMNS (order_date) (
+    PARTITION p_max VALUES LESS THAN (MAXVALUE)
+);
+
+CREATE TABLE OrderItemArchive (
+    order_item_id 	INT NOT NULL,
+    order_id 		INT NOT NULL,
+    order_date 		DATETIME NOT NULL,
+    product_type 	VARCHAR(10) NOT NULL,
+    product_id 		INT NOT NULL,
+    product_key 	INT NULL,
+    quantity 		INT NOT NULL,
+    price_each 		DECIMAL(8,2) NOT NULL,
+    PRIMARY KEY (order_item_id, order_date),
+    INDEX idx_orderitem_archive_order (order_id)
+) ROW_FORMAT=COMPRESSED
+PARTITION BY RANGE COLUMNS (order_date) (
+    PARTITION p_max VALUES LESS THAN (MAXVALUE)
+);
+
+CREATE TABLE PaymentArchive (
+    payment_id 		INT NOT NULL,
+    order_id 		INT NOT NULL,
+    order_date 		DATETIME NOT NULL,
+    payment_date 	DATETIME NOT NULL,
+    payment_method 	VARCHAR(50) NOT NULL,
+    amount 			DECIMAL(8,2) NOT NULL,
+    PRIMARY KEY (payment_id, order_date),
+    INDEX idx_payment_archive_order (order_id),
+    INDEX idx_payment_archive_date (payment_date)
+) ROW_FORMAT=COMPRESSED
+PARTITION BY RANGE COLUMNS (order_date) (
+    PARTITION p_max VALUES LESS THAN (MAXVALUE)
+);
+
+CREATE VIEW OrderHistory AS
+SELECT order_id, customer_id, order_date, order_status, total_amount, FALSE AS archived
+FROM `Order`
+UNION ALL
+SELECT order_id, customer_id, order_date, order_status, total_amount, TRUE
+FROM OrderArchive;
+
+CREATE VIEW PaymentHistory AS
+SELECT p.payment_id, p.order_id, o.order_date, p.payment_date, p.payment_method,
+       p.amount, FALSE AS archived
+FROM Payment p
+JOIN `Order` o ON o.order_id = p.order_id
+UNION ALL
+SELECT payment_id, order_id, order_date, payment_date, payment_method, amount, TRUE
+FROM PaymentArchive;
@@ -46,6 +46,7 @@ order by totalspent desc
 
 -- Query 4: Combined Movie and Album Catalog
 -- Combines movies and music albums into a single sorted list
+-- (single-table version over Product: reports.py combined_catalog)
 select movie_id as id, title, 'Movie' as type
 from movie
 union
@@ -56,6 +57,8 @@ order by title
 
 -- Query 5: Date Range Generation
 -- Generates a series of dates from May 1st to May 10th, 2023
+-- (sales per day over a range: `sales_rollup.py report`, which reads the
+-- zero-filled DailySales rollup instead of generating the dates)
 with recursive
     daterange as (
         select date('2023-05-01') as report_date
@@ -1,197 +1,291 @@
+import argparse
+import datetime
+import sys
+
 import mysql.connector
 
+import bulk_load
+import db_pool
+import orders
+import query_metrics
+import render
+import sales_rollup
+import schema_setup
+
+# Views created by menu options 3-5 (and shown by 6-8), in menu order
+VIEWS = {
+    # Live orders only (archive.py moves closed ones out after a year); the
+    # lifetime totals are kept in CustomerOrderSummaryMaterialized
+    "CustomerOrderSummaryView": """
+CREATE OR REPLACE VIEW CustomerOrderSummaryView AS
+SELECT 
+    c.customer_id,
+    CONCAT(c.first_name, ' ', c.last_name) AS CustomerName,
+    COUNT(o.order_id) AS TotalOrders,
+    IFNULL(SUM(o.total_amount), 0) AS TotalSpent,
+    IFNULL(AVG(o.total_amount), 0) AS AvgOrderAmount
+FROM Customer c
+LEFT JOIN `Order` o ON o.customer_id = c.customer_id
+GROUP BY c.customer_id, c.first_name, c.last_name;
+""",
+    "MovieStockRanking": """
+CREATE OR REPLACE VIEW MovieStockRanking AS
+SELECT movie_id, title, stock_count,
+       RANK() OVER (ORDER BY stock_count DESC) AS StockRank
+FROM Movie;
+""",
+    # Set-based form of the original grouped IN-subquery over live orders
+    # (all history: reports.py high_value_customer_orders)
+    "HighValueCustomerOrders": """
+CREATE OR REPLACE VIEW HighValueCustomerOrders AS
+SELECT order_id, customer_id, order_date, total_amount
+FROM (
+    SELECT order_id, customer_id, order_date, total_amount,
+           SUM(total_amount) OVER (PARTITION BY customer_id) AS customer_total,
+           AVG(total_amount) OVER () AS average_amount
+    FROM `Order`
+) o
+WHERE customer_total > average_amount
+ORDER BY total_amount DESC;
+""",
+}
+
 
 def connect_db(use_database=True):
-    if use_database:
-        return mysql.connector.connect(
-            host="localhost",
-            user="",
-            password="",
-            database="MovieMusicStore",
-        )
-    else:
-        return mysql.connector.connect(
-            host="localhost",
-            user="",
-            password="",
-        )
+    """Check a connection out of the shared pool; close() returns it"""
+    return db_pool.get_pool(use_database, user="", password="").get_connection()
 
 
 def create_tables():
-    """Create all tables from the CreateTables.sql file"""
-    print("Creating database and tables...")
-    conn = connect_db(use_database=False)
-    cursor = conn.cursor()
-
-    # Drop the database if it exists
-    cursor.execute("DROP DATABASE IF EXISTS MovieMusicStore;")
+    """
+    Create the database, tables, views and procedures
 
-    # Read the CREATE TABLE SQL commands from file
-    with open("CreateTables.sql", "r") as file:
-        create_commands = file.read()
-
-    # Execute each command separately (split by semicolon)
-    for command in create_commands.split(";"):
-        if command.strip():
-            try:
-                cursor.execute(command + ";")
-            except mysql.connector.Error as err:
-                print(f"Warning: {err}")
-                # Continue anyway as some errors might be expected
-
-    conn.commit()
-    cursor.close()
-    conn.close()
+    Independent objects are created in parallel (see schema_setup); the
+    secondary indexes and change-log triggers follow populate_tables.
+    """
+    print("Creating database and tables...")
+    phases = schema_setup.setup(VIEWS.values(), fresh=True, post_load=False, user="", password="")
+    print(schema_setup.format_phases(phases))
     print("Database and tables created successfully!")
 
 
-def populate_tables():
+def populate_tables(path="PopulateTables.sql"):
     """Populate tables with sample data from PopulateTables.sql"""
     print("Populating tables with sample data...")
     conn = connect_db()
-    cursor = conn.cursor()
-
-    # Read the INSERT SQL commands from file
-    with open("PopulateTables.sql", "r") as file:
-        populate_commands = file.read()
 
-    # Execute each command separately (split by semicolon)
-    for command in populate_commands.split(";"):
-        if command.strip():
-            try:
-                cursor.execute(command + ";")
-            except mysql.connector.Error as err:
-                print(f"Error executing: {err}")
-                continue
-
-    conn.commit()
-    cursor.close()
+    # Consecutive INSERTs are batched into multi-row statements
+    stats = bulk_load.execute_script(
+        conn,
+        path,
+        on_error=lambda command, err: print(f"Error executing: {err}"),
+    )
     conn.close()
-    print("Tables populated successfully!")
+    print(
+        f"Tables populated successfully! {stats['rows']} rows in {stats['seconds']}s "
+        f"({stats['rows_per_second']} rows/s)"
+    )
 
+    # Indexes and triggers are built once over the loaded rows; objects that
+    # already exist unchanged are skipped
+    print("Creating indexes and triggers...")
+    phases = schema_setup.setup(VIEWS.values(), user="", password="")
+    print(schema_setup.format_phases(phases))
 
-def display_results(cursor):
-    columns = [i[0] for i in cursor.description]
-    rows = cursor.fetchall()
 
-    # Calculate appropriate column width based on content
-    col_width = max(15, max([len(str(col)) for col in columns]) + 2)
+def place_order():
+    """Place an order from cart items typed at the prompt"""
+    try:
+        customer_id = int(input("Customer ID: "))
+        print("Enter items as: MOVIE|ALBUM <id> <quantity> <price>; a blank line ends the cart")
+        items = []
+        while True:
+            fields = input("Item: ").split()
+            if not fields:
+                break
+            kind, product_id, quantity, price = fields
+            items.append(orders.CartItem(kind.upper(), int(product_id), int(quantity), price))
+        payment_method = input("Payment method (blank if unpaid): ").strip().upper() or None
+
+        with connect_db() as conn:
+            order_id = orders.place_order(conn, customer_id, items, payment_method)
+        print(f"Order {order_id} placed successfully!")
+    except (ValueError, orders.OutOfStock) as err:
+        print(f"Order not placed: {err}")
+    except mysql.connector.Error as err:
+        print(f"Database error: {err}")
 
-    # Create format string based on number of columns using indexes to avoid issues with curly braces
-    format_str = "".join(
-        ["{" + str(i) + ":<" + str(col_width) + "}" for i in range(len(columns))]
-    )
 
-    print("-" * (col_width * len(columns)))
-    print(format_str.format(*[str(col) for col in columns]))
-    print("-" * (col_width * len(columns)))
+def sales_dashboard(fmt="table"):
+    """Show daily sales between two dates from the rollup tables"""
+    try:
+        start = datetime.date.fromisoformat(input("From (YYYY-MM-DD): ").strip())
+        end = datetime.date.fromisoformat(input("To (YYYY-MM-DD): ").strip())
+        with connect_db() as conn:
+            try:
+                sales_rollup.refresh(conn)
+            except RuntimeError as err:
+                # Another session holds the refresh lock; its rollups are
+                # at most one refresh behind
+                print(f"Warning: {err}; showing the rollups as last refreshed")
+            cursor = conn.cursor()
+            sales_rollup.report(cursor, "day", start, end)
+            render.display_results(cursor, fmt)
+            cursor.close()
+    except ValueError as err:
+        print(f"Invalid date: {err}")
+    except mysql.connector.Error as err:
+        print(f"Database error: {err}")
 
-    for row in rows:
-        # Convert all values to string
-        str_row = [str(col) for col in row]
-        print(format_str.format(*str_row))
 
-    print("-" * (col_width * len(columns)))
+# Trigger-maintained counterparts of the views, shown by menu options 12 and 14
+MATERIALIZED_VIEWS = {
+    "12": "CustomerOrderSummaryMaterialized",
+    "14": "MovieStockRankingMaterialized",
+}
+
+# Menu options; the labels also name their statements in query_metrics
+MENU = {
+    "1": "Create Database Tables",
+    "2": "Populate Tables with Sample Data",
+    "3": "Create Customer Order Summary View",
+    "4": "Create Movie Stock Ranking View",
+    "5": "Create High Value Customer Orders View",
+    "6": "View Customer Order Summary",
+    "7": "View Movie Stock Ranking",
+    "8": "View High Value Customer Orders",
+    "9": "Exit",
+    "10": "Show Connection Pool Statistics",
+    "11": "Create Materialized Customer Order Summary",
+    "12": "View Materialized Customer Order Summary",
+    "13": "Show Query Metrics",
+    "14": "View Maintained Movie Stock Ranking",
+    "15": "Place Order",
+    "16": "Sales Dashboard",
+}
 
 
 def menu():
     print("\n=== Movie Music Store Menu ===")
-    print("1. Create Database Tables")
-    print("2. Populate Tables with Sample Data")
-    print("3. Create Customer Order Summary View")
-    print("4. Create Movie Stock Ranking View")
-    print("5. Create High Value Customer Orders View")
-    print("6. View Customer Order Summary")
-    print("7. View Movie Stock Ranking")
-    print("8. View High Value Customer Orders")
-    print("9. Exit")
+    for choice, label in MENU.items():
+        print(f"{choice}. {label}")
     return input("Enter your choice: ")
 
 
 def create_view(view_sql):
     """Create a view using the provided SQL"""
     try:
-        conn = connect_db()
-        cursor = conn.cursor()
+        with connect_db() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute(view_sql)
+            cursor.execute(view_sql)
 
-        conn.commit()
-        cursor.close()
-        conn.close()
+            conn.commit()
+            cursor.close()
         print("View created successfully!")
     except mysql.connector.Error as err:
         print(f"Database error: {err}")
 
 
-def main():
+def create_order_summary(path="CustomerOrderSummary.sql"):
+    """
+    Build the trigger-maintained CustomerOrderSummary table and its view
+
+    Orders inserted, updated or deleted afterwards keep the summary current,
+    so reading it costs one primary key join per customer.
+    """
+    print("Building materialized customer order summary...")
+    try:
+        with connect_db() as conn:
+            stats = bulk_load.execute_script(conn, path)
+        print(f"Summary built for {stats['rows']} customers ({stats['seconds']}s)")
+    except mysql.connector.Error as err:
+        print(f"Database error: {err}")
+
+
+def main(fmt="table"):
     while True:
         choice = menu()
-        if choice == "1":
-            create_tables()
-        elif choice == "2":
-            populate_tables()
-        elif choice == "3":
-            create_view("""
-CREATE OR REPLACE VIEW CustomerOrderSummaryView AS
-SELECT 
-    c.customer_id,
-    CONCAT(c.first_name, ' ', c.last_name) AS CustomerName,
-    (SELECT COUNT(*) FROM `Order` o WHERE o.customer_id = c.customer_id) AS TotalOrders,
-    (SELECT IFNULL(SUM(o.total_amount), 0) FROM `Order` o WHERE o.customer_id = c.customer_id) AS TotalSpent,
-    (SELECT IFNULL(AVG(o.total_amount), 0) FROM `Order` o WHERE o.customer_id = c.customer_id) AS AvgOrderAmount
-FROM Customer c;
-            """)
-        elif choice == "4":
-            create_view("""
-CREATE OR REPLACE VIEW MovieStockRanking AS
-SELECT movie_id, title, stock_count,
-       RANK() OVER (ORDER BY stock_count DESC) AS StockRank
-FROM Movie;
-            """)
-        elif choice == "5":
-            create_view("""
-CREATE OR REPLACE VIEW HighValueCustomerOrders AS
-SELECT 
-    o.order_id,
-    o.customer_id,
-    o.order_date,
-    o.total_amount
-FROM `Order` o
-WHERE o.customer_id IN (
-    SELECT c.customer_id
-    FROM Customer c
-    JOIN `Order` o2 ON c.customer_id = o2.customer_id
-    GROUP BY c.customer_id
-    HAVING SUM(o2.total_amount) > (SELECT AVG(total_amount) FROM `Order`)
-)
-ORDER BY o.total_amount DESC;
-            """)
-        elif choice in ["6", "7", "8"]:
-            try:
-                conn = connect_db()
-                cursor = conn.cursor()
-
-                if choice == "6":
-                    query = "SELECT * FROM CustomerOrderSummaryView;"
-                elif choice == "7":
-                    query = "SELECT * FROM MovieStockRanking;"
-                elif choice == "8":
-                    query = "SELECT * FROM HighValueCustomerOrders;"
-
-                cursor.execute(query)
-                display_results(cursor)
-
-                cursor.close()
-                conn.close()
-            except mysql.connector.Error as err:
-                print(f"Database error: {err}")
-        elif choice == "9":
-            print("Exiting...")
-            break
-        else:
-            print("Invalid choice, please try again.")
+        # Statements are reported under the menu option that ran them
+        with query_metrics.screen(MENU.get(choice, "Invalid choice")):
+            if choice == "1":
+                create_tables()
+            elif choice == "2":
+                populate_tables()
+            elif choice in ["3", "4", "5"]:
+                create_view(list(VIEWS.values())[int(choice) - 3])
+            elif choice in ["6", "7", "8"]:
+                try:
+                    with connect_db() as conn:
+                        cursor = conn.cursor()
+
+                        view = list(VIEWS)[int(choice) - 6]
+                        query = f"SELECT * FROM {view};"
+
+                        cursor.execute(query)
+                        render.display_results(cursor, fmt)
+
+                        cursor.close()
+                except mysql.connector.Error as err:
+                    print(f"Database error: {err}")
+            elif choice == "9":
+                print("Exiting...")
+                db_pool.close_all()
+                break
+            elif choice == "10":
+                print(db_pool.format_stats())
+            elif choice == "11":
+                create_order_summary()
+            elif choice in MATERIALIZED_VIEWS:
+                try:
+                    with connect_db() as conn:
+                        cursor = conn.cursor()
+                        view = MATERIALIZED_VIEWS[choice]
+                        cursor.execute(f"SELECT * FROM {view};")
+                        render.display_results(cursor, fmt)
+                        cursor.close()
+                except mysql.connector.Error as err:
+                    print(f"Database error: {err}")
+            elif choice == "13":
+                print(query_metrics.format_snapshot())
+            elif choice == "15":
+                place_order()
+            elif choice == "16":
+                sales_dashboard(fmt)
+            else:
+                print("Invalid choice, please try again.")
+
+
+def dump_view(view, fmt):
+    """Stream one view to stdout without the menu, e.g. for piping"""
+    with connect_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT * FROM {view};")
+        render.display_results(cursor, fmt)
+        cursor.close()
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Movie Music Store database menu")
+    parser.add_argument("--format", choices=render.FORMATS, default="table",
+                        help="Output format for view results")
+    parser.add_argument("--view", choices=list(VIEWS) + list(MATERIALIZED_VIEWS.values()),
+                        help="Print this view and exit instead of showing the menu")
+    parser.add_argument("--slow-ms", type=float, default=query_metrics.SLOW_QUERY_MS,
+                        help="Log statements at least this slow (milliseconds)")
+    parser.add_argument("--slow-log", default=query_metrics.SLOW_LOG_PATH,
+                        help="Slow-query log file ('-' for stderr)")
+    parser.add_argument("--metrics", choices=["text", "json"],
+                        help="Print query metrics to stderr on exit")
+    args = parser.parse_args()
+    query_metrics.configure(args.slow_ms, args.slow_log)
+    if args.view:
+        with query_metrics.screen(f"--view {args.view}"):
+            dump_view(args.view, args.format)
+        db_pool.close_all()
+    else:
+        main(args.format)
+    if args.metrics == "json":
+        print(query_metrics.to_json(), file=sys.stderr)
+    elif args.metrics == "text":
+        print(query_metrics.format_snapshot(), file=sys.stderr)
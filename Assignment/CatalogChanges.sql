@@ -0,0 +1,63 @@
+-- Change log for the GUI catalog cache
+--
+-- Every insert, update or delete of a movie or album (including changes to
+-- its artists) appends the affected primary key to CatalogChange. Clients
+-- holding the catalog in memory poll for change ids they have not applied
+-- yet and re-read only the rows logged there. Safe to re-run.
+--
+-- Cascaded foreign key deletes do not fire triggers, so artist deletes
+-- log the albums they are about to unlink themselves.
+
+DROP TRIGGER IF EXISTS trg_catalog_movie_insert;
+DROP TRIGGER IF EXISTS trg_catalog_movie_update;
+DROP TRIGGER IF EXISTS trg_catalog_movie_delete;
+DROP TRIGGER IF EXISTS trg_catalog_album_insert;
+DROP TRIGGER IF EXISTS trg_catalog_album_update;
+DROP TRIGGER IF EXISTS trg_catalog_album_delete;
+DROP TRIGGER IF EXISTS trg_catalog_album_artist_insert;
+DROP TRIGGER IF EXISTS trg_catalog_album_artist_delete;
+DROP TRIGGER IF EXISTS trg_catalog_artist_update;
+DROP TRIGGER IF EXISTS trg_catalog_artist_delete;
+DROP TABLE IF EXISTS CatalogChange;
+
+CREATE TABLE CatalogChange (
+    change_id 		BIGINT AUTO_INCREMENT PRIMARY KEY,
+    table_name 		VARCHAR(20) NOT NULL,
+    row_id 			INT NOT NULL,
+    changed_at 		TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_catalogchange_changed (changed_at)
+);
+
+CREATE TRIGGER trg_catalog_movie_insert AFTER INSERT ON Movie
+FOR EACH ROW INSERT INTO CatalogChange (table_name, row_id) VALUES ('Movie', NEW.movie_id);
+
+CREATE TRIGGER trg_catalog_movie_update AFTER UPDATE ON Movie
+FOR EACH ROW INSERT INTO CatalogChange (table_name, row_id) VALUES ('Movie', NEW.movie_id);
+
+CREATE TRIGGER trg_catalog_movie_delete AFTER DELETE ON Movie
+FOR EACH ROW INSERT INTO CatalogChange (table_name, row_id) VALUES ('Movie', OLD.movie_id);
+
+CREATE TRIGGER trg_catalog_album_insert AFTER INSERT ON MusicAlbum
+FOR EACH ROW INSERT INTO CatalogChange (table_name, row_id) VALUES ('MusicAlbum', NEW.album_id);
+
+CREATE TRIGGER trg_catalog_album_update AFTER UPDATE ON MusicAlbum
+FOR EACH ROW INSERT INTO CatalogChange (table_name, row_id) VALUES ('MusicAlbum', NEW.album_id);
+
+CREATE TRIGGER trg_catalog_album_delete AFTER DELETE ON MusicAlbum
+FOR EACH ROW INSERT INTO CatalogChange (table_name, row_id) VALUES ('MusicAlbum', OLD.album_id);
+
+CREATE TRIGGER trg_catalog_album_artist_insert AFTER INSERT ON Album_Artist
+FOR EACH ROW INSERT INTO CatalogChange (table_name, row_id) VALUES ('MusicAlbum', NEW.album_id);
+
+CREATE TRIGGER trg_catalog_album_artist_delete AFTER DELETE ON Album_Artist
+FOR EACH ROW INSERT INTO CatalogChange (table_name, row_id) VALUES ('MusicAlbum', OLD.album_id);
+
+CREATE TRIGGER trg_catalog_artist_update AFTER UPDATE ON Artist
+FOR EACH ROW
+    INSERT INTO CatalogChange (table_name, row_id)
+    SELECT 'MusicAlbum', album_id FROM Album_Artist WHERE artist_id = NEW.artist_id;
+
+CREATE TRIGGER trg_catalog_artist_delete BEFORE DELETE ON Artist
+FOR EACH ROW
+    INSERT INTO CatalogChange (table_name, row_id)
+    SELECT 'MusicAlbum', album_id FROM Album_Artist WHERE artist_id = OLD.artist_id;
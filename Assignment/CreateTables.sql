@@ -65,7 +65,8 @@ CREATE TABLE Movie (
     rating 			VARCHAR(10),
     genre 			VARCHAR(50),
     runtime_minutes INT NOT NULL,
-    stock_count 	INT NOT NULL DEFAULT 0
+    stock_count 	INT NOT NULL DEFAULT 0,
+    FULLTEXT INDEX ft_movie_title (title)
 ); 
 
 -- 6. ACTOR
@@ -100,7 +101,8 @@ CREATE TABLE MusicAlbum (
     title 			VARCHAR(150) NOT NULL,
     release_date 	DATE,
     genre 			VARCHAR(50),
-    stock_count 	INT NOT NULL DEFAULT 0
+    stock_count 	INT NOT NULL DEFAULT 0,
+    FULLTEXT INDEX ft_album_title (title)
 ); 
 
 -- 9. ARTIST
@@ -109,7 +111,8 @@ CREATE TABLE Artist (
     artist_name 	VARCHAR(100) NOT NULL,
     start_year 		YEAR,
     end_year 		YEAR,
-    active_status 	VARCHAR(20) NOT NULL DEFAULT 'ACTIVE'
+    active_status 	VARCHAR(20) NOT NULL DEFAULT 'ACTIVE',
+    FULLTEXT INDEX ft_artist_name (artist_name)
 ); 
 
 -- 10. ALBUM_ARTIST (Associative Entity for MusicAlbum <-> Artist M:N)
@@ -0,0 +1,95 @@
+-- Materialized customer order summary
+--
+-- One row per customer holding their order count and total, kept current
+-- by triggers on Customer and `Order`, so reading the summary never
+-- re-aggregates the Order table. Run against an existing MovieMusicStore
+-- database; the script can be re-run to rebuild the table from scratch.
+-- Archived orders (Archive.sql) still count: archive.py sets
+-- @archiving_orders while it moves them, which the delete trigger skips.
+
+DROP TRIGGER IF EXISTS trg_customer_summary_insert;
+DROP TRIGGER IF EXISTS trg_order_summary_insert;
+DROP TRIGGER IF EXISTS trg_order_summary_update;
+DROP TRIGGER IF EXISTS trg_order_summary_delete;
+DROP VIEW IF EXISTS CustomerOrderSummaryMaterialized;
+DROP TABLE IF EXISTS CustomerOrderSummary;
+
+CREATE TABLE CustomerOrderSummary (
+    customer_id 	INT PRIMARY KEY,
+    total_orders 	INT NOT NULL DEFAULT 0,
+    total_spent 	DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+    CONSTRAINT fk_summary_customer
+        FOREIGN KEY (customer_id)
+        REFERENCES Customer(customer_id)
+        ON DELETE CASCADE
+        ON UPDATE CASCADE
+);
+
+INSERT INTO CustomerOrderSummary (customer_id, total_orders, total_spent)
+SELECT c.customer_id, COUNT(o.order_id), IFNULL(SUM(o.total_amount), 0)
+FROM Customer c
+LEFT JOIN OrderHistory o ON o.customer_id = c.customer_id
+GROUP BY c.customer_id;
+
+DELIMITER //
+
+CREATE TRIGGER trg_customer_summary_insert
+AFTER INSERT ON Customer
+FOR EACH ROW
+BEGIN
+    INSERT IGNORE INTO CustomerOrderSummary (customer_id) VALUES (NEW.customer_id);
+END //
+
+CREATE TRIGGER trg_order_summary_insert
+AFTER INSERT ON `Order`
+FOR EACH ROW
+BEGIN
+    INSERT INTO CustomerOrderSummary (customer_id, total_orders, total_spent)
+    VALUES (NEW.customer_id, 1, NEW.total_amount)
+    ON DUPLICATE KEY UPDATE
+        total_orders = total_orders + 1,
+        total_spent = total_spent + NEW.total_amount;
+END //
+
+CREATE TRIGGER trg_order_summary_update
+AFTER UPDATE ON `Order`
+FOR EACH ROW
+BEGIN
+    IF NEW.customer_id <> OLD.customer_id OR NEW.total_amount <> OLD.total_amount THEN
+        UPDATE CustomerOrderSummary
+        SET total_orders = total_orders - 1,
+            total_spent = total_spent - OLD.total_amount
+        WHERE customer_id = OLD.customer_id;
+
+        INSERT INTO CustomerOrderSummary (customer_id, total_orders, total_spent)
+        VALUES (NEW.customer_id, 1, NEW.total_amount)
+        ON DUPLICATE KEY UPDATE
+            total_orders = total_orders + 1,
+            total_spent = total_spent + NEW.total_amount;
+    END IF;
+END //
+
+CREATE TRIGGER trg_order_summary_delete
+AFTER DELETE ON `Order`
+FOR EACH ROW
+BEGIN
+    IF @archiving_orders IS NULL THEN
+        UPDATE CustomerOrderSummary
+        SET total_orders = total_orders - 1,
+            total_spent = total_spent - OLD.total_amount
+        WHERE customer_id = OLD.customer_id;
+    END IF;
+END //
+
+DELIMITER ;
+
+-- Same columns as CustomerOrderSummaryView, read by primary key joins only
+CREATE VIEW CustomerOrderSummaryMaterialized AS
+SELECT
+    c.customer_id,
+    CONCAT(c.first_name, ' ', c.last_name) AS CustomerName,
+    s.total_orders AS TotalOrders,
+    s.total_spent AS TotalSpent,
+    IF(s.total_orders > 0, ROUND(s.total_spent / s.total_orders, 6), 0) AS AvgOrderAmount
+FROM Customer c
+JOIN CustomerOrderSummary s ON s.customer_id = c.customer_id;
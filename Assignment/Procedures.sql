@@ -0,0 +1,50 @@
+-- Stored procedures used by the GUI
+--
+-- Artists are looked up through the uq_artist_name index from
+-- AddIndexes.sql. Safe to re-run.
+
+DROP PROCEDURE IF EXISTS add_album;
+
+DELIMITER //
+
+-- Insert an album and link it to its artists in one call, creating any
+-- artist whose name is not known yet. p_artists is a comma separated list
+-- of names. Returns the new album_id as a one-row result.
+CREATE PROCEDURE add_album(
+    IN p_title 			VARCHAR(150),
+    IN p_genre 			VARCHAR(50),
+    IN p_release_date 	DATE,
+    IN p_stock_count 	INT,
+    IN p_artists 		TEXT
+)
+BEGIN
+    DECLARE v_album_id INT;
+    DECLARE v_rest TEXT DEFAULT p_artists;
+    DECLARE v_name VARCHAR(100);
+    DECLARE v_artist_id INT;
+
+    INSERT INTO MusicAlbum (title, genre, release_date, stock_count)
+    VALUES (p_title, p_genre, p_release_date, IFNULL(p_stock_count, 0));
+    SET v_album_id = LAST_INSERT_ID();
+
+    WHILE v_rest IS NOT NULL AND v_rest <> '' DO
+        SET v_name = TRIM(SUBSTRING_INDEX(v_rest, ',', 1));
+        SET v_rest = IF(LOCATE(',', v_rest) > 0, SUBSTRING(v_rest, LOCATE(',', v_rest) + 1), '');
+
+        IF v_name <> '' THEN
+            SET v_artist_id = NULL;
+            SELECT MIN(artist_id) INTO v_artist_id FROM Artist WHERE artist_name = v_name;
+            IF v_artist_id IS NULL THEN
+                INSERT INTO Artist (artist_name, active_status) VALUES (v_name, 'ACTIVE');
+                SET v_artist_id = LAST_INSERT_ID();
+            END IF;
+
+            INSERT IGNORE INTO Album_Artist (album_id, artist_id)
+            VALUES (v_album_id, v_artist_id);
+        END IF;
+    END WHILE;
+
+    SELECT v_album_id AS album_id;
+END //
+
+DELIMITER ;
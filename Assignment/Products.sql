@@ -0,0 +1,172 @@
+-- Unified product registry for OrderItem
+--
+-- OrderItem names its product with a type ('MOVIE'/'ALBUM') and an id into
+-- Movie or MusicAlbum, so every sales report needed two conditional joins
+-- and the combined catalog a UNION. Product gives each movie and album a
+-- surrogate product_key and keeps its title, and OrderItem.product_key
+-- points at it, so reports resolve titles in one primary key join.
+--
+-- Triggers keep Product current: catalog inserts add a product, title
+-- changes are copied, and deletes only clear in_catalog so past sales keep
+-- their title. OrderItem rows get their product_key on insert, so writers
+-- keep using product_type/product_id. Existing rows (live and archived)
+-- are migrated here; schema_setup applies the script once after the data
+-- is loaded.
+--
+-- OrderItemHistory (live and archived items, see Archive.sql) is created
+-- here with product_key, so sales reports over all history group by the
+-- key and resolve titles through the Product primary key.
+
+DROP TRIGGER IF EXISTS trg_product_movie_insert;
+DROP TRIGGER IF EXISTS trg_product_movie_update;
+DROP TRIGGER IF EXISTS trg_product_movie_delete;
+DROP TRIGGER IF EXISTS trg_product_album_insert;
+DROP TRIGGER IF EXISTS trg_product_album_update;
+DROP TRIGGER IF EXISTS trg_product_album_delete;
+DROP TRIGGER IF EXISTS trg_orderitem_product_insert;
+DROP TRIGGER IF EXISTS trg_orderitem_product_update;
+DROP VIEW IF EXISTS OrderItemHistory;
+
+CREATE TABLE Product (
+    product_key 	INT AUTO_INCREMENT PRIMARY KEY,
+    product_type 	VARCHAR(10) NOT NULL,
+    item_id 		INT NOT NULL,
+    title 			VARCHAR(150),
+    in_catalog 		BOOLEAN NOT NULL DEFAULT TRUE,
+    UNIQUE KEY uq_product_item (product_type, item_id),
+    INDEX idx_product_catalog_title (in_catalog, title)
+);
+
+-- Migration: every catalog item, then products only known from old orders
+INSERT INTO Product (product_type, item_id, title)
+SELECT 'MOVIE', movie_id, title FROM Movie
+UNION ALL
+SELECT 'ALBUM', album_id, title FROM MusicAlbum;
+
+INSERT INTO Product (product_type, item_id, in_catalog)
+SELECT oi.product_type, oi.product_id, FALSE
+FROM (
+    SELECT product_type, product_id FROM OrderItem
+    UNION
+    SELECT product_type, product_id FROM OrderItemArchive
+) oi
+LEFT JOIN Product p ON p.product_type = oi.product_type AND p.item_id = oi.product_id
+WHERE p.product_key IS NULL;
+
+ALTER TABLE OrderItem ADD COLUMN product_key INT NULL AFTER product_id;
+
+UPDATE OrderItem oi
+JOIN Product p ON p.product_type = oi.product_type AND p.item_id = oi.product_id
+SET oi.product_key = p.product_key;
+
+UPDATE OrderItemArchive oi
+JOIN Product p ON p.product_type = oi.product_type AND p.item_id = oi.product_id
+SET oi.product_key = p.product_key
+WHERE oi.product_key IS NULL;
+
+-- Sales per product straight from the index (also serves the foreign key)
+CREATE INDEX idx_orderitem_product_key ON OrderItem (product_key, quantity, price_each);
+
+ALTER TABLE OrderItem
+    ADD CONSTRAINT fk_orderitem_product
+    FOREIGN KEY (product_key) REFERENCES Product(product_key);
+
+CREATE VIEW OrderItemHistory AS
+SELECT oi.order_item_id, oi.order_id, o.order_date, oi.product_type, oi.product_id,
+       oi.product_key, oi.quantity, oi.price_each, FALSE AS archived
+FROM OrderItem oi
+JOIN `Order` o ON o.order_id = oi.order_id
+UNION ALL
+SELECT order_item_id, order_id, order_date, product_type, product_id,
+       product_key, quantity, price_each, TRUE
+FROM OrderItemArchive;
+
+DELIMITER //
+
+CREATE TRIGGER trg_product_movie_insert
+AFTER INSERT ON Movie
+FOR EACH ROW
+BEGIN
+    INSERT INTO Product (product_type, item_id, title)
+    VALUES ('MOVIE', NEW.movie_id, NEW.title)
+    ON DUPLICATE KEY UPDATE title = NEW.title, in_catalog = TRUE;
+END //
+
+CREATE TRIGGER trg_product_movie_update
+AFTER UPDATE ON Movie
+FOR EACH ROW
+BEGIN
+    IF NOT (NEW.title <=> OLD.title) THEN
+        UPDATE Product SET title = NEW.title
+        WHERE product_type = 'MOVIE' AND item_id = NEW.movie_id;
+    END IF;
+END //
+
+CREATE TRIGGER trg_product_movie_delete
+AFTER DELETE ON Movie
+FOR EACH ROW
+BEGIN
+    UPDATE Product SET in_catalog = FALSE
+    WHERE product_type = 'MOVIE' AND item_id = OLD.movie_id;
+END //
+
+CREATE TRIGGER trg_product_album_insert
+AFTER INSERT ON MusicAlbum
+FOR EACH ROW
+BEGIN
+    INSERT INTO Product (product_type, item_id, title)
+    VALUES ('ALBUM', NEW.album_id, NEW.title)
+    ON DUPLICATE KEY UPDATE title = NEW.title, in_catalog = TRUE;
+END //
+
+CREATE TRIGGER trg_product_album_update
+AFTER UPDATE ON MusicAlbum
+FOR EACH ROW
+BEGIN
+    IF NOT (NEW.title <=> OLD.title) THEN
+        UPDATE Product SET title = NEW.title
+        WHERE product_type = 'ALBUM' AND item_id = NEW.album_id;
+    END IF;
+END //
+
+CREATE TRIGGER trg_product_album_delete
+AFTER DELETE ON MusicAlbum
+FOR EACH ROW
+BEGIN
+    UPDATE Product SET in_catalog = FALSE
+    WHERE product_type = 'ALBUM' AND item_id = OLD.album_id;
+END //
+
+CREATE TRIGGER trg_orderitem_product_insert
+BEFORE INSERT ON OrderItem
+FOR EACH ROW
+BEGIN
+    SET NEW.product_key = (
+        SELECT product_key FROM Product
+        WHERE product_type = NEW.product_type AND item_id = NEW.product_id
+    );
+    IF NEW.product_key IS NULL THEN
+        INSERT INTO Product (product_type, item_id, in_catalog)
+        VALUES (NEW.product_type, NEW.product_id, FALSE);
+        SET NEW.product_key = LAST_INSERT_ID();
+    END IF;
+END //
+
+CREATE TRIGGER trg_orderitem_product_update
+BEFORE UPDATE ON OrderItem
+FOR EACH ROW
+BEGIN
+    IF NEW.product_type <> OLD.product_type OR NEW.product_id <> OLD.product_id THEN
+        SET NEW.product_key = (
+            SELECT product_key FROM Product
+            WHERE product_type = NEW.product_type AND item_id = NEW.product_id
+        );
+        IF NEW.product_key IS NULL THEN
+            INSERT INTO Product (product_type, item_id, in_catalog)
+            VALUES (NEW.product_type, NEW.product_id, FALSE);
+            SET NEW.product_key = LAST_INSERT_ID();
+        END IF;
+    END IF;
+END //
+
+DELIMITER ;
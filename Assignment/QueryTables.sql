@@ -1,7 +1,12 @@
 use moviemusicstore
 ;
 
--- Query 1: List all customers with their orders (using JOIN)
+-- The order queries read live orders only: archive.py moves closed orders
+-- older than a year out of `Order`, and scanning the compressed archive is
+-- left to the reports over all history (reports.py, on OrderHistory with an
+-- order_date range)
+
+-- Query 1: List all customers with their orders (using JOIN; live orders)
 select
     c.customer_id,
     concat(c.first_name, ' ', c.last_name) as customername,
@@ -19,7 +24,7 @@ from movie
 where runtime_minutes > (select avg(runtime_minutes) from movie)
 ;
 
--- Query 3: Subquery to list customers who have placed orders
+-- Query 3: Subquery to list customers who have placed orders (live orders)
 select customer_id, first_name, last_name
 from customer
 where customer_id in (select distinct customer_id from `Order`)
@@ -27,6 +32,8 @@ where customer_id in (select distinct customer_id from `Order`)
 
 -- Query 4: Correlated subquery: Find orders whose total amount is greater than 
 -- the average order amount for that customer
+-- (live orders; set-based version over all history:
+-- reports.py orders_above_customer_average)
 select o.order_id, o.customer_id, o.total_amount
 from `Order` o
 where
@@ -41,6 +48,7 @@ from movie
 ;
 
 -- Query 6: Window function: List orders with row number partitioned by customer
+-- (live orders)
 select
     order_id,
     customer_id,
@@ -51,7 +59,7 @@ order by customer_id, order_date
 ;
 
 -- Query 7: Window function: Divide orders into 3 groups based on total_amount using
--- NTILE
+-- NTILE (live orders)
 select
     order_id,
     customer_id,
@@ -62,6 +70,7 @@ order by total_amount desc
 ;
 
 -- Query 8: Aggregation: Count number of orders per customer and sum total spent
+-- (live orders)
 select customer_id, count(order_id) as ordercount, sum(total_amount) as totalspent
 from `Order`
 group by customer_id
@@ -69,12 +78,15 @@ order by ordercount desc
 ;
 
 -- Query 9: Subquery: List customers who have not placed any orders
+-- (no live orders; anti-join version over all history:
+-- reports.py customers_without_orders)
 select customer_id, first_name, last_name
 from customer
 where customer_id not in (select customer_id from `Order`)
 ;
 
 -- Query 10: Correlated subquery: List actors who have acted in more than 1 movie
+-- (pre-aggregated version: reports.py actors_in_several_movies)
 select
     a.actor_id,
     concat(a.first_name, ' ', a.last_name) as actorname,
@@ -84,7 +96,7 @@ where (select count(*) from movie_actor ma where ma.actor_id = a.actor_id) > 1
 ;
 
 -- View 1: Customer Order Summary View with calculated fields (total orders and total
--- spent)
+-- spent; live orders)
 CREATE OR REPLACE VIEW CustomerOrderSummary AS
 SELECT 
     c.customer_id,
@@ -0,0 +1,146 @@
+-- Daily sales rollups
+--
+-- DailySales (one row per calendar day), DailyCustomerSales and
+-- DailyProductTypeSales hold pre-aggregated revenue, order counts and
+-- items sold, so date-range reports read one row per day instead of
+-- scanning `Order`. The rows are computed by sales_rollup.py: triggers
+-- only append the days touched by order, item and payment writes to
+-- SalesRollupChange, so placing orders never waits on a shared rollup row,
+-- and sales_rollup.refresh() recomputes just those days.
+--
+-- Every day with orders or payments is logged here, so the first refresh
+-- (or `sales_rollup.py backfill`, which does it in parallel) fills in the
+-- history.
+
+DROP TRIGGER IF EXISTS trg_rollup_order_insert;
+DROP TRIGGER IF EXISTS trg_rollup_order_update;
+DROP TRIGGER IF EXISTS trg_rollup_order_delete;
+DROP TRIGGER IF EXISTS trg_rollup_item_insert;
+DROP TRIGGER IF EXISTS trg_rollup_item_update;
+DROP TRIGGER IF EXISTS trg_rollup_item_delete;
+DROP TRIGGER IF EXISTS trg_rollup_payment_insert;
+DROP TRIGGER IF EXISTS trg_rollup_payment_update;
+DROP TRIGGER IF EXISTS trg_rollup_payment_delete;
+DROP TABLE IF EXISTS SalesRollupChange;
+DROP TABLE IF EXISTS DailyProductTypeSales;
+DROP TABLE IF EXISTS DailyCustomerSales;
+DROP TABLE IF EXISTS DailySales;
+
+CREATE TABLE DailySales (
+    sales_date 		DATE PRIMARY KEY,
+    orders 			INT NOT NULL DEFAULT 0,
+    revenue 		DECIMAL(14,2) NOT NULL DEFAULT 0.00,
+    items 			INT NOT NULL DEFAULT 0,
+    paid 			DECIMAL(14,2) NOT NULL DEFAULT 0.00
+);
+
+CREATE TABLE DailyCustomerSales (
+    customer_id 	INT NOT NULL,
+    sales_date 		DATE NOT NULL,
+    orders 			INT NOT NULL,
+    revenue 		DECIMAL(14,2) NOT NULL,
+    PRIMARY KEY (customer_id, sales_date),
+    INDEX idx_customer_sales_date (sales_date)
+);
+
+CREATE TABLE DailyProductTypeSales (
+    sales_date 		DATE NOT NULL,
+    product_type 	VARCHAR(10) NOT NULL,
+    items 			INT NOT NULL,
+    revenue 		DECIMAL(14,2) NOT NULL,
+    PRIMARY KEY (sales_date, product_type)
+);
+
+CREATE TABLE SalesRollupChange (
+    change_id 		BIGINT AUTO_INCREMENT PRIMARY KEY,
+    sales_date 		DATE NOT NULL
+);
+
+-- Orders and payments of a day range, for recomputing it
+CREATE INDEX idx_order_date ON `Order` (order_date);
+CREATE INDEX idx_payment_date ON Payment (payment_date);
+
+INSERT INTO SalesRollupChange (sales_date)
+SELECT DATE(order_date) FROM `Order` GROUP BY DATE(order_date)
+UNION
+SELECT DATE(payment_date) FROM Payment GROUP BY DATE(payment_date);
+
+DELIMITER //
+
+CREATE TRIGGER trg_rollup_order_insert
+AFTER INSERT ON `Order`
+FOR EACH ROW
+BEGIN
+    INSERT INTO SalesRollupChange (sales_date) VALUES (DATE(NEW.order_date));
+END //
+
+CREATE TRIGGER trg_rollup_order_update
+AFTER UPDATE ON `Order`
+FOR EACH ROW
+BEGIN
+    IF NEW.order_date <> OLD.order_date OR NEW.customer_id <> OLD.customer_id
+        OR NEW.total_amount <> OLD.total_amount THEN
+        INSERT INTO SalesRollupChange (sales_date) VALUES (DATE(OLD.order_date));
+        IF DATE(NEW.order_date) <> DATE(OLD.order_date) THEN
+            INSERT INTO SalesRollupChange (sales_date) VALUES (DATE(NEW.order_date));
+        END IF;
+    END IF;
+END //
+
+-- Also covers the items removed with the order (cascades fire no triggers)
+CREATE TRIGGER trg_rollup_order_delete
+AFTER DELETE ON `Order`
+FOR EACH ROW
+BEGIN
+    INSERT INTO SalesRollupChange (sales_date) VALUES (DATE(OLD.order_date));
+END //
+
+CREATE TRIGGER trg_rollup_item_insert
+AFTER INSERT ON OrderItem
+FOR EACH ROW
+BEGIN
+    INSERT INTO SalesRollupChange (sales_date)
+    SELECT DATE(order_date) FROM `Order` WHERE order_id = NEW.order_id;
+END //
+
+CREATE TRIGGER trg_rollup_item_update
+AFTER UPDATE ON OrderItem
+FOR EACH ROW
+BEGIN
+    INSERT INTO SalesRollupChange (sales_date)
+    SELECT DATE(order_date) FROM `Order` WHERE order_id IN (OLD.order_id, NEW.order_id);
+END //
+
+CREATE TRIGGER trg_rollup_item_delete
+AFTER DELETE ON OrderItem
+FOR EACH ROW
+BEGIN
+    INSERT INTO SalesRollupChange (sales_date)
+    SELECT DATE(order_date) FROM `Order` WHERE order_id = OLD.order_id;
+END //
+
+CREATE TRIGGER trg_rollup_payment_insert
+AFTER INSERT ON Payment
+FOR EACH ROW
+BEGIN
+    INSERT INTO SalesRollupChange (sales_date) VALUES (DATE(NEW.payment_date));
+END //
+
+CREATE TRIGGER trg_rollup_payment_update
+AFTER UPDATE ON Payment
+FOR EACH ROW
+BEGIN
+    INSERT INTO SalesRollupChange (sales_date) VALUES (DATE(OLD.payment_date));
+    IF DATE(NEW.payment_date) <> DATE(OLD.payment_date) THEN
+        INSERT INTO SalesRollupChange (sales_date) VALUES (DATE(NEW.payment_date));
+    END IF;
+END //
+
+CREATE TRIGGER trg_rollup_payment_delete
+AFTER DELETE ON Payment
+FOR EACH ROW
+BEGIN
+    INSERT INTO SalesRollupChange (sales_date) VALUES (DATE(OLD.payment_date));
+END //
+
+DELIMITER ;
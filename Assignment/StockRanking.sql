@@ -0,0 +1,80 @@
+-- Maintained movie stock ranking
+--
+-- StockLevel holds how many movies have each stock count, kept current by
+-- triggers on Movie. A movie's RANK() by stock_count DESC is one more than
+-- the number of movies with more stock, so ranks are read from the (few)
+-- stock levels instead of sorting the Movie table on every query:
+--
+--   rank of a movie       sum of the levels above its stock count
+--   top N                 idx_movie_stock read backwards, LIMIT N
+--   ranks A to B          the levels whose rank falls in [A, B], then
+--                         idx_movie_stock lookups for those levels
+--
+-- The script can be re-run to rebuild the table from scratch.
+
+DROP TRIGGER IF EXISTS trg_stock_level_insert;
+DROP TRIGGER IF EXISTS trg_stock_level_update;
+DROP TRIGGER IF EXISTS trg_stock_level_delete;
+DROP VIEW IF EXISTS MovieStockRankingMaterialized;
+DROP VIEW IF EXISTS StockLevelRank;
+DROP TABLE IF EXISTS StockLevel;
+
+CREATE TABLE StockLevel (
+    stock_count 	INT PRIMARY KEY,
+    movies 			INT NOT NULL DEFAULT 0
+);
+
+INSERT INTO StockLevel (stock_count, movies)
+SELECT stock_count, COUNT(*)
+FROM Movie
+GROUP BY stock_count;
+
+DELIMITER //
+
+CREATE TRIGGER trg_stock_level_insert
+AFTER INSERT ON Movie
+FOR EACH ROW
+BEGIN
+    INSERT INTO StockLevel (stock_count, movies)
+    VALUES (NEW.stock_count, 1)
+    ON DUPLICATE KEY UPDATE movies = movies + 1;
+END //
+
+CREATE TRIGGER trg_stock_level_update
+AFTER UPDATE ON Movie
+FOR EACH ROW
+BEGIN
+    IF NEW.stock_count <> OLD.stock_count THEN
+        UPDATE StockLevel SET movies = movies - 1 WHERE stock_count = OLD.stock_count;
+        DELETE FROM StockLevel WHERE stock_count = OLD.stock_count AND movies = 0;
+
+        INSERT INTO StockLevel (stock_count, movies)
+        VALUES (NEW.stock_count, 1)
+        ON DUPLICATE KEY UPDATE movies = movies + 1;
+    END IF;
+END //
+
+CREATE TRIGGER trg_stock_level_delete
+AFTER DELETE ON Movie
+FOR EACH ROW
+BEGIN
+    UPDATE StockLevel SET movies = movies - 1 WHERE stock_count = OLD.stock_count;
+    DELETE FROM StockLevel WHERE stock_count = OLD.stock_count AND movies = 0;
+END //
+
+DELIMITER ;
+
+-- First and last rank of the movies at each stock level
+CREATE VIEW StockLevelRank AS
+SELECT
+    stock_count,
+    CAST(SUM(movies) OVER w - movies + 1 AS UNSIGNED) AS first_rank,
+    CAST(SUM(movies) OVER w AS UNSIGNED) AS last_rank
+FROM StockLevel
+WINDOW w AS (ORDER BY stock_count DESC);
+
+-- Same columns as MovieStockRanking
+CREATE VIEW MovieStockRankingMaterialized AS
+SELECT m.movie_id, m.title, m.stock_count, r.first_rank AS StockRank
+FROM Movie m
+JOIN StockLevelRank r ON r.stock_count = m.stock_count;
@@ -0,0 +1,286 @@
+"""
+Archival of closed orders into quarterly partitions
+
+Closed orders (CLOSED_STATUSES) older than a number of months are moved
+with their items and payments from the live tables into OrderArchive,
+OrderItemArchive and PaymentArchive (Archive.sql), a batch of orders per
+transaction. The archive tables are partitioned by quarter of order_date;
+roll_forward() adds the quarter partitions before rows arrive, and a
+quarter can be exported to CSV files and dropped in one step.
+
+Archived orders stay in the history views, the sales rollups and the
+materialized customer order summary; the Assignment6 views and the
+QueryTables.sql queries cover live orders only. Exported and dropped quarters leave the history
+views; the rollups keep them until they are backfilled.
+
+Usage:
+    python archive.py list
+    python archive.py roll [--ahead 1]
+    python archive.py archive [--months 12] [--batch 1000]
+    python archive.py export PARTITION DIRECTORY [--drop]
+"""
+
+import argparse
+import datetime
+import os
+import re
+import time
+
+import db_pool
+import render
+
+ARCHIVE_TABLES = ("OrderArchive", "OrderItemArchive", "PaymentArchive")
+CLOSED_STATUSES = ("COMPLETED", "CANCELLED")
+ARCHIVE_MONTHS = 12  # Closed orders older than this are archived
+ARCHIVE_BATCH = 1000  # Orders moved per transaction
+MAX_PARTITION = "p_max"
+_QUARTER = re.compile(r"^p(\d{4})q([1-4])$")
+
+# Copy the orders %(ids)s and their rows into the archive
+_COPY = (
+    """
+    INSERT INTO OrderArchive (order_id, customer_id, order_date, order_status, total_amount)
+    SELECT order_id, customer_id, order_date, order_status, total_amount
+    FROM `Order`
+    WHERE order_id IN ({ids})
+    """,
+    """
+    INSERT INTO OrderItemArchive (order_item_id, order_id, order_date, product_type,
+                                  product_id, product_key, quantity, price_each)
+    SELECT oi.order_item_id, oi.order_id, o.order_date, oi.product_type,
+           oi.product_id, oi.product_key, oi.quantity, oi.price_each
+    FROM OrderItem oi
+    JOIN `Order` o ON o.order_id = oi.order_id
+    WHERE oi.order_id IN ({ids})
+    """,
+    """
+    INSERT INTO PaymentArchive (payment_id, order_id, order_date, payment_date,
+                                payment_method, amount)
+    SELECT p.payment_id, p.order_id, o.order_date, p.payment_date,
+           p.payment_method, p.amount
+    FROM Payment p
+    JOIN `Order` o ON o.order_id = p.order_id
+    WHERE p.order_id IN ({ids})
+    """,
+)
+
+
+def quarter_start(day: datetime.date) -> datetime.date:
+    return datetime.date(day.year, (day.month - 1) // 3 * 3 + 1, 1)
+
+
+def next_quarter(day: datetime.date) -> datetime.date:
+    start = quarter_start(day)
+    if start.month == 10:
+        return datetime.date(start.year + 1, 1, 1)
+    return datetime.date(start.year, start.month + 3, 1)
+
+
+def partition_name(day: datetime.date) -> str:
+    """Name of the partition holding day, e.g. p2024q3"""
+    return f"p{day.year}q{(day.month - 1) // 3 + 1}"
+
+
+def months_ago(day: datetime.date, months: int) -> datetime.date:
+    """First day of the month months before day's month"""
+    index = day.year * 12 + day.month - 1 - months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partitions(cursor, table: str) -> list:
+    """(name, upper bound, approximate rows) of table's partitions, in order"""
+    cursor.execute(
+        """SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS
+           FROM information_schema.PARTITIONS
+           WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+           ORDER BY PARTITION_ORDINAL_POSITION""",
+        (table,),
+    )
+    return cursor.fetchall()
+
+
+def roll_forward(conn, through: datetime.date) -> list:
+    """
+    Add quarter partitions to the archive tables up to the one holding through
+
+    The first partition starts at the quarter of the oldest live order, so
+    it also holds anything older. New quarters are split off the empty
+    p_max partition, which moves no rows.
+
+    Returns:
+        (table, partition) pairs that were added
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT DATE(MIN(order_date)) FROM `Order`")
+    oldest = cursor.fetchone()[0] or through
+    added = []
+    try:
+        for table in ARCHIVE_TABLES:
+            quarters = [
+                _QUARTER.match(name) for name, _, _ in partitions(cursor, table)
+                if _QUARTER.match(name)
+            ]
+            if quarters:
+                year, quarter = map(int, quarters[-1].groups())
+                start = next_quarter(datetime.date(year, quarter * 3, 1))
+            else:
+                start = quarter_start(min(oldest, through))
+            new = []
+            while start <= through:
+                new.append(start)
+                start = next_quarter(start)
+            if not new:
+                continue
+            definitions = [
+                f"PARTITION {partition_name(day)} VALUES LESS THAN ('{next_quarter(day)}')"
+                for day in new
+            ]
+            cursor.execute(
+                f"ALTER TABLE {table} REORGANIZE PARTITION {MAX_PARTITION} INTO ("
+                + ", ".join(definitions + [f"PARTITION {MAX_PARTITION} VALUES LESS THAN (MAXVALUE)"])
+                + ")"
+            )
+            added += [(table, partition_name(day)) for day in new]
+    finally:
+        cursor.close()
+    return added
+
+
+def archive(conn, months: int = ARCHIVE_MONTHS, batch: int = ARCHIVE_BATCH, today=None) -> dict:
+    """
+    Move closed orders older than months into the archive tables
+
+    Each batch of orders is copied with its items and payments and then
+    deleted from `Order` (the cascade removes the rest) in one transaction,
+    so every order is always either live or archived. The customer order
+    summary triggers skip these deletes (@archiving_orders), since the
+    orders still count towards the customers' totals.
+
+    Args:
+        conn: Database connection (its open transaction is committed)
+        months: Age in months of the oldest orders kept live
+        batch: Orders moved per transaction
+        today: Reference date (defaults to the current date)
+
+    Returns:
+        cutoff, orders, batches, partitions (added) and seconds
+    """
+    start = time.perf_counter()
+    cutoff = months_ago(today or datetime.date.today(), months)
+    added = roll_forward(conn, cutoff)
+    cursor = conn.cursor()
+    moved = batches = 0
+    try:
+        cursor.execute("SET @archiving_orders = 1")
+        while True:
+            cursor.execute(
+                f"""SELECT order_id FROM `Order`
+                    WHERE order_date < %s
+                      AND order_status IN ({', '.join(['%s'] * len(CLOSED_STATUSES))})
+                    ORDER BY order_id
+                    LIMIT %s
+                    FOR UPDATE""",
+                (cutoff, *CLOSED_STATUSES, batch),
+            )
+            ids = [order_id for (order_id,) in cursor.fetchall()]
+            if not ids:
+                conn.commit()
+                break
+            placeholders = ", ".join(["%s"] * len(ids))
+            try:
+                for sql in _COPY:
+                    cursor.execute(sql.format(ids=placeholders), ids)
+                cursor.execute(f"DELETE FROM `Order` WHERE order_id IN ({placeholders})", ids)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            moved += len(ids)
+            batches += 1
+    finally:
+        cursor.execute("SET @archiving_orders = NULL")
+        cursor.close()
+    return {
+        "cutoff": cutoff.isoformat(),
+        "orders": moved,
+        "batches": batches,
+        "partitions": len(added),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def export(conn, partition: str, directory: str, drop: bool = False) -> dict:
+    """
+    Write one archived quarter to CSV files, optionally dropping it
+
+    Args:
+        conn: Database connection
+        partition: Quarter partition name, e.g. p2023q1
+        directory: Gets one <table>_<partition>.csv file per archive table
+        drop: Drop the partition from every archive table once written
+
+    Returns:
+        {table: rows written}
+    """
+    if not _QUARTER.match(partition):
+        raise ValueError(f"{partition!r} is not a quarter partition (e.g. p2023q1)")
+    os.makedirs(directory, exist_ok=True)
+    cursor = conn.cursor()
+    written = {}
+    try:
+        for table in ARCHIVE_TABLES:
+            path = os.path.join(directory, f"{table}_{partition}.csv")
+            cursor.execute(f"SELECT * FROM {table} PARTITION ({partition})")
+            with open(path, "w", newline="") as out:
+                written[table] = render.write_csv(cursor, out)
+        if drop:
+            for table in ARCHIVE_TABLES:
+                cursor.execute(f"ALTER TABLE {table} DROP PARTITION {partition}")
+    finally:
+        cursor.close()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="Show the archive partitions and their sizes")
+    roll_parser = commands.add_parser("roll", help="Add the coming quarter partitions")
+    roll_parser.add_argument("--ahead", type=int, default=1, help="Quarters past the current one")
+    archive_parser = commands.add_parser("archive", help="Move old closed orders to the archive")
+    archive_parser.add_argument("--months", type=int, default=ARCHIVE_MONTHS)
+    archive_parser.add_argument("--batch", type=int, default=ARCHIVE_BATCH)
+    export_parser = commands.add_parser("export", help="Write an archived quarter to CSV files")
+    export_parser.add_argument("partition")
+    export_parser.add_argument("directory")
+    export_parser.add_argument("--drop", action="store_true",
+                               help="Drop the quarter from the archive tables afterwards")
+    args = parser.parse_args()
+
+    with db_pool.get_pool(True).get_connection() as conn:
+        if args.command == "list":
+            cursor = conn.cursor()
+            for table in ARCHIVE_TABLES:
+                for name, bound, rows in partitions(cursor, table):
+                    print(f"{table:<18} {name:<8} {bound:>24} {rows:>10}")
+            cursor.close()
+        elif args.command == "roll":
+            through = datetime.date.today()
+            for _ in range(args.ahead):
+                through = next_quarter(through)
+            for table, name in roll_forward(conn, through):
+                print(f"{table}: added {name}")
+        elif args.command == "archive":
+            stats = archive(conn, args.months, args.batch)
+            print(", ".join(f"{k}={v}" for k, v in stats.items()))
+        else:
+            try:
+                written = export(conn, args.partition, args.directory, args.drop)
+            except ValueError as err:
+                parser.error(str(err))
+            for table, rows in written.items():
+                print(f"{table}: {rows} rows")
+
+
+if __name__ == "__main__":
+    main()
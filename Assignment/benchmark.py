@@ -0,0 +1,272 @@
+"""
+Scale benchmark for the MovieMusicStore schema
+
+For each scale factor, builds a scratch database from the schema scripts,
+fills it with datagen, and times every query in QueryTables.sql plus the
+Assignment6 views. The customer order summary is also timed in its old
+correlated form, its grouped form and its materialized form, and every
+report in reports.py against its original. Results are printed and can be saved as JSON so runs
+before and after a change can be compared.
+
+Usage:
+    python benchmark.py [--scales 1 10 100] [--seed 1] [--repeat 3] [--json out.json]
+"""
+
+import argparse
+import json
+import re
+import statistics
+import tempfile
+import time
+
+import mysql.connector
+
+import bulk_load
+import datagen
+import db_pool
+import reports
+import schema_setup
+from Assignment6 import VIEWS
+
+BENCH_DATABASE = "MovieMusicStoreBench"
+MAINTENANCE_ORDERS = 1000  # Orders inserted to measure summary trigger overhead
+
+# CustomerOrderSummaryView before the single-pass rewrite, kept for comparison
+CORRELATED_SUMMARY = """
+SELECT
+    c.customer_id,
+    CONCAT(c.first_name, ' ', c.last_name) AS CustomerName,
+    (SELECT COUNT(*) FROM `Order` o WHERE o.customer_id = c.customer_id) AS TotalOrders,
+    (SELECT IFNULL(SUM(o.total_amount), 0) FROM `Order` o WHERE o.customer_id = c.customer_id) AS TotalSpent,
+    (SELECT IFNULL(AVG(o.total_amount), 0) FROM `Order` o WHERE o.customer_id = c.customer_id) AS AvgOrderAmount
+FROM Customer c
+"""
+
+_SKIPPED = re.compile(r"^\s*(CREATE\s+DATABASE|DROP\s+DATABASE|USE)\b", re.IGNORECASE)
+
+
+def read_queries(path: str) -> list:
+    """
+    Statements of a script that can run against any database
+
+    Returns:
+        List of (label, sql); the label is the statement number and its start
+    """
+    with open(path, "r") as file:
+        statements = [s for s in bulk_load.iter_statements(file) if not _SKIPPED.match(s)]
+    return [
+        (f"{number:>2}. {' '.join(sql.split())[:50]}", sql)
+        for number, sql in enumerate(statements, 1)
+    ]
+
+
+def build_schema(conn, indexes: bool = True):
+    """
+    Recreate the bench database from the schema scripts
+
+    The scripts are schema_setup.SCHEMA_SCRIPTS, so the archive tables and
+    the history views (Archive.sql) that the Assignment6 views and
+    CustomerOrderSummary.sql read exist too.
+
+    Args:
+        conn: Connection without a default database
+        indexes: Also apply the AddIndexes.sql migration
+    """
+    cursor = conn.cursor()
+    cursor.execute(f"DROP DATABASE IF EXISTS {BENCH_DATABASE}")
+    cursor.execute(f"CREATE DATABASE {BENCH_DATABASE}")
+    cursor.execute(f"USE {BENCH_DATABASE}")
+    paths = schema_setup.SCHEMA_SCRIPTS + (("AddIndexes.sql",) if indexes else ())
+    for path in paths:
+        with open(path, "r") as file:
+            for statement in bulk_load.iter_statements(file):
+                if not _SKIPPED.match(statement):
+                    cursor.execute(statement)
+    conn.commit()
+    cursor.close()
+
+
+def time_query(conn, sql: str, repeat: int, params=None) -> dict:
+    """Run a query repeat times and report the median time"""
+    cursor = conn.cursor()
+    timings, rows = [], 0
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            cursor.execute(sql, params)
+            rows = len(cursor.fetchall()) if cursor.with_rows else cursor.rowcount
+            timings.append((time.perf_counter() - start) * 1000)
+    except mysql.connector.Error as err:
+        return {"error": str(err)}
+    finally:
+        cursor.close()
+    return {
+        "median_ms": round(statistics.median(timings), 3),
+        "min_ms": round(min(timings), 3),
+        "rows": rows,
+    }
+
+
+def insert_orders(conn, customers: int, count: int = MAINTENANCE_ORDERS) -> float:
+    """Insert count orders one statement at a time; return the elapsed ms"""
+    cursor = conn.cursor()
+    start = time.perf_counter()
+    for i in range(count):
+        cursor.execute(
+            "INSERT INTO `Order` (customer_id, order_status, total_amount) VALUES (%s, %s, %s)",
+            (i % customers + 1, "PENDING", 10 + i % 90),
+        )
+    conn.commit()
+    elapsed = (time.perf_counter() - start) * 1000
+    cursor.close()
+    return round(elapsed, 1)
+
+
+def compare_summary(conn, customers: int, repeat: int) -> dict:
+    """
+    Time the correlated, grouped and materialized customer order summaries
+
+    Also measures how much the summary triggers slow down order inserts and
+    checks that the materialized totals match a fresh aggregation.
+    """
+    result = {
+        "correlated": time_query(conn, CORRELATED_SUMMARY, repeat),
+        "grouped": time_query(conn, "SELECT * FROM CustomerOrderSummaryView", repeat),
+        "insert_ms_without_triggers": insert_orders(conn, customers),
+    }
+
+    start = time.perf_counter()
+    bulk_load.execute_script(conn, "CustomerOrderSummary.sql")
+    result["build_seconds"] = round(time.perf_counter() - start, 3)
+    result["insert_ms_with_triggers"] = insert_orders(conn, customers)
+    result["materialized"] = time_query(
+        conn, "SELECT * FROM CustomerOrderSummaryMaterialized", repeat
+    )
+
+    # The materialized totals are lifetime ones, so they are checked against
+    # the order history rather than the live-order view
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT COUNT(*) FROM CustomerOrderSummaryMaterialized m
+        LEFT JOIN (
+            SELECT customer_id, COUNT(*) AS TotalOrders, SUM(total_amount) AS TotalSpent
+            FROM OrderHistory
+            GROUP BY customer_id
+        ) h ON h.customer_id = m.customer_id
+        WHERE m.TotalOrders <> IFNULL(h.TotalOrders, 0)
+           OR m.TotalSpent <> IFNULL(h.TotalSpent, 0)
+    """)
+    result["mismatches"] = cursor.fetchone()[0]
+    cursor.close()
+    return result
+
+
+def analyze(conn, tables):
+    """Refresh optimizer statistics after a bulk load or index change"""
+    cursor = conn.cursor()
+    cursor.execute("ANALYZE TABLE " + ", ".join(f"`{table}`" for table in tables))
+    cursor.fetchall()
+    cursor.close()
+
+
+def run_scale(scale: float, seed: int, repeat: int, local_infile: bool = True) -> dict:
+    """Build, load and query one scale factor"""
+    result = {"scale": scale, "seed": seed}
+
+    with db_pool.get_pool(False).get_connection() as conn:
+        start = time.perf_counter()
+        build_schema(conn)
+        result["schema_seconds"] = round(time.perf_counter() - start, 3)
+
+    pool = db_pool.get_pool(True, database=BENCH_DATABASE, allow_local_infile=local_infile)
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        files = datagen.generate(directory, scale, seed)
+        result["generate_seconds"] = round(time.perf_counter() - start, 3)
+        result["tables"] = {table: rows for table, (_, rows) in files.items()}
+
+        with pool.get_connection() as conn:
+            result["load"] = datagen.load(conn, files, local_infile)
+
+    with pool.get_connection() as conn:
+        analyze(conn, files)
+
+        result["queries"] = [
+            {"query": label, **time_query(conn, sql, repeat)}
+            for label, sql in read_queries("QueryTables.sql")
+        ]
+
+        cursor = conn.cursor()
+        for sql in VIEWS.values():
+            cursor.execute(sql)
+        cursor.close()
+        result["views"] = [
+            {"view": view, **time_query(conn, f"SELECT * FROM {view}", repeat)}
+            for view in VIEWS
+        ]
+
+        # Product registry for the product reports (migrates the loaded orders)
+        result["products_seconds"] = bulk_load.execute_script(conn, "Products.sql")["seconds"]
+        analyze(conn, ["Product", "OrderItem"])
+        result["reports"] = {name: reports.compare(conn, name, repeat) for name in reports.REPORTS}
+        result["customer_summary"] = compare_summary(conn, result["tables"]["Customer"], repeat)
+    return result
+
+
+def run(scales, seed: int, repeat: int, local_infile: bool = True) -> list:
+    try:
+        return [run_scale(scale, seed, repeat, local_infile) for scale in scales]
+    finally:
+        with db_pool.get_pool(False).get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"DROP DATABASE IF EXISTS {BENCH_DATABASE}")
+            cursor.close()
+
+
+def print_results(results):
+    for result in results:
+        total = sum(result["tables"].values())
+        load_seconds = sum(stats["seconds"] for stats in result["load"].values())
+        print(f"\n=== scale {result['scale']} (seed {result['seed']}): "
+              f"{total} rows loaded in {load_seconds:.2f}s ===")
+        print(f"{'query':<60} {'median ms':>10} {'rows':>8}")
+        for entry in result["queries"] + result["views"]:
+            name = entry.get("query", entry.get("view"))[:60]
+            if "error" in entry:
+                print(f"{name:<60} {'error':>10}  {entry['error']}")
+            else:
+                print(f"{name:<60} {entry['median_ms']:>10} {entry['rows']:>8}")
+
+        print(f"\nProduct registry built in {result['products_seconds']}s")
+        print(f"{'report':<32} {'original ms':>12} {'set-based ms':>13} {'speedup':>8} {'same':>5}")
+        for name, entry in result["reports"].items():
+            print(f"{name:<32} {entry['original_ms']:>12} {entry['set_based_ms']:>13} "
+                  f"{str(entry['speedup']) + 'x':>8} {str(entry['same']):>5}")
+
+        summary = result["customer_summary"]
+        print("\nCustomer order summary (median ms):")
+        for variant in ("correlated", "grouped", "materialized"):
+            print(f"  {variant:<14} {summary[variant].get('median_ms', summary[variant].get('error'))}")
+        print(f"  {MAINTENANCE_ORDERS} order inserts: {summary['insert_ms_without_triggers']} ms "
+              f"without triggers, {summary['insert_ms_with_triggers']} ms with triggers; "
+              f"{summary['mismatches']} mismatched customers")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-local-infile", action="store_true")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    results = run(args.scales, args.seed, args.repeat, not args.no_local_infile)
+    print_results(results)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
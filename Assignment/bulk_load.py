@@ -0,0 +1,388 @@
+"""
+Streaming bulk loader for SQL scripts and CSV/TSV catalog dumps
+
+SQL scripts are parsed statement by statement while the file is read, so
+semicolons inside string literals or comments no longer break them, and
+consecutive single-table INSERTs are merged into multi-row INSERTs.
+CSV/TSV files are loaded with LOAD DATA LOCAL INFILE when the server
+allows it and with batched executemany INSERTs otherwise.
+
+Usage:
+    python bulk_load.py script PopulateTables.sql [--commit-every 1000]
+    python bulk_load.py csv Movie movies.csv [--tsv] [--columns title genre ...]
+"""
+
+import argparse
+import csv
+import re
+import time
+
+import mysql.connector
+
+import db_pool
+
+NULL = "\\N"  # NULL marker in data files, as written by SELECT ... INTO OUTFILE
+COMMIT_EVERY = 1000  # Statements (scripts) or rows (CSV) per transaction
+CSV_BATCH = 5000  # Rows per executemany call
+MAX_BATCH_BYTES = 1 << 20  # Upper bound for a merged INSERT (max_allowed_packet)
+
+_DELIMITER = re.compile(r"\s*DELIMITER\s+(\S+)\s*$", re.IGNORECASE)
+_INSERT = re.compile(
+    r"^\s*INSERT\s+INTO\s+(?P<head>[^(]+?\s*(?:\([^)]*\))?)\s*VALUES\s*(?P<rows>\(.*\))\s*$",
+    re.IGNORECASE | re.DOTALL,
+)
+# Server-side refusals of LOAD DATA LOCAL INFILE
+_LOCAL_INFILE_ERRORS = {1148, 2068, 3948}
+
+
+def iter_statements(lines, delimiter: str = ";"):
+    """
+    Split SQL text into statements without reading it all into memory
+
+    Handles quoted strings and identifiers (with backslash and doubled
+    quote escapes), -- and # line comments, /* */ block comments and
+    mysql-client style DELIMITER directives.
+
+    Args:
+        lines: Iterable of lines, e.g. an open file
+        delimiter: Initial statement delimiter
+
+    Yields:
+        Statements without their trailing delimiter
+    """
+    buf = []
+    quote = None
+    in_comment = False
+
+    def specials():
+        return re.compile("['\"`#/\\\\-]|" + re.escape(delimiter))
+
+    special = specials()
+
+    for line in lines:
+        if quote is None and not in_comment and not "".join(buf).strip():
+            directive = _DELIMITER.match(line)
+            if directive:
+                delimiter = directive.group(1)
+                special = specials()
+                buf = []
+                continue
+
+        i, n = 0, len(line)
+        while i < n:
+            if in_comment:
+                end = line.find("*/", i)
+                if end < 0:
+                    buf.append(line[i:])
+                    break
+                buf.append(line[i : end + 2])
+                in_comment = False
+                i = end + 2
+                continue
+
+            if quote is not None:
+                # Copy up to the next quote or escape character
+                j = i
+                while j < n and line[j] != quote and not (line[j] == "\\" and quote != "`"):
+                    j += 1
+                buf.append(line[i:j])
+                if j >= n:
+                    break
+                if line[j] == "\\":
+                    buf.append(line[j : j + 2])
+                    i = j + 2
+                elif line.startswith(quote * 2, j):
+                    buf.append(quote * 2)
+                    i = j + 2
+                else:
+                    buf.append(quote)
+                    quote = None
+                    i = j + 1
+                continue
+
+            match = special.search(line, i)
+            if match is None:
+                buf.append(line[i:])
+                break
+            j = match.start()
+            buf.append(line[i:j])
+            token = match.group()
+
+            if line.startswith(delimiter, j):
+                statement = "".join(buf).strip()
+                if statement:
+                    yield statement
+                buf = []
+                i = j + len(delimiter)
+            elif token in "'\"`":
+                quote = token
+                buf.append(token)
+                i = j + 1
+            elif token == "#" or (
+                line.startswith("--", j) and (j + 2 >= n or line[j + 2].isspace())
+            ):
+                buf.append("\n")
+                break
+            elif line.startswith("/*", j):
+                in_comment = True
+                buf.append("/*")
+                i = j + 2
+            else:
+                buf.append(token)
+                i = j + 1
+
+    statement = "".join(buf).strip()
+    if statement:
+        yield statement
+
+
+def merge_inserts(statements, max_bytes: int = MAX_BATCH_BYTES):
+    """
+    Merge consecutive INSERT ... VALUES statements into the same table and
+    column list into multi-row INSERTs
+
+    Args:
+        statements: Iterable of SQL statements
+        max_bytes: Maximum size of a merged statement
+
+    Yields:
+        (statement, list of the source statements merged into it)
+    """
+    head, rows, size, merged = None, [], 0, []
+
+    def flush():
+        return f"INSERT INTO {head} VALUES {', '.join(rows)}", merged
+
+    for statement in statements:
+        match = _INSERT.match(statement)
+        if match is None or "ON DUPLICATE KEY" in statement.upper():
+            if rows:
+                yield flush()
+                head, rows, size, merged = None, [], 0, []
+            yield statement, [statement]
+            continue
+
+        this_head = " ".join(match.group("head").split())
+        values = match.group("rows")
+        if rows and (this_head != head or size + len(values) > max_bytes):
+            yield flush()
+            rows, size, merged = [], 0, []
+        head = this_head
+        rows.append(values)
+        size += len(values)
+        merged.append(statement)
+
+    if rows:
+        yield flush()
+
+
+def execute_script(conn, path: str, commit_every: int = COMMIT_EVERY, on_error=None) -> dict:
+    """
+    Stream a SQL script into the database
+
+    A merged INSERT that fails is retried one source statement at a time
+    (the failed statement inserted nothing), so only the bad rows are
+    reported and skipped.
+
+    Args:
+        conn: Database connection
+        path: Path of the .sql file
+        commit_every: Number of statements per commit
+        on_error: Called with (statement, error); the error is raised if None
+
+    Returns:
+        Load statistics (statements, rows, errors, seconds, rows_per_second)
+    """
+    start = time.perf_counter()
+    statements = rows = errors = pending = 0
+    cursor = conn.cursor()
+
+    def run(statement):
+        nonlocal rows
+        cursor.execute(statement)
+        if cursor.with_rows:
+            cursor.fetchall()
+        elif cursor.rowcount > 0:
+            rows += cursor.rowcount
+
+    with open(path, "r") as file:
+        for statement, sources in merge_inserts(iter_statements(file)):
+            try:
+                run(statement)
+            except mysql.connector.Error as err:
+                if len(sources) == 1:
+                    errors += 1
+                    if on_error is None:
+                        raise
+                    on_error(statement, err)
+                else:
+                    for source in sources:
+                        try:
+                            run(source)
+                        except mysql.connector.Error as source_err:
+                            errors += 1
+                            if on_error is None:
+                                raise
+                            on_error(source, source_err)
+            statements += len(sources)
+            pending += len(sources)
+            if pending >= commit_every:
+                conn.commit()
+                pending = 0
+
+    conn.commit()
+    cursor.close()
+    return _stats(start, statements=statements, rows=rows, errors=errors)
+
+
+def _stats(start, **counts) -> dict:
+    seconds = time.perf_counter() - start
+    counts["seconds"] = round(seconds, 3)
+    counts["rows_per_second"] = round(counts["rows"] / seconds) if seconds else 0
+    return counts
+
+
+def _quote_identifier(name: str) -> str:
+    return "`" + name.replace("`", "``") + "`"
+
+
+def load_csv(
+    conn,
+    table: str,
+    path: str,
+    columns=None,
+    delimiter: str = ",",
+    header: bool = True,
+    batch_size: int = CSV_BATCH,
+    commit_every: int = COMMIT_EVERY * 50,
+    local_infile: bool = True,
+) -> dict:
+    """
+    Load a CSV/TSV file into a table
+
+    Args:
+        conn: Database connection (opened with allow_local_infile=True to
+            use LOAD DATA LOCAL INFILE)
+        table: Target table
+        path: Path of the data file
+        columns: Target columns; defaults to the header row
+        delimiter: Field separator ("," for CSV, "\\t" for TSV)
+        header: Whether the first line holds column names
+        batch_size: Rows per executemany call in the fallback path
+        commit_every: Rows per commit in the fallback path
+        local_infile: Try LOAD DATA LOCAL INFILE first
+
+    Returns:
+        Load statistics (rows, method, seconds, rows_per_second)
+    """
+    start = time.perf_counter()
+    with open(path, "r", newline="") as file:
+        first = next(csv.reader(file, delimiter=delimiter), None)
+    if columns is None:
+        if not header or first is None:
+            raise ValueError("Column names are required when the file has no header")
+        columns = first
+    column_list = ", ".join(_quote_identifier(col) for col in columns)
+
+    if local_infile:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                f"""LOAD DATA LOCAL INFILE %s INTO TABLE {_quote_identifier(table)}
+                    FIELDS TERMINATED BY %s OPTIONALLY ENCLOSED BY '"'
+                    LINES TERMINATED BY '\\n'
+                    {"IGNORE 1 LINES" if header else ""}
+                    ({column_list})""",
+                (path, delimiter),
+            )
+            rows = cursor.rowcount
+            conn.commit()
+            return _stats(start, rows=rows, method="LOAD DATA LOCAL INFILE")
+        except mysql.connector.Error as err:
+            conn.rollback()
+            if err.errno not in _LOCAL_INFILE_ERRORS:
+                raise
+        finally:
+            cursor.close()
+
+    sql = (
+        f"INSERT INTO {_quote_identifier(table)} ({column_list}) "
+        f"VALUES ({', '.join(['%s'] * len(columns))})"
+    )
+    rows = pending = 0
+    cursor = conn.cursor()
+    with open(path, "r", newline="") as file:
+        reader = csv.reader(file, delimiter=delimiter)
+        if header:
+            next(reader, None)
+        batch = []
+        for record in reader:
+            batch.append([None if value == NULL else value for value in record])
+            if len(batch) >= batch_size:
+                cursor.executemany(sql, batch)
+                rows += len(batch)
+                pending += len(batch)
+                batch = []
+                if pending >= commit_every:
+                    conn.commit()
+                    pending = 0
+        if batch:
+            cursor.executemany(sql, batch)
+            rows += len(batch)
+    conn.commit()
+    cursor.close()
+    return _stats(start, rows=rows, method="executemany")
+
+
+def format_stats(stats: dict) -> str:
+    """One-line summary of a load"""
+    return ", ".join(f"{name}={value}" for name, value in stats.items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk load SQL scripts or CSV/TSV files")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    script = commands.add_parser("script", help="Run a .sql file")
+    script.add_argument("path")
+    script.add_argument("--commit-every", type=int, default=COMMIT_EVERY)
+    script.add_argument("--no-database", action="store_true",
+                        help="Connect without selecting MovieMusicStore")
+
+    data = commands.add_parser("csv", help="Load a CSV/TSV file into a table")
+    data.add_argument("table")
+    data.add_argument("path")
+    data.add_argument("--tsv", action="store_true", help="Tab separated input")
+    data.add_argument("--columns", nargs="+", help="Target columns (default: header)")
+    data.add_argument("--no-header", action="store_true")
+    data.add_argument("--batch", type=int, default=CSV_BATCH)
+    data.add_argument("--no-local-infile", action="store_true")
+
+    args = parser.parse_args()
+    if args.command == "script":
+        pool = db_pool.get_pool(not args.no_database)
+        with pool.get_connection() as conn:
+            stats = execute_script(
+                conn,
+                args.path,
+                args.commit_every,
+                on_error=lambda statement, err: print(f"Error executing: {err}"),
+            )
+    else:
+        pool = db_pool.get_pool(True, allow_local_infile=not args.no_local_infile)
+        with pool.get_connection() as conn:
+            stats = load_csv(
+                conn,
+                args.table,
+                args.path,
+                columns=args.columns,
+                delimiter="\t" if args.tsv else ",",
+                header=not args.no_header,
+                batch_size=args.batch,
+                local_infile=not args.no_local_infile,
+            )
+    print(format_stats(stats))
+
+
+if __name__ == "__main__":
+    main()
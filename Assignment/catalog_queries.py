@@ -0,0 +1,88 @@
+"""
+Catalog list, page and sort queries shared by the GUI and the index advisor
+
+The Tkinter client runs them; index_advisor.py EXPLAINs them without
+having to import the GUI.
+"""
+
+PAGE_SIZE = 200  # Rows fetched per round trip
+SORT_LIMIT = 1000  # Rows shown when the list is sorted or filtered
+
+MOVIE_PAGE_SQL = """
+    SELECT * FROM (
+        SELECT movie_id, title, genre, release_date, rating, runtime_minutes, stock_count
+        FROM Movie
+        WHERE movie_id {op} %s
+        ORDER BY movie_id {direction}
+        LIMIT %s
+    ) page
+    ORDER BY movie_id
+"""
+
+MUSIC_PAGE_SQL = """
+    SELECT ma.album_id, ma.title,
+           GROUP_CONCAT(a.artist_name ORDER BY a.artist_name SEPARATOR ', '),
+           ma.genre, ma.release_date, ma.stock_count
+    FROM (
+        SELECT album_id, title, genre, release_date, stock_count
+        FROM MusicAlbum
+        WHERE album_id {op} %s
+        ORDER BY album_id {direction}
+        LIMIT %s
+    ) ma
+    LEFT JOIN Album_Artist aa ON ma.album_id = aa.album_id
+    LEFT JOIN Artist a ON aa.artist_id = a.artist_id
+    GROUP BY ma.album_id, ma.title, ma.genre, ma.release_date, ma.stock_count
+    ORDER BY ma.album_id
+"""
+
+
+# Full catalog rows for the in-memory cache ({where} / {limit} filled in by it)
+MOVIE_CATALOG_SQL = """
+    SELECT movie_id, title, genre, release_date, rating, runtime_minutes, stock_count
+    FROM Movie
+    {where}
+    ORDER BY movie_id
+    {limit}
+"""
+
+MUSIC_CATALOG_SQL = """
+    SELECT ma.album_id, ma.title,
+           GROUP_CONCAT(a.artist_name ORDER BY a.artist_name SEPARATOR ', '),
+           ma.genre, ma.release_date, ma.stock_count
+    FROM MusicAlbum ma
+    LEFT JOIN Album_Artist aa ON ma.album_id = aa.album_id
+    LEFT JOIN Artist a ON aa.artist_id = a.artist_id
+    {where}
+    GROUP BY ma.album_id, ma.title, ma.genre, ma.release_date, ma.stock_count
+    ORDER BY ma.album_id
+    {limit}
+"""
+
+
+# Sorted and filtered lists when the catalog is not all in memory
+# ({where} / {order} filled in by ListView.query)
+MOVIE_SORT_SQL = """
+    SELECT movie_id, title, genre, release_date, rating, runtime_minutes, stock_count
+    FROM Movie
+    {where}
+    ORDER BY {order}
+    LIMIT %s
+"""
+
+MUSIC_SORT_SQL = """
+    SELECT ma.album_id AS album_id, ma.title AS title,
+           GROUP_CONCAT(a.artist_name ORDER BY a.artist_name SEPARATOR ', ') AS artists,
+           ma.genre AS genre, ma.release_date AS release_date, ma.stock_count AS stock_count
+    FROM (
+        SELECT album_id, title, genre, release_date, stock_count
+        FROM MusicAlbum
+        {where}
+        ORDER BY {order}
+        LIMIT %s
+    ) ma
+    LEFT JOIN Album_Artist aa ON ma.album_id = aa.album_id
+    LEFT JOIN Artist a ON aa.artist_id = a.artist_id
+    GROUP BY ma.album_id, ma.title, ma.genre, ma.release_date, ma.stock_count
+    ORDER BY {order}
+"""
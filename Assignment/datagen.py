@@ -0,0 +1,329 @@
+"""
+Deterministic synthetic data for every table in CreateTables.sql
+
+The same seed and scale always produce the same rows. Popularity is skewed
+the way real catalogs are: a few customers place most orders, a few titles
+sell most copies, and a few actors/artists appear on most releases.
+
+Rows are written as TSV files (NULL as \\N) in foreign key order and can be
+loaded with bulk_load.load_csv.
+
+Usage:
+    python datagen.py --scale 10 --seed 1 --out data [--load]
+"""
+
+import argparse
+import datetime
+import os
+import random
+
+import bulk_load
+import db_pool
+
+# Row counts at scale 1; every count grows linearly with the scale factor
+BASE_COUNTS = {
+    "Customer": 1000,
+    "Movie": 500,
+    "Actor": 800,
+    "MusicAlbum": 500,
+    "Artist": 300,
+    "Order": 5000,
+}
+ITEMS_PER_ORDER = (1, 1, 1, 2, 2, 3, 4)
+ACTORS_PER_MOVIE = (2, 3, 4, 5, 6)
+ARTISTS_PER_ALBUM = (1, 1, 1, 1, 2, 3)
+ZIPF_EXPONENT = 0.9
+
+# Tables in load order, with the columns written to each file
+TABLES = {
+    "Customer": ("customer_id", "first_name", "last_name", "phone", "email", "join_date", "status"),
+    "Movie": ("movie_id", "title", "release_date", "rating", "genre", "runtime_minutes", "stock_count"),
+    "Actor": ("actor_id", "first_name", "last_name", "birth_date"),
+    "Movie_Actor": ("movie_id", "actor_id", "role_name"),
+    "MusicAlbum": ("album_id", "title", "release_date", "genre", "stock_count"),
+    "Artist": ("artist_id", "artist_name", "start_year", "end_year", "active_status"),
+    "Album_Artist": ("album_id", "artist_id"),
+    "Order": ("order_id", "customer_id", "order_date", "order_status", "total_amount"),
+    "OrderItem": ("order_item_id", "order_id", "product_type", "product_id", "quantity", "price_each"),
+    "Payment": ("payment_id", "order_id", "payment_date", "payment_method", "amount"),
+}
+
+FIRST_NAMES = (
+    "John Jane Alice Bob Charlie Diana Ethan Fiona George Hannah Ian Julia Kevin "
+    "Laura Michael Nina Oscar Paula Quinn Rachel Sam Tina Uma Victor Wendy Xavier "
+    "Yara Zane Keanu Carrie Ewan Natalie Jeff Ryan Carey Steve"
+).split()
+LAST_NAMES = (
+    "Doe Smith Brown Johnson Williams Jones Garcia Miller Davis Wilson Anderson "
+    "Taylor Thomas Moore Martin Jackson White Harris Clark Lewis Walker Young King "
+    "Reeves Moss Gosling Mulligan Bridges Goodman McGregor Portman"
+).split()
+MOVIE_GENRES = ("Action", "Comedy", "Drama", "Sci-Fi", "Horror", "Romance", "Thriller", "Animation", "Documentary")
+MUSIC_GENRES = ("Rock", "Pop", "Jazz", "Hip-Hop", "Classical", "Electronic", "Country", "R&B", "Metal")
+RATINGS = ("G", "PG", "PG-13", "R", "NC-17")
+ORDER_STATUSES = ("COMPLETED",) * 6 + ("PENDING", "PENDING", "SHIPPED", "CANCELLED")
+PAYMENT_METHODS = ("CREDIT_CARD", "CREDIT_CARD", "DEBIT_CARD", "PAYPAL", "GIFT_CARD")
+SYLLABLES = (
+    "ka ri to na mo lu ve sa el an or is ter dra gon sky fire blu mat rix "
+    "hope war star nig ht dre am ci ty lo st sun ri se"
+).split()
+
+START_DATE = datetime.date(2020, 1, 1)
+END_DATE = datetime.date(2024, 12, 31)
+
+
+def zipf_weights(size: int, exponent: float = ZIPF_EXPONENT) -> list:
+    """Cumulative weights where rank r is picked with probability ~ 1/r^exponent"""
+    weights, total = [], 0.0
+    for rank in range(1, size + 1):
+        total += 1 / rank**exponent
+        weights.append(total)
+    return weights
+
+
+def make_vocabulary(rng: random.Random, size: int = 3000) -> tuple:
+    """
+    Generate pseudo-words with Zipf-like popularity
+
+    Returns:
+        (words, cumulative weights) where earlier words are picked more often
+    """
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    words = sorted(words)
+    rng.shuffle(words)
+    return words, zipf_weights(size)
+
+
+def make_title(rng: random.Random, vocabulary: tuple) -> str:
+    words, weights = vocabulary
+    count = rng.choice((1, 2, 2, 3, 3, 4))
+    return " ".join(rng.choices(words, cum_weights=weights, k=count)).title()
+
+
+def _date(rng, start=START_DATE, end=END_DATE):
+    return start + datetime.timedelta(days=rng.randint(0, (end - start).days))
+
+
+def _price(product_type: str, product_id: int) -> float:
+    """Stable list price per product (the schema stores prices only per order item)"""
+    base = 9.99 if product_type == "MOVIE" else 7.99
+    return round(base + (product_id * 7919 % 2000) / 100, 2)
+
+
+class TsvWriter:
+    """Writes rows of one table to a TSV file with a header line"""
+
+    def __init__(self, directory, table):
+        self.path = os.path.join(directory, f"{table}.tsv")
+        self.file = open(self.path, "w", newline="")
+        self.file.write("\t".join(TABLES[table]) + "\n")
+        self.rows = 0
+
+    def write(self, *values):
+        self.file.write(
+            "\t".join(bulk_load.NULL if value is None else str(value) for value in values)
+            + "\n"
+        )
+        self.rows += 1
+
+    def close(self):
+        self.file.close()
+
+
+def counts_for(scale: float) -> dict:
+    """Entity counts for a scale factor"""
+    return {table: max(1, int(count * scale)) for table, count in BASE_COUNTS.items()}
+
+
+def generate(directory: str, scale: float = 1, seed: int = 1) -> dict:
+    """
+    Write a TSV file per table
+
+    Args:
+        directory: Output directory
+        scale: Scale factor applied to BASE_COUNTS
+        seed: Random seed; the same seed gives identical files
+
+    Returns:
+        Mapping of table name to (path, row count), in load order
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    counts = counts_for(scale)
+    vocabulary = make_vocabulary(rng)
+    out = {table: TsvWriter(directory, table) for table in TABLES}
+
+    # Customers; join dates are kept to place orders after them
+    join_days = []
+    for customer_id in range(1, counts["Customer"] + 1):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        joined = _date(rng, END_DATE.replace(year=END_DATE.year - 5), END_DATE)
+        join_days.append(joined.toordinal())
+        out["Customer"].write(
+            customer_id,
+            first,
+            last,
+            f"{rng.randint(200, 999)}{rng.randint(1000000, 9999999)}",
+            f"{first.lower()}.{last.lower()}.{customer_id}@example.com",
+            joined,
+            "ACTIVE" if rng.random() < 0.9 else "INACTIVE",
+        )
+
+    # Movies, actors and casts
+    for movie_id in range(1, counts["Movie"] + 1):
+        out["Movie"].write(
+            movie_id,
+            make_title(rng, vocabulary),
+            _date(rng, datetime.date(1970, 1, 1)),
+            rng.choice(RATINGS),
+            rng.choice(MOVIE_GENRES),
+            rng.randint(75, 200),
+            int(rng.paretovariate(1.5) * 5),
+        )
+    for actor_id in range(1, counts["Actor"] + 1):
+        out["Actor"].write(
+            actor_id,
+            rng.choice(FIRST_NAMES),
+            rng.choice(LAST_NAMES),
+            _date(rng, datetime.date(1940, 1, 1), datetime.date(2005, 12, 31)),
+        )
+    actor_weights = zipf_weights(counts["Actor"])
+    actor_ids = range(1, counts["Actor"] + 1)
+    for movie_id in range(1, counts["Movie"] + 1):
+        cast = set(rng.choices(actor_ids, cum_weights=actor_weights, k=rng.choice(ACTORS_PER_MOVIE)))
+        for actor_id in sorted(cast):
+            out["Movie_Actor"].write(movie_id, actor_id, make_title(rng, vocabulary))
+
+    # Albums, artists and credits
+    for album_id in range(1, counts["MusicAlbum"] + 1):
+        out["MusicAlbum"].write(
+            album_id,
+            make_title(rng, vocabulary),
+            _date(rng, datetime.date(1960, 1, 1)),
+            rng.choice(MUSIC_GENRES),
+            int(rng.paretovariate(1.5) * 5),
+        )
+    for artist_id in range(1, counts["Artist"] + 1):
+        start_year = rng.randint(1960, 2020)
+        active = rng.random() < 0.7
+        out["Artist"].write(
+            artist_id,
+            f"{make_title(rng, vocabulary)} {artist_id}",
+            start_year,
+            None if active else rng.randint(start_year, 2024),
+            "ACTIVE" if active else "INACTIVE",
+        )
+    artist_weights = zipf_weights(counts["Artist"])
+    artist_ids = range(1, counts["Artist"] + 1)
+    for album_id in range(1, counts["MusicAlbum"] + 1):
+        credits = set(rng.choices(artist_ids, cum_weights=artist_weights, k=rng.choice(ARTISTS_PER_ALBUM)))
+        for artist_id in sorted(credits):
+            out["Album_Artist"].write(album_id, artist_id)
+
+    # Orders with their items and payments; heavy buyers and best sellers
+    # follow a Zipf distribution (ranks are shuffled so ids are not sorted by
+    # popularity)
+    customer_ids = list(range(1, counts["Customer"] + 1))
+    movie_ids = list(range(1, counts["Movie"] + 1))
+    album_ids = list(range(1, counts["MusicAlbum"] + 1))
+    for ids in (customer_ids, movie_ids, album_ids):
+        rng.shuffle(ids)
+    customer_weights = zipf_weights(len(customer_ids))
+    movie_weights = zipf_weights(len(movie_ids))
+    album_weights = zipf_weights(len(album_ids))
+
+    item_id = payment_id = 0
+    end_day = END_DATE.toordinal()
+    for order_id in range(1, counts["Order"] + 1):
+        customer_id = rng.choices(customer_ids, cum_weights=customer_weights)[0]
+        day = rng.randint(join_days[customer_id - 1], end_day)
+        ordered = datetime.datetime.fromordinal(day) + datetime.timedelta(
+            seconds=rng.randint(8 * 3600, 22 * 3600)
+        )
+        status = rng.choice(ORDER_STATUSES)
+
+        total = 0.0
+        for _ in range(rng.choice(ITEMS_PER_ORDER)):
+            if rng.random() < 0.6:
+                product_type = "MOVIE"
+                product_id = rng.choices(movie_ids, cum_weights=movie_weights)[0]
+            else:
+                product_type = "ALBUM"
+                product_id = rng.choices(album_ids, cum_weights=album_weights)[0]
+            quantity = rng.choice((1, 1, 1, 1, 2, 3))
+            price = _price(product_type, product_id)
+            total += quantity * price
+            item_id += 1
+            out["OrderItem"].write(item_id, order_id, product_type, product_id, quantity, price)
+
+        total = round(total, 2)
+        out["Order"].write(order_id, customer_id, ordered, status, f"{total:.2f}")
+        if status in ("COMPLETED", "SHIPPED"):
+            payment_id += 1
+            out["Payment"].write(
+                payment_id,
+                order_id,
+                ordered + datetime.timedelta(minutes=rng.randint(1, 600)),
+                rng.choice(PAYMENT_METHODS),
+                f"{total:.2f}",
+            )
+
+    result = {}
+    for table, writer in out.items():
+        writer.close()
+        result[table] = (writer.path, writer.rows)
+    return result
+
+
+def load(conn, files: dict, local_infile: bool = True) -> dict:
+    """
+    Load generated files into empty tables
+
+    Args:
+        conn: Connection to the target database
+        files: Result of generate()
+        local_infile: Try LOAD DATA LOCAL INFILE before executemany
+
+    Returns:
+        Mapping of table name to load statistics
+    """
+    stats = {}
+    cursor = conn.cursor()
+    # Rows arrive in FK order, but skipping the checks speeds up large loads
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+    try:
+        for table, (path, _) in files.items():
+            stats[table] = bulk_load.load_csv(
+                conn, table, path, delimiter="\t", local_infile=local_infile
+            )
+    finally:
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+        cursor.close()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic MovieMusicStore data")
+    parser.add_argument("--scale", type=float, default=1)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default="data", help="Output directory for the TSV files")
+    parser.add_argument("--load", action="store_true",
+                        help="Load the files into the (empty) MovieMusicStore tables")
+    parser.add_argument("--no-local-infile", action="store_true")
+    args = parser.parse_args()
+
+    files = generate(args.out, args.scale, args.seed)
+    for table, (path, rows) in files.items():
+        print(f"{table:<14} {rows:>10} rows -> {path}")
+
+    if args.load:
+        pool = db_pool.get_pool(True, allow_local_infile=not args.no_local_infile)
+        with pool.get_connection() as conn:
+            for table, stats in load(conn, files, not args.no_local_infile).items():
+                print(f"{table:<14} {bulk_load.format_stats(stats)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,435 @@
+"""
+Shared MySQL connection pool for the MovieMusicStore entry points
+(Assignment6 CLI and the Assignment9 GUI).
+
+Requires:
+- Python 3.11
+- mysql-connector-python
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+
+import mysql.connector
+from mysql.connector import errors
+
+import query_metrics
+
+# Connection settings shared by both entry points
+DB_CONFIG = {
+    "host": "localhost",
+    "user": "root",  # Replace with your username
+    "password": "",  # Replace with your password
+}
+DATABASE = "MovieMusicStore"
+
+POOL_SIZE = 5  # Maximum number of open connections per pool
+CHECKOUT_TIMEOUT = 10.0  # Seconds to wait for a free connection
+CONNECT_TIMEOUT = 5  # Seconds before a connection attempt is abandoned
+RECONNECT_ATTEMPTS = 2
+STATEMENT_CACHE_SIZE = 64  # Prepared statements kept per connection
+_UNKNOWN_STATEMENT = 1243  # ER_UNKNOWN_STMT_HANDLER: the server dropped it
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PooledConnection:
+    """
+    Wrapper around a pooled connection; close() hands it back to the pool
+
+    Every cursor it returns records its statements in query_metrics.
+    """
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    @property
+    def raw(self):
+        """The underlying MySQL connection"""
+        return self._conn
+
+    def execute(self, sql: str, params=()):
+        """
+        Run sql as a server-side prepared statement, preparing it on first use
+
+        Args:
+            sql: Statement with %s placeholders
+            params: Parameter values
+
+        Returns:
+            The prepared cursor holding the result. It belongs to the
+            statement cache: read its rows (the statement is recorded in
+            query_metrics once the last one is fetched), but do not close it.
+        """
+        if self._conn is None:
+            raise errors.OperationalError("Connection was returned to the pool")
+        start = time.perf_counter()
+        try:
+            cursor = self._pool.execute(self._conn, sql, params)
+        except mysql.connector.Error as err:
+            query_metrics.record(sql, time.perf_counter() - start, error=err)
+            raise
+        return query_metrics.InstrumentedCursor(cursor, self._conn).started(sql, start)
+
+    def cursor(self, *args, **kwargs):
+        """A cursor of the underlying connection, instrumented"""
+        if self._conn is None:
+            raise errors.OperationalError("Connection was returned to the pool")
+        return query_metrics.InstrumentedCursor(self._conn.cursor(*args, **kwargs))
+
+    def close(self):
+        """Return the connection to the pool instead of closing it"""
+        if self._conn is not None:
+            self._pool.release(self._conn)
+            self._conn = None
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise errors.OperationalError("Connection was returned to the pool")
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class StatementCache:
+    """Prepared cursors of one connection, keyed by SQL text (LRU)"""
+
+    def __init__(self, conn, size: int = STATEMENT_CACHE_SIZE):
+        self.conn = conn
+        self.size = size
+        self._cursors = OrderedDict()
+
+    def __len__(self):
+        return len(self._cursors)
+
+    def get(self, sql: str) -> tuple:
+        """
+        Return the prepared cursor for sql, creating it on a miss
+
+        Returns:
+            (cursor, hit, evicted): whether the statement was already
+            prepared, and whether another statement was dropped for it
+        """
+        cursor = self._cursors.get(sql)
+        if cursor is not None:
+            self._cursors.move_to_end(sql)
+            return cursor, True, False
+
+        evicted = False
+        if len(self._cursors) >= self.size:
+            _, old = self._cursors.popitem(last=False)
+            _close_cursor(old)
+            evicted = True
+        # The statement is prepared by the cursor's first execute()
+        cursor = self.conn.cursor(prepared=True)
+        self._cursors[sql] = cursor
+        return cursor, False, evicted
+
+    def discard(self, sql: str):
+        """Forget the statement for sql, e.g. after the server dropped it"""
+        cursor = self._cursors.pop(sql, None)
+        if cursor is not None:
+            _close_cursor(cursor)
+
+    def clear(self):
+        """Forget every statement (after a reconnect or before closing)"""
+        for cursor in self._cursors.values():
+            _close_cursor(cursor)
+        self._cursors.clear()
+
+
+def _close_cursor(cursor):
+    try:
+        cursor.close()
+    except mysql.connector.Error:
+        pass
+
+
+class ConnectionPool:
+    """Bounded pool of MySQL connections with health checks on checkout"""
+
+    def __init__(self, size: int = POOL_SIZE, **connect_args):
+        """
+        Create an empty pool; connections are opened lazily on demand
+
+        Args:
+            size: Maximum number of connections the pool may hold open
+            connect_args: Keyword arguments passed to mysql.connector.connect
+        """
+        self.size = size
+        self.connect_args = dict(connect_args)
+        self.connect_args.setdefault("connection_timeout", CONNECT_TIMEOUT)
+
+        self._idle = deque()
+        self._open = 0
+        self._cond = threading.Condition()
+
+        # Statistics
+        self.checkouts = 0
+        self.failures = 0
+        self.reconnects = 0
+        self.created = 0
+        self.wait_time = 0.0
+        self.max_wait = 0.0
+        self.statement_hits = 0
+        self.statement_misses = 0
+        self.statement_evictions = 0
+        self.reprepares = 0
+
+        self._statements = {}  # raw connection -> StatementCache
+
+    def _connect(self):
+        conn = mysql.connector.connect(**self.connect_args)
+        with self._cond:
+            self.created += 1
+        return conn
+
+    def _count_failure(self):
+        with self._cond:
+            self.failures += 1
+
+    def _check(self, conn):
+        """
+        Make sure an idle connection is still alive, reconnecting if needed
+
+        Returns:
+            A usable connection, or None if the session could not be restored
+        """
+        try:
+            if conn.is_connected():
+                return conn
+            # Prepared statements do not survive the old session
+            self._drop_statements(conn)
+            conn.reconnect(attempts=RECONNECT_ATTEMPTS, delay=0.5)
+            with self._cond:
+                self.reconnects += 1
+            return conn
+        except mysql.connector.Error:
+            self._count_failure()
+            self._drop_statements(conn)
+            try:
+                conn.close()
+            except mysql.connector.Error:
+                pass
+            return None
+
+    def _drop_statements(self, conn):
+        with self._cond:
+            cache = self._statements.pop(conn, None)
+        if cache is not None:
+            cache.clear()
+
+    def execute(self, conn, sql: str, params=()):
+        """
+        Execute sql on a checked-out raw connection through its statement
+        cache (see PooledConnection.execute)
+        """
+        with self._cond:
+            cache = self._statements.get(conn)
+            if cache is None:
+                cache = self._statements[conn] = StatementCache(conn)
+
+        cursor, hit, evicted = cache.get(sql)
+        try:
+            cursor.execute(sql, params)
+        except mysql.connector.Error as err:
+            if err.errno != _UNKNOWN_STATEMENT:
+                raise
+            # The server no longer knows the statement; prepare it again
+            cache.discard(sql)
+            cursor, _, _ = cache.get(sql)
+            cursor.execute(sql, params)
+            with self._cond:
+                self.reprepares += 1
+
+        with self._cond:
+            if hit:
+                self.statement_hits += 1
+            else:
+                self.statement_misses += 1
+            self.statement_evictions += evicted
+        return cursor
+
+    def get_connection(self, timeout: float = CHECKOUT_TIMEOUT) -> PooledConnection:
+        """
+        Check a connection out of the pool, waiting if all are in use
+
+        Args:
+            timeout: Maximum number of seconds to wait for a free connection
+
+        Returns:
+            PooledConnection wrapping a live MySQL connection
+        """
+        start = time.perf_counter()
+        deadline = start + timeout
+        with self._cond:
+            while not self._idle and self._open >= self.size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    self.failures += 1
+                    raise errors.PoolError(
+                        f"No free connection after {timeout:.1f}s "
+                        f"(pool size {self.size})"
+                    )
+                self._cond.wait(remaining)
+
+            conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                # Reserve a slot before connecting outside the lock
+                self._open += 1
+
+        if conn is not None:
+            conn = self._check(conn)
+        if conn is None:
+            try:
+                conn = self._connect()
+            except mysql.connector.Error:
+                with self._cond:
+                    self.failures += 1
+                    self._open -= 1
+                    self._cond.notify()
+                raise
+
+        waited = time.perf_counter() - start
+        query_metrics.record_checkout(waited)
+        with self._cond:
+            self.checkouts += 1
+            self.wait_time += waited
+            self.max_wait = max(self.max_wait, waited)
+        return PooledConnection(self, conn)
+
+    def release(self, conn):
+        """Return a raw connection to the pool, discarding it if it is broken"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            healthy = True
+        except mysql.connector.Error:
+            healthy = False
+
+        with self._cond:
+            if healthy:
+                self._idle.append(conn)
+            else:
+                self._open -= 1
+            self._cond.notify()
+
+        if not healthy:
+            self._drop_statements(conn)
+            try:
+                conn.close()
+            except mysql.connector.Error:
+                pass
+
+    def reset(self):
+        """Close all idle connections, e.g. after the database was recreated"""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            self._drop_statements(conn)
+            try:
+                conn.close()
+            except mysql.connector.Error:
+                pass
+
+    def stats(self) -> dict:
+        """
+        Snapshot of pool usage counters
+
+        Returns:
+            Dictionary of pool statistics
+        """
+        with self._cond:
+            return {
+                "size": self.size,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._open - len(self._idle),
+                "checkouts": self.checkouts,
+                "failures": self.failures,
+                "reconnects": self.reconnects,
+                "created": self.created,
+                "total_wait_ms": round(self.wait_time * 1000, 3),
+                "avg_wait_ms": round(
+                    self.wait_time * 1000 / self.checkouts, 3
+                ) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+                "stmt_cached": sum(len(cache) for cache in self._statements.values()),
+                "stmt_hits": self.statement_hits,
+                "stmt_misses": self.statement_misses,
+                "stmt_evictions": self.statement_evictions,
+                "stmt_reprepares": self.reprepares,
+            }
+
+
+def get_pool(use_database: bool = True, **overrides) -> ConnectionPool:
+    """
+    Return the shared pool for the given settings, creating it on first use
+
+    Args:
+        use_database: Whether connections select the MovieMusicStore database
+        overrides: Connection settings that replace the DB_CONFIG defaults
+
+    Returns:
+        ConnectionPool shared by every caller with the same settings
+    """
+    config = {**DB_CONFIG, **overrides}
+    if use_database:
+        config.setdefault("database", DATABASE)
+    size = config.pop("pool_size", POOL_SIZE)
+    key = tuple(sorted(config.items()))
+
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(size, **config)
+            _pools[key] = pool
+        return pool
+
+
+def all_stats() -> list:
+    """
+    Statistics for every pool created in this process
+
+    Returns:
+        List of (description, stats) tuples
+    """
+    with _pools_lock:
+        pools = list(_pools.items())
+    result = []
+    for key, pool in pools:
+        settings = dict(key)
+        label = f"{settings.get('user')}@{settings.get('host')}"
+        if settings.get("database"):
+            label += f"/{settings['database']}"
+        result.append((label, pool.stats()))
+    return result
+
+
+def format_stats() -> str:
+    """Human readable summary of every pool's statistics"""
+    lines = []
+    for label, stats in all_stats():
+        lines.append(f"Pool {label}")
+        for name, value in stats.items():
+            lines.append(f"  {name:<16} {value}")
+    return "\n".join(lines) if lines else "No connection pools in use"
+
+
+def close_all():
+    """Close idle connections in every pool (used on shutdown)"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.reset()
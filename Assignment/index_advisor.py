@@ -0,0 +1,439 @@
+"""
+Index advisor for the MovieMusicStore query paths
+
+Loads synthetic data into a scratch database built without the
+AddIndexes.sql migration and EXPLAINs every statement in QueryTables.sql,
+the Assignment6 views and the GUI list/search queries. Full table scans,
+full index scans, filesorts and temporary tables are flagged, and for
+each flagged table an index is derived from the statement: its equality
+filters and join keys first, then its sort or grouping keys, then one
+range filter. Proposals that AddIndexes.sql already contains are marked
+with the migration's index name. The migration is then applied and every
+statement is explained and timed again, so the report shows what the
+indexes fixed and how much faster each statement got.
+
+Usage:
+    python index_advisor.py [--scale 10] [--seed 1] [--repeat 3] [--analyze] [--json out.json]
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+import mysql.connector
+
+import benchmark
+import bulk_load
+import datagen
+import db_pool
+import search
+from Assignment6 import VIEWS
+from catalog_queries import (
+    MOVIE_PAGE_SQL,
+    MOVIE_SORT_SQL,
+    MUSIC_PAGE_SQL,
+    MUSIC_SORT_SQL,
+    PAGE_SIZE,
+    SORT_LIMIT,
+)
+
+# The list sort and filter rules live with the Tkinter client (no Tk import)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Assignment9"))
+from column_sort import MOVIE_COLUMNS, MUSIC_COLUMNS, Filter, ListView  # noqa: E402
+
+MIGRATION = "AddIndexes.sql"
+MAX_INDEX_COLUMNS = 3
+
+# Album artists are looked up by exact name when an album is saved
+ARTIST_LOOKUP_SQL = "SELECT artist_id FROM Artist WHERE artist_name = %s LIMIT 1"
+
+_CREATE_INDEX = re.compile(
+    r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+(?P<name>\w+)\s+ON\s+`?(?P<table>\w+)`?\s*\((?P<columns>[^)]*)\)",
+    re.IGNORECASE,
+)
+_VIEW_HEAD = re.compile(r"^\s*CREATE\s+(?:OR\s+REPLACE\s+)?VIEW\s+\w+\s+AS\s+", re.IGNORECASE)
+
+# Column references by role; anything that is not a column of the table
+# (numbers, functions, keywords) is dropped when matched against the schema
+_REF = r"(?:`?(\w+)`?\.)?`?(\w+)`?"
+_EQUALITY = (
+    re.compile(_REF + r"\s*(?:<=>|(?<![<>!])=|\bIN\s*\()", re.IGNORECASE),
+    re.compile(r"(?:<=>|(?<![<>!])=)\s*" + _REF, re.IGNORECASE),  # Right side of join keys
+)
+_RANGE = re.compile(_REF + r"\s*(?:<=|>=|<(?!=)|>(?!=)|\bBETWEEN\b|\bLIKE\b)", re.IGNORECASE)
+_ORDERING = re.compile(
+    r"\b(?:ORDER|GROUP)\s+BY\s+(.+?)(?=\bLIMIT\b|\bHAVING\b|\bORDER\s+BY\b|\bUNION\b|\)|;|$)",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def candidate_indexes(path: str = MIGRATION) -> list:
+    """
+    Indexes defined in the migration
+
+    Returns:
+        List of dicts with the index name, table and column list
+    """
+    with open(path, "r") as file:
+        return [
+            {
+                "name": match.group("name"),
+                "table": match.group("table"),
+                "columns": [col.strip(" `") for col in match.group("columns").split(",")],
+            }
+            for match in _CREATE_INDEX.finditer(file.read())
+        ]
+
+
+def collect_statements(seed: int) -> list:
+    """
+    Statements to audit
+
+    Returns:
+        List of (source, label, sql, params)
+    """
+    statements = []
+    for label, sql in benchmark.read_queries("QueryTables.sql"):
+        if sql.lstrip().lower().startswith(("select", "with")):
+            statements.append(("QueryTables.sql", label, sql, None))
+
+    # The view bodies are audited directly so proposals can see their columns
+    for view, sql in VIEWS.items():
+        body = _VIEW_HEAD.sub("", sql).strip().rstrip(";")
+        statements.append(("Assignment6", view, body, None))
+
+    words, _ = datagen.make_vocabulary(random.Random(seed))
+    term = f"{words[0]} {words[1][:4]}"
+    movie_sql, movie_params = search.movie_search(term)
+    music_sql, music_params = search.music_search(term)
+    # Lists sorted by stock, most first, as staff do many times a shift
+    movie_view, music_view = ListView(MOVIE_COLUMNS), ListView(MUSIC_COLUMNS)
+    movie_view.sort = (len(MOVIE_COLUMNS) - 1, True)
+    music_view.sort = (len(MUSIC_COLUMNS) - 1, True)
+    music_view.filter = Filter(year_from=2000)
+    statements += [
+        ("GUI", "Movie list page", MOVIE_PAGE_SQL.format(op=">", direction="ASC"), (0, PAGE_SIZE)),
+        ("GUI", "Music list page", MUSIC_PAGE_SQL.format(op=">", direction="ASC"), (0, PAGE_SIZE)),
+        ("GUI", "Movies by stock", *movie_view.query(MOVIE_SORT_SQL, SORT_LIMIT)),
+        ("GUI", "Albums since 2000 by stock", *music_view.query(MUSIC_SORT_SQL, SORT_LIMIT)),
+        ("GUI", f"Movie search '{term}'", movie_sql, movie_params),
+        ("GUI", f"Music search '{term}'", music_sql, music_params),
+        ("GUI", "Artist lookup by name", ARTIST_LOOKUP_SQL, (words[0].title(),)),
+    ]
+    return statements
+
+
+def explain(conn, sql: str, params=None) -> list:
+    """Rows of the tabular EXPLAIN output, as dicts"""
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("EXPLAIN " + sql, params)
+    plan = cursor.fetchall()
+    cursor.close()
+    return plan
+
+
+def explain_analyze(conn, sql: str, params=None) -> str:
+    """Executed plan with actual row counts and timings (MySQL 8.0.18+)"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("EXPLAIN ANALYZE " + sql, params)
+        return "\n".join(row[0] for row in cursor.fetchall())
+    except mysql.connector.Error as err:
+        return f"EXPLAIN ANALYZE unavailable: {err}"
+    finally:
+        cursor.close()
+
+
+def plan_issues(plan) -> list:
+    """Describe the full scans, filesorts and temporary tables in a plan"""
+    issues = []
+    for row in plan:
+        table = row.get("table")
+        extra = row.get("Extra") or ""
+        if table is None or table.startswith("<"):
+            continue  # Derived tables and UNION results are scanned by design
+        if row.get("type") == "ALL":
+            issues.append(f"full scan of {table} (~{row.get('rows')} rows)")
+        elif row.get("type") == "index":
+            issues.append(f"full index scan of {table} (~{row.get('rows')} rows)")
+        if "Using filesort" in extra:
+            issues.append(f"filesort on {table}")
+        if "Using temporary" in extra:
+            issues.append(f"temporary table for {table}")
+    return issues
+
+
+def table_schema(conn) -> tuple:
+    """
+    Columns, existing index column lists and table names of the current database
+
+    Returns:
+        ({table: {column}}, {table: [[column, ...], ...]}, {table: TableName}),
+        keyed and filled with lowercased names except for TableName
+    """
+    cursor = conn.cursor()
+    cursor.execute(
+        """SELECT TABLE_NAME, LOWER(COLUMN_NAME) FROM information_schema.COLUMNS
+           WHERE TABLE_SCHEMA = DATABASE()"""
+    )
+    columns, names = {}, {}
+    for table, column in cursor.fetchall():
+        columns.setdefault(table.lower(), set()).add(column)
+        names[table.lower()] = table
+    cursor.execute(
+        """SELECT LOWER(TABLE_NAME), INDEX_NAME, LOWER(COLUMN_NAME)
+           FROM information_schema.STATISTICS
+           WHERE TABLE_SCHEMA = DATABASE()
+           ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX"""
+    )
+    indexes = {}
+    for table, name, column in cursor.fetchall():
+        indexes.setdefault((table, name), []).append(column)
+    cursor.close()
+    existing = {}
+    for (table, _), index_columns in indexes.items():
+        existing.setdefault(table, []).append(index_columns)
+    return columns, existing, names
+
+
+def _columns_of(matches, table: str, aliases: dict, columns: set) -> list:
+    """Columns of table among (qualifier, column) matches, in first-seen order"""
+    found = []
+    for qualifier, column in matches:
+        column = column.lower()
+        if column not in columns or column in found:
+            continue
+        if qualifier and aliases.get(qualifier.lower(), qualifier.lower()) != table:
+            continue
+        found.append(column)
+    return found
+
+
+def _ordering_refs(sql: str) -> list:
+    refs = []
+    for clause in _ORDERING.findall(sql):
+        for item in clause.split(","):
+            match = re.match(r"\s*" + _REF, item)
+            if match:
+                refs.append(match.groups())
+    return refs
+
+
+def _covers(index_columns, columns) -> bool:
+    """Whether one column list is a leading part of the other"""
+    shorter = min(len(index_columns), len(columns))
+    return [c.lower() for c in index_columns[:shorter]] == list(columns[:shorter])
+
+
+def propose(sql: str, plan, schema, migration) -> list:
+    """
+    Derive indexes for the tables a plan scans or sorts without one
+
+    Each flagged table gets one index from the statement's references to
+    its columns: equality filters and join keys, then the ORDER BY / GROUP
+    BY keys when the table was filesorted, then one range filter, at most
+    MAX_INDEX_COLUMNS columns. Indexes that an existing index already
+    starts with are not proposed.
+
+    Args:
+        sql: The audited statement
+        plan: Its EXPLAIN rows
+        schema: table_schema() of the database the plan came from
+        migration: candidate_indexes() of AddIndexes.sql, used only to name
+            proposals the migration already contains
+
+    Returns:
+        List of dicts with table, columns, reason, ddl and migration (the
+        AddIndexes.sql index name, or None)
+    """
+    table_columns, existing, names = schema
+    aliases = {
+        alias: table for table, names in _table_aliases(sql).items() for alias in names
+    }
+    equality = [ref for pattern in _EQUALITY for ref in pattern.findall(sql)]
+    ranges = _RANGE.findall(sql)
+    ordering = _ordering_refs(sql)
+
+    proposals, seen = [], set()
+    for row in plan:
+        name = row.get("table")
+        extra = row.get("Extra") or ""
+        if not name or name.startswith("<"):
+            continue
+        table = aliases.get(name.lower(), name.lower())
+        columns = table_columns.get(table)
+        scanned = row.get("type") in ("ALL", "index")
+        sorted_here = "Using filesort" in extra or "Using temporary" in extra
+        if not columns or not (scanned or sorted_here):
+            continue
+
+        keys = _columns_of(equality, table, aliases, columns)
+        reasons = ["filter/join on " + ", ".join(keys)] if keys else []
+        if sorted_here:
+            sort = [c for c in _columns_of(ordering, table, aliases, columns) if c not in keys]
+            if sort:
+                keys += sort
+                reasons.append("sort/group by " + ", ".join(sort))
+        bounded = [c for c in _columns_of(ranges, table, aliases, columns) if c not in keys]
+        if bounded:
+            keys.append(bounded[0])
+            reasons.append(f"range on {bounded[0]}")
+        keys = keys[:MAX_INDEX_COLUMNS]
+        if not keys or (table, tuple(keys)) in seen:
+            continue
+        seen.add((table, tuple(keys)))
+        if any(index[: len(keys)] == keys for index in existing.get(table, [])):
+            continue
+
+        in_migration = next(
+            (
+                index["name"]
+                for index in migration
+                if index["table"].lower() == table and _covers(index["columns"], keys)
+            ),
+            None,
+        )
+        proposals.append(
+            {
+                "table": table,
+                "columns": keys,
+                "reason": "; ".join(reasons),
+                "ddl": f"CREATE INDEX idx_{table}_{'_'.join(keys)} ON `{names[table]}` ({', '.join(keys)})",
+                "migration": in_migration,
+            }
+        )
+    return proposals
+
+
+def _table_aliases(sql: str) -> dict:
+    """Map table names to the aliases EXPLAIN reports for them"""
+    aliases = {}
+    pattern = r"\b(?:from|join)\s+`?(\w+)`?(?:\s+(?:as\s+)?(?!(?:on|join|where|left|right|inner|cross|group|order|having|limit|union)\b)(\w+))?"
+    for table, alias in re.findall(pattern, sql, re.IGNORECASE):
+        aliases.setdefault(table.lower(), set()).add((alias or table).lower())
+    return aliases
+
+
+def audit(conn, statements, repeat: int, migration, analyze: bool = False) -> list:
+    """Explain and time every statement, proposing indexes for flagged ones"""
+    schema = table_schema(conn)
+    results = []
+    for source, label, sql, params in statements:
+        entry = {"source": source, "query": label}
+        try:
+            plan = explain(conn, sql, params)
+        except mysql.connector.Error as err:
+            entry["error"] = str(err)
+            results.append(entry)
+            continue
+        entry["issues"] = plan_issues(plan)
+        entry["proposals"] = propose(sql, plan, schema, migration) if entry["issues"] else []
+        entry["keys"] = sorted({row["key"] for row in plan if row.get("key")})
+        entry.update(benchmark.time_query(conn, sql, repeat, params))
+        if analyze and entry["issues"]:
+            entry["explain_analyze"] = explain_analyze(conn, sql, params)
+        results.append(entry)
+    return results
+
+
+def create_views(conn):
+    """Create the QueryTables.sql views read by its later statements"""
+    cursor = conn.cursor()
+    for _, sql in benchmark.read_queries("QueryTables.sql"):
+        if re.match(r"\s*CREATE\s", sql, re.IGNORECASE):
+            try:
+                cursor.execute(sql)
+            except mysql.connector.Error as err:
+                print(f"Warning: {err}")
+    cursor.close()
+
+
+def run(scale: float, seed: int, repeat: int, analyze: bool = False, local_infile: bool = True) -> list:
+    """
+    Audit every statement before and after the migration
+
+    Returns:
+        One dict per statement with "before" and "after" audits
+    """
+    migration = candidate_indexes()
+    statements = collect_statements(seed)
+
+    with db_pool.get_pool(False).get_connection() as conn:
+        benchmark.build_schema(conn, indexes=False)
+
+    pool = db_pool.get_pool(True, database=benchmark.BENCH_DATABASE, allow_local_infile=local_infile)
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            files = datagen.generate(directory, scale, seed)
+            with pool.get_connection() as conn:
+                datagen.load(conn, files, local_infile)
+
+        with pool.get_connection() as conn:
+            benchmark.analyze(conn, files)
+            create_views(conn)
+            before = audit(conn, statements, repeat, migration, analyze)
+
+            bulk_load.execute_script(conn, MIGRATION)
+            benchmark.analyze(conn, files)
+            after = audit(conn, statements, repeat, migration)
+    finally:
+        with db_pool.get_pool(False).get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"DROP DATABASE IF EXISTS {benchmark.BENCH_DATABASE}")
+            cursor.close()
+
+    report = []
+    for old, new in zip(before, after):
+        entry = {"source": old["source"], "query": old["query"], "before": old, "after": new}
+        if old.get("median_ms") and new.get("median_ms"):
+            entry["speedup"] = round(old["median_ms"] / new["median_ms"], 2)
+        report.append(entry)
+    return report
+
+
+def print_report(report):
+    for entry in report:
+        before, after = entry["before"], entry["after"]
+        print(f"\n[{entry['source']}] {entry['query']}")
+        if "error" in before:
+            print(f"  error: {before['error']}")
+            continue
+        for issue in before["issues"]:
+            print(f"  ! {issue}")
+        for proposal in before["proposals"]:
+            known = f", AddIndexes.sql: {proposal['migration']}" if proposal["migration"] else ""
+            print(f"  + {proposal['ddl']}  ({proposal['reason']}{known})")
+        print(
+            f"  {before['median_ms']} ms -> {after.get('median_ms')} ms"
+            f" ({entry.get('speedup', '?')}x), keys now: {', '.join(after.get('keys', [])) or 'none'}"
+        )
+        for issue in after.get("issues", []):
+            print(f"  still: {issue}")
+        if before.get("explain_analyze"):
+            print("  " + before["explain_analyze"].replace("\n", "\n  "))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=float, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--analyze", action="store_true",
+                        help="Include EXPLAIN ANALYZE output for flagged statements")
+    parser.add_argument("--no-local-infile", action="store_true")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    report = run(args.scale, args.seed, args.repeat, args.analyze, not args.no_local_infile)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(report, file, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    main()
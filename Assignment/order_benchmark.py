@@ -0,0 +1,252 @@
+"""
+Concurrency benchmark for order placement
+
+Simulates a release-day rush: parallel clients place small orders that
+mostly include one of a few hot products with limited stock. For each
+client count the benchmark reports orders per second, out-of-stock
+rejections, deadlock retries and how many units were sold beyond the
+stock that existed (oversell), for orders.place_order and for a naive
+read-then-write path without stock conditions.
+
+Usage:
+    python order_benchmark.py [--clients 1 2 4 8 16 32] [--orders 200] [--json out.json]
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+
+import mysql.connector
+
+import benchmark
+import db_pool
+import orders
+from orders import CartItem
+
+CUSTOMERS = 1000
+PRODUCTS = 1000  # Movies and albums with ample stock
+HOT_PRODUCTS = 3  # Release-day movies (the first movie ids)
+HOT_STOCK = 300  # Copies of each hot movie per round
+PLENTY = 1_000_000
+HOT_SHARE = 0.8  # Fraction of orders that include a hot movie
+PAYMENT_METHODS = ("CREDIT_CARD", "PAYPAL", "DEBIT_CARD")
+
+
+def place_order_naive(conn, customer_id, items, payment_method=None) -> int:
+    """Check stock with a plain SELECT, then write; what a quick script would do"""
+    cart = orders.merge_cart(items)
+    cursor = conn.cursor()
+    try:
+        for kind, key, quantity, _ in cart:
+            table, key_column = orders.PRODUCTS[kind]
+            cursor.execute(f"SELECT stock_count FROM {table} WHERE {key_column} = %s", (key,))
+            row = cursor.fetchone()
+            available = row[0] if row else None
+            if (available or 0) < quantity:
+                raise orders.OutOfStock([(kind, key, quantity, available)])
+        for kind, key, quantity, _ in cart:
+            table, key_column = orders.PRODUCTS[kind]
+            cursor.execute(
+                f"UPDATE {table} SET stock_count = stock_count - %s WHERE {key_column} = %s",
+                (quantity, key),
+            )
+        total = sum(item.quantity * item.price_each for item in cart)
+        cursor.execute(
+            "INSERT INTO `Order` (customer_id, total_amount) VALUES (%s, %s)",
+            (customer_id, total),
+        )
+        order_id = cursor.lastrowid
+        for item in cart:
+            cursor.execute(
+                """INSERT INTO OrderItem (order_id, product_type, product_id, quantity, price_each)
+                   VALUES (%s, %s, %s, %s, %s)""",
+                (order_id, *item),
+            )
+        if payment_method is not None:
+            cursor.execute(
+                "INSERT INTO Payment (order_id, payment_method, amount) VALUES (%s, %s, %s)",
+                (order_id, payment_method, total),
+            )
+        conn.commit()
+        return order_id
+    except (orders.OutOfStock, mysql.connector.Error):
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def make_cart(rng) -> list:
+    items = []
+    if rng.random() < HOT_SHARE:
+        items.append(CartItem("MOVIE", rng.randint(1, HOT_PRODUCTS), rng.choice((1, 1, 2)), "19.99"))
+    for _ in range(rng.choice((0, 1, 2))):
+        kind = rng.choice(("MOVIE", "ALBUM"))
+        low = HOT_PRODUCTS + 1 if kind == "MOVIE" else 1
+        items.append(CartItem(kind, rng.randint(low, PRODUCTS), 1, "9.99"))
+    return items or [CartItem("ALBUM", rng.randint(1, PRODUCTS), 1, "9.99")]
+
+
+def prepare(conn):
+    """Customers and products of the scratch database"""
+    cursor = conn.cursor()
+    cursor.executemany(
+        "INSERT INTO Customer (first_name, last_name, email, join_date) VALUES (%s, %s, %s, CURDATE())",
+        [("Bench", f"Customer{i}", f"bench{i}@example.com") for i in range(CUSTOMERS)],
+    )
+    cursor.executemany(
+        "INSERT INTO Movie (title, runtime_minutes, stock_count) VALUES (%s, 100, 0)",
+        [(f"Movie {i}",) for i in range(PRODUCTS)],
+    )
+    cursor.executemany(
+        "INSERT INTO MusicAlbum (title, stock_count) VALUES (%s, 0)",
+        [(f"Album {i}",) for i in range(PRODUCTS)],
+    )
+    conn.commit()
+    cursor.close()
+
+
+def restock(conn):
+    cursor = conn.cursor()
+    cursor.execute(
+        "UPDATE Movie SET stock_count = IF(movie_id <= %s, %s, %s)", (HOT_PRODUCTS, HOT_STOCK, PLENTY)
+    )
+    cursor.execute("UPDATE MusicAlbum SET stock_count = %s", (PLENTY,))
+    cursor.execute("SELECT IFNULL(MAX(order_id), 0) FROM `Order`")
+    last_order = cursor.fetchone()[0]
+    conn.commit()
+    cursor.close()
+    return last_order
+
+
+def oversold(conn, after_order: int) -> tuple:
+    """(hot units sold, units sold beyond HOT_STOCK) in orders after after_order"""
+    cursor = conn.cursor()
+    cursor.execute(
+        """SELECT product_id, SUM(quantity) FROM OrderItem
+           WHERE order_id > %s AND product_type = 'MOVIE' AND product_id <= %s
+           GROUP BY product_id""",
+        (after_order, HOT_PRODUCTS),
+    )
+    sold = dict(cursor.fetchall())
+    cursor.close()
+    return (
+        int(sum(sold.values())),
+        int(sum(max(0, units - HOT_STOCK) for units in sold.values())),
+    )
+
+
+def run_round(pool, place, clients: int, per_client: int, seed: int) -> dict:
+    with pool.get_connection() as conn:
+        last_order = restock(conn)
+
+    counts = {"placed": 0, "out_of_stock": 0, "retries": 0, "errors": 0}
+    lock = threading.Lock()
+
+    def count(name):
+        with lock:
+            counts[name] += 1
+
+    # Only place_order retries; the naive path gives up on the first deadlock
+    extra = {}
+    if place is orders.place_order:
+        extra["on_retry"] = lambda err, attempt: count("retries")
+
+    def client(number):
+        rng = random.Random(seed * 1000 + number)
+        with pool.get_connection() as conn:
+            for _ in range(per_client):
+                try:
+                    place(
+                        conn,
+                        rng.randint(1, CUSTOMERS),
+                        make_cart(rng),
+                        payment_method=rng.choice(PAYMENT_METHODS),
+                        **extra,
+                    )
+                    count("placed")
+                except orders.OutOfStock:
+                    count("out_of_stock")
+                except mysql.connector.Error:
+                    count("errors")
+
+    threads = [
+        threading.Thread(target=client, args=(number,)) for number in range(clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+
+    with pool.get_connection() as conn:
+        sold, over = oversold(conn, last_order)
+    return {
+        "mode": "naive" if place is place_order_naive else "reserved",
+        "clients": clients,
+        **counts,
+        "seconds": round(seconds, 3),
+        "orders_per_second": round(counts["placed"] / seconds, 1) if seconds else 0,
+        "hot_units_sold": sold,
+        "oversold_units": over,
+        "oversell_rate": round(over / sold, 4) if sold else 0,
+    }
+
+
+def run(client_counts, per_client: int, seed: int) -> list:
+    with db_pool.get_pool(False).get_connection() as conn:
+        benchmark.build_schema(conn)
+
+    pool = db_pool.get_pool(
+        True, database=benchmark.BENCH_DATABASE, pool_size=max(client_counts) + 1
+    )
+    results = []
+    try:
+        with pool.get_connection() as conn:
+            prepare(conn)
+        for clients in sorted(client_counts):
+            for place in (place_order_naive, orders.place_order):
+                results.append(run_round(pool, place, clients, per_client, seed))
+    finally:
+        with db_pool.get_pool(False).get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"DROP DATABASE IF EXISTS {benchmark.BENCH_DATABASE}")
+            cursor.close()
+    return results
+
+
+def print_results(results):
+    header = (
+        f"{'clients':>7} {'mode':<9} {'orders/s':>9} {'placed':>7} {'no stock':>9} "
+        f"{'retries':>8} {'errors':>7} {'oversold':>9} {'oversell':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['clients']:>7} {r['mode']:<9} {r['orders_per_second']:>9} {r['placed']:>7} "
+            f"{r['out_of_stock']:>9} {r['retries']:>8} {r['errors']:>7} "
+            f"{r['oversold_units']:>9} {r['oversell_rate']:>9.2%}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--orders", type=int, default=200, help="Orders attempted per client")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    results = run(args.clients, args.orders, args.seed)
+    print_results(results)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Order placement with concurrent stock reservation
+
+place_order turns a cart into an Order with its OrderItem and Payment
+rows and takes the items out of stock, all in one short transaction.
+Stock is reserved with conditional UPDATEs (stock_count >= quantity), so
+two clients racing for the last copy cannot both get it and nobody waits
+on a lock for longer than one row update. Items are reserved in a fixed
+order to keep concurrent orders from deadlocking each other; when InnoDB
+still picks a victim the whole transaction is retried with backoff.
+"""
+
+import random
+import time
+from collections import namedtuple
+from decimal import Decimal, InvalidOperation
+
+import mysql.connector
+
+# Product type -> (table, key column)
+PRODUCTS = {
+    "MOVIE": ("Movie", "movie_id"),
+    "ALBUM": ("MusicAlbum", "album_id"),
+}
+
+MAX_RETRIES = 5
+BACKOFF_SECONDS = 0.01  # First retry delay; doubled per attempt, with jitter
+_RETRYABLE = {1205, 1213}  # ER_LOCK_WAIT_TIMEOUT, ER_LOCK_DEADLOCK
+
+CartItem = namedtuple("CartItem", "product_type product_id quantity price_each")
+
+
+class OutOfStock(Exception):
+    """Raised when some cart items cannot be reserved; nothing is changed"""
+
+    def __init__(self, missing):
+        """
+        Args:
+            missing: List of (product_type, product_id, requested, available);
+                available is None for products that do not exist
+        """
+        self.missing = missing
+        super().__init__(
+            "Not enough stock for "
+            + ", ".join(
+                f"{kind} {key} ({requested} requested, {available or 0} available)"
+                for kind, key, requested, available in missing
+            )
+        )
+
+
+def merge_cart(items) -> list:
+    """
+    Combine repeated products and sort the cart into lock order
+
+    Args:
+        items: Iterable of CartItem (or equivalent tuples)
+
+    Returns:
+        CartItems sorted by product type and id, one per product
+
+    Raises:
+        ValueError: For unknown product types, non-positive quantities,
+            invalid prices or the same product at two prices
+    """
+    merged = {}
+    for kind, key, quantity, price in items:
+        if kind not in PRODUCTS:
+            raise ValueError(f"Unknown product type {kind!r}")
+        if quantity <= 0:
+            raise ValueError(f"Quantity of {kind} {key} must be positive")
+        try:
+            price = Decimal(str(price))
+        except InvalidOperation:
+            raise ValueError(f"Invalid price {price!r} for {kind} {key}") from None
+        previous = merged.get((kind, key))
+        if previous is not None:
+            if previous.price_each != price:
+                raise ValueError(f"{kind} {key} is in the cart at two prices")
+            quantity += previous.quantity
+        merged[(kind, key)] = CartItem(kind, key, quantity, price)
+    return [merged[key] for key in sorted(merged)]
+
+
+def _missing(cursor, cart) -> list:
+    """Cart items the current stock cannot cover"""
+    missing = []
+    for kind in PRODUCTS:
+        items = [item for item in cart if item.product_type == kind]
+        if not items:
+            continue
+        table, key_column = PRODUCTS[kind]
+        cursor.execute(
+            f"SELECT {key_column}, stock_count FROM {table} "
+            f"WHERE {key_column} IN ({', '.join(['%s'] * len(items))})",
+            [item.product_id for item in items],
+        )
+        stock = dict(cursor.fetchall())
+        missing += [
+            (kind, item.product_id, item.quantity, stock.get(item.product_id))
+            for item in items
+            if stock.get(item.product_id, 0) < item.quantity
+        ]
+    return missing
+
+
+def _place(cursor, customer_id, cart, payment_method, status) -> int:
+    # Reserve first: a conditional UPDATE that matches no row means the
+    # product is (or just went) out of stock
+    cursor.execute("SAVEPOINT reserve")
+    for kind in PRODUCTS:
+        items = [item for item in cart if item.product_type == kind]
+        if not items:
+            continue
+        table, key_column = PRODUCTS[kind]
+        cursor.executemany(
+            f"""UPDATE {table} SET stock_count = stock_count - %s
+                WHERE {key_column} = %s AND stock_count >= %s""",
+            [(item.quantity, item.product_id, item.quantity) for item in items],
+        )
+        if cursor.rowcount < len(items):
+            # Put back what this cart already took, so the shortfall is
+            # measured against the stock without it
+            cursor.execute("ROLLBACK TO SAVEPOINT reserve")
+            raise OutOfStock(_missing(cursor, cart))
+
+    total = sum(item.quantity * item.price_each for item in cart)
+    cursor.execute(
+        "INSERT INTO `Order` (customer_id, order_status, total_amount) VALUES (%s, %s, %s)",
+        (customer_id, status, total),
+    )
+    order_id = cursor.lastrowid
+    cursor.executemany(
+        """INSERT INTO OrderItem (order_id, product_type, product_id, quantity, price_each)
+           VALUES (%s, %s, %s, %s, %s)""",
+        [(order_id, *item) for item in cart],
+    )
+    if payment_method is not None:
+        cursor.execute(
+            "INSERT INTO Payment (order_id, payment_method, amount) VALUES (%s, %s, %s)",
+            (order_id, payment_method, total),
+        )
+    return order_id
+
+
+def place_order(
+    conn,
+    customer_id: int,
+    items,
+    payment_method: str = None,
+    status: str = "PENDING",
+    retries: int = MAX_RETRIES,
+    on_retry=None,
+) -> int:
+    """
+    Reserve the cart's stock and record the order in one transaction
+
+    Args:
+        conn: Database connection (its open transaction is committed)
+        customer_id: Ordering customer
+        items: Iterable of CartItem
+        payment_method: Records a Payment for the full amount if given
+        status: order_status of the new order
+        retries: Attempts after a deadlock or lock wait timeout
+        on_retry: Called with (error, attempt) before each retry
+
+    Returns:
+        The new order_id
+
+    Raises:
+        OutOfStock: If any item cannot be reserved (nothing is written)
+        ValueError: For an invalid cart
+        mysql.connector.Error: On other database errors, or when the
+            retries are used up
+    """
+    cart = merge_cart(items)
+    if not cart:
+        raise ValueError("The cart is empty")
+
+    attempt = 0
+    while True:
+        cursor = conn.cursor()
+        try:
+            order_id = _place(cursor, customer_id, cart, payment_method, status)
+            conn.commit()
+            return order_id
+        except OutOfStock:
+            conn.rollback()
+            raise
+        except mysql.connector.Error as err:
+            conn.rollback()
+            if err.errno not in _RETRYABLE or attempt >= retries:
+                raise
+            attempt += 1
+            if on_retry is not None:
+                on_retry(err, attempt)
+            time.sleep(BACKOFF_SECONDS * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+        finally:
+            cursor.close()
@@ -0,0 +1,432 @@
+"""
+Timings, row counts and a slow-query log for every database call
+
+db_pool wraps each cursor it hands out in an InstrumentedCursor, so every
+statement run on a pooled connection is recorded here without changes at
+the call sites:
+
+- a latency histogram, rows returned or changed, and errors per statement
+  fingerprint (the SQL with literals and placeholders replaced by ?)
+- the time spent waiting for a pooled connection
+- the same figures per screen, i.e. the menu option or GUI action that ran
+  the statement (see screen())
+
+Statements slower than SLOW_QUERY_MS, and failed ones, are written to the
+slow-query log. snapshot() returns everything as a dict; format_snapshot()
+and to_json() render it for the CLI, the GUI or an incident report.
+"""
+
+import json
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+import mysql.connector
+
+SLOW_QUERY_MS = 200.0  # Statements at least this slow go to the slow-query log
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+MAX_FINGERPRINTS = 500  # Further distinct statements are counted as "(other)"
+FINGERPRINT_CHARS = 2000  # Only this much of a statement is normalized
+LOG_SQL_CHARS = 1000  # Statement text kept per slow-query log line
+SLOW_LOG_PATH = "slow_queries.log"  # Used by the entry points unless overridden
+
+# Silent until an entry point calls configure()
+slow_log = logging.getLogger("moviemusicstore.slow_queries")
+slow_log.addHandler(logging.NullHandler())
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER = re.compile(r"(?<![\w$.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?(?![\w$])")
+_PLACEHOLDER = re.compile(r"%s|%\(\w+\)s")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_ROWS = re.compile(r"\(\?\+\)(?:\s*,\s*\(\?\+\))+")
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql: str) -> str:
+    """
+    Statement shape shared by every execution of the same query
+
+    Literals and placeholders become ?, value lists become (?+) and
+    multi-row VALUES lists a single (?+) ..., so batched inserts of any
+    size share one fingerprint.
+    """
+    if len(sql) <= FINGERPRINT_CHARS:
+        return _normalize(sql)
+    # Long statements are batched inserts; their text is not cached
+    text = _normalize.__wrapped__(sql[:FINGERPRINT_CHARS])
+    rows = text.find("(?+) ...")
+    return text[: rows + len("(?+) ...")] if rows >= 0 else text + " ..."
+
+
+@lru_cache(maxsize=1024)
+def _normalize(sql: str) -> str:
+    text = _STRING.sub("?", sql)
+    text = _PLACEHOLDER.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    text = _LIST.sub("(?+)", text)
+    text = _ROWS.sub("(?+) ...", text)
+    return _SPACE.sub(" ", text).strip().rstrip(";").strip()
+
+
+class Histogram:
+    """Latency counts in fixed millisecond buckets"""
+
+    __slots__ = ("counts", "count", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)  # Last bucket: slower than all
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms: float):
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                break
+        else:
+            i = len(BUCKETS_MS)
+        self.counts[i] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of samples"""
+        if not self.count:
+            return 0.0
+        wanted = fraction * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= wanted and count:
+                return min(BUCKETS_MS[i], self.max_ms) if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def as_dict(self) -> dict:
+        labels = [f"<={bound}ms" for bound in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile(0.50), 3),
+            "p95_ms": round(self.percentile(0.95), 3),
+            "p99_ms": round(self.percentile(0.99), 3),
+            "max_ms": round(self.max_ms, 3),
+            "buckets": {label: n for label, n in zip(labels, self.counts) if n},
+        }
+
+
+class _StatementStats:
+    __slots__ = ("latency", "rows", "errors", "screens")
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.rows = 0
+        self.errors = 0
+        self.screens = {}  # screen -> executions
+
+
+class _ScreenStats:
+    __slots__ = ("latency", "checkout", "rows", "errors")
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.checkout = Histogram()
+        self.rows = 0
+        self.errors = 0
+
+
+_lock = threading.Lock()
+_statements = {}  # fingerprint -> _StatementStats
+_screens = {}  # screen -> _ScreenStats
+_checkout = Histogram()
+_local = threading.local()
+
+
+def configure(slow_ms: float = None, log_path: str = None):
+    """
+    Set the slow-query threshold and where the slow-query log goes
+
+    Args:
+        slow_ms: Threshold in milliseconds
+        log_path: File the log is appended to ("-" for stderr)
+    """
+    global SLOW_QUERY_MS
+    if slow_ms is not None:
+        SLOW_QUERY_MS = float(slow_ms)
+    if log_path:
+        for old in slow_log.handlers[:]:
+            if not isinstance(old, logging.NullHandler):
+                slow_log.removeHandler(old)
+                old.close()
+        if log_path == "-":
+            handler = logging.StreamHandler()
+        else:
+            handler = logging.FileHandler(log_path, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        slow_log.addHandler(handler)
+        slow_log.propagate = False
+
+
+@contextmanager
+def screen(name: str):
+    """Attribute the statements run by this thread inside the block to name"""
+    previous = getattr(_local, "screen", None)
+    _local.screen = name
+    try:
+        yield
+    finally:
+        _local.screen = previous
+
+
+def current_screen() -> str:
+    return getattr(_local, "screen", None) or "(none)"
+
+
+def _screen_stats(name: str) -> _ScreenStats:
+    stats = _screens.get(name)
+    if stats is None:
+        stats = _screens[name] = _ScreenStats()
+    return stats
+
+
+def record(sql: str, seconds: float, rows: int = 0, error=None):
+    """
+    Record one statement execution
+
+    Args:
+        sql: Statement text
+        seconds: Time from execute until the last row was read
+        rows: Rows returned (SELECT) or changed (DML)
+        error: The mysql error if the statement failed
+    """
+    ms = seconds * 1000
+    key = fingerprint(sql)
+    name = current_screen()
+    with _lock:
+        stats = _statements.get(key)
+        if stats is None:
+            if len(_statements) >= MAX_FINGERPRINTS:
+                key = "(other)"
+                stats = _statements.get(key)
+            if stats is None:
+                stats = _statements[key] = _StatementStats()
+        stats.latency.add(ms)
+        stats.rows += rows
+        stats.errors += error is not None
+        stats.screens[name] = stats.screens.get(name, 0) + 1
+
+        per_screen = _screen_stats(name)
+        per_screen.latency.add(ms)
+        per_screen.rows += rows
+        per_screen.errors += error is not None
+
+    if error is not None:
+        slow_log.warning(
+            "FAILED %.1f ms screen=%s error=%s sql=%s", ms, name, error, sql[:LOG_SQL_CHARS]
+        )
+    elif ms >= SLOW_QUERY_MS:
+        slow_log.warning(
+            "SLOW %.1f ms rows=%d screen=%s sql=%s", ms, rows, name, sql[:LOG_SQL_CHARS]
+        )
+
+
+def record_checkout(seconds: float):
+    """Record the time spent waiting for a pooled connection"""
+    ms = seconds * 1000
+    with _lock:
+        _checkout.add(ms)
+        _screen_stats(current_screen()).checkout.add(ms)
+
+
+def reset():
+    """Forget everything recorded so far"""
+    global _checkout
+    with _lock:
+        _statements.clear()
+        _screens.clear()
+        _checkout = Histogram()
+
+
+def snapshot() -> dict:
+    """
+    Everything recorded so far
+
+    Returns:
+        Dictionary with the slow-query threshold, connection checkout
+        latencies, and per-screen and per-statement figures (slowest
+        total first)
+    """
+    with _lock:
+        statements = [
+            {
+                "fingerprint": key,
+                **stats.latency.as_dict(),
+                "rows": stats.rows,
+                "errors": stats.errors,
+                "screens": dict(stats.screens),
+            }
+            for key, stats in _statements.items()
+        ]
+        screens = [
+            {
+                "screen": name,
+                **stats.latency.as_dict(),
+                "rows": stats.rows,
+                "errors": stats.errors,
+                "checkout": stats.checkout.as_dict(),
+            }
+            for name, stats in _screens.items()
+        ]
+        checkout = _checkout.as_dict()
+    return {
+        "taken_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "slow_query_ms": SLOW_QUERY_MS,
+        "checkout": checkout,
+        "screens": sorted(screens, key=lambda s: s["total_ms"], reverse=True),
+        "statements": sorted(statements, key=lambda s: s["total_ms"], reverse=True),
+    }
+
+
+def to_json(snap: dict = None) -> str:
+    return json.dumps(snap or snapshot(), indent=2)
+
+
+def format_snapshot(snap: dict = None, top: int = 20) -> str:
+    """Human readable summary: checkout wait, screens, slowest statements"""
+    snap = snap or snapshot()
+    checkout = snap["checkout"]
+    lines = [
+        f"Connection checkout: {checkout['count']} waits, "
+        f"mean {checkout['mean_ms']} ms, p95 {checkout['p95_ms']} ms, "
+        f"max {checkout['max_ms']} ms",
+        "",
+        f"{'screen':<40} {'calls':>7} {'total ms':>10} {'p95 ms':>8} {'rows':>9} {'errors':>6} {'wait ms':>8}",
+    ]
+    for s in snap["screens"]:
+        lines.append(
+            f"{s['screen'][:40]:<40} {s['count']:>7} {s['total_ms']:>10.1f} {s['p95_ms']:>8.1f} "
+            f"{s['rows']:>9} {s['errors']:>6} {s['checkout']['total_ms']:>8.1f}"
+        )
+    lines += [
+        "",
+        f"{'calls':>7} {'total ms':>10} {'mean ms':>8} {'p95 ms':>8} {'max ms':>8} {'rows':>9} {'errors':>6}  statement",
+    ]
+    for s in snap["statements"][:top]:
+        lines.append(
+            f"{s['count']:>7} {s['total_ms']:>10.1f} {s['mean_ms']:>8.2f} {s['p95_ms']:>8.1f} "
+            f"{s['max_ms']:>8.1f} {s['rows']:>9} {s['errors']:>6}  {s['fingerprint'][:100]}"
+        )
+    if len(snap["statements"]) > top:
+        lines.append(f"... {len(snap['statements']) - top} more statements")
+    lines.append(f"Slow-query threshold: {snap['slow_query_ms']} ms")
+    return "\n".join(lines)
+
+
+class InstrumentedCursor:
+    """
+    Cursor proxy recording each statement once its result has been read
+
+    The time of a SELECT runs from execute until fetchall, or until a
+    fetch returns no more rows, so streamed results are measured in full.
+    Given the cursor's connection, a result is also recorded as soon as
+    its last row is fetched (the prepared cursors of the statement cache
+    read one row ahead), so a single fetchone() of a lookup is enough.
+    """
+
+    def __init__(self, cursor, connection=None):
+        """
+        Args:
+            cursor: Cursor to wrap
+            connection: Connection of an unbuffered cursor; its unread_result
+                tells when the result has been read to the end
+        """
+        self._cursor = cursor
+        self._connection = connection
+        self._pending = None  # [sql, start, rows] of a result still being read
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def _flush(self):
+        if self._pending is not None:
+            sql, start, rows = self._pending
+            self._pending = None
+            record(sql, time.perf_counter() - start, rows)
+
+    def _read(self, count: int):
+        self._pending[2] += count
+        if self._connection is not None and not self._connection.unread_result:
+            self._flush()
+
+    def started(self, sql: str, start: float):
+        """Account for a statement already executed on the cursor"""
+        self._flush()
+        if self._cursor.with_rows:
+            self._pending = [sql, start, 0]
+        else:
+            record(sql, time.perf_counter() - start, max(self._cursor.rowcount, 0))
+        return self
+
+    def _run(self, method, sql, *args, **kwargs):
+        self._flush()
+        start = time.perf_counter()
+        try:
+            result = method(sql, *args, **kwargs)
+        except mysql.connector.Error as err:
+            record(sql, time.perf_counter() - start, error=err)
+            raise
+        self.started(sql, start)
+        return result
+
+    def execute(self, sql, *args, **kwargs):
+        return self._run(self._cursor.execute, sql, *args, **kwargs)
+
+    def executemany(self, sql, *args, **kwargs):
+        return self._run(self._cursor.executemany, sql, *args, **kwargs)
+
+    def callproc(self, name, *args, **kwargs):
+        self._flush()
+        start = time.perf_counter()
+        try:
+            result = self._cursor.callproc(name, *args, **kwargs)
+        except mysql.connector.Error as err:
+            record(f"CALL {name}", time.perf_counter() - start, error=err)
+            raise
+        record(f"CALL {name}", time.perf_counter() - start)
+        return result
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        if self._pending is not None:
+            self._pending[2] += len(rows)
+            self._flush()
+        return rows
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        if self._pending is not None:
+            if rows:
+                self._read(len(rows))
+            else:
+                self._flush()
+        return rows
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if self._pending is not None:
+            if row is None:
+                self._flush()
+            else:
+                self._read(1)
+        return row
+
+    def close(self):
+        self._flush()
+        return self._cursor.close()
@@ -0,0 +1,163 @@
+"""
+Streaming output of query results
+
+Rows are pulled from the cursor in batches with fetchmany, so a result is
+printed as it arrives and never held in memory as a whole. Table output
+sizes each column from the header and a sample of the first rows, and
+pauses after every screenful when writing to a terminal. CSV and JSON
+lines output are meant for piping into other tools.
+"""
+
+import csv
+import datetime
+import decimal
+import itertools
+import json
+import shutil
+import sys
+
+FETCH_BATCH = 500  # Rows per fetchmany call
+SAMPLE_ROWS = 200  # Rows inspected to size the table columns
+MIN_WIDTH = 4
+MAX_WIDTH = 40  # Longer values are cut and end with ELLIPSIS
+ELLIPSIS = "..."
+FORMATS = ("table", "csv", "jsonl")
+
+
+def iter_rows(cursor, batch_size: int = FETCH_BATCH):
+    """Yield the rows of a result, fetching batch_size rows at a time"""
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield from rows
+
+
+def _drain(cursor, batch_size: int = FETCH_BATCH):
+    """Discard unread rows so the connection can run the next statement"""
+    for _ in iter_rows(cursor, batch_size):
+        pass
+
+
+def _text(value) -> str:
+    return "NULL" if value is None else str(value)
+
+
+def _cell(value: str, width: int) -> str:
+    if len(value) > width:
+        value = value[: width - len(ELLIPSIS)] + ELLIPSIS
+    return value.ljust(width)
+
+
+def column_widths(columns, sample) -> list:
+    """Width of each column from its header and the sampled values"""
+    widths = []
+    for i, column in enumerate(columns):
+        longest = max([len(column)] + [len(_text(row[i])) for row in sample])
+        widths.append(min(MAX_WIDTH, max(MIN_WIDTH, longest)))
+    return widths
+
+
+def _page_size(out) -> int:
+    """Rows per screen, or 0 when out is not an interactive terminal"""
+    if not (out.isatty() and sys.stdin.isatty()):
+        return 0
+    return max(5, shutil.get_terminal_size().lines - 5)
+
+
+def write_table(cursor, out=None, page_size=None) -> int:
+    """
+    Print a result as an aligned text table
+
+    Args:
+        cursor: Cursor holding an unread result
+        out: Output stream (default stdout)
+        page_size: Rows per screen before pausing; default is the
+            terminal height, and 0 disables paging
+
+    Returns:
+        Number of rows printed
+    """
+    out = out or sys.stdout
+    if page_size is None:
+        page_size = _page_size(out)
+    columns = [column[0] for column in cursor.description]
+    rows = iter_rows(cursor)
+    sample = list(itertools.islice(rows, SAMPLE_ROWS))
+    widths = column_widths(columns, sample)
+    rule = "-+-".join("-" * width for width in widths)
+
+    def line(values):
+        return " | ".join(_cell(value, width) for value, width in zip(values, widths)).rstrip()
+
+    print(rule, file=out)
+    print(line(columns), file=out)
+    print(rule, file=out)
+
+    count = 0
+    for row in itertools.chain(sample, rows):
+        print(line([_text(value) for value in row]), file=out)
+        count += 1
+        if page_size and count % page_size == 0:
+            answer = input(f"-- {count} rows shown; Enter for more, q to stop -- ")
+            if answer.strip().lower() == "q":
+                _drain(cursor)
+                break
+
+    print(rule, file=out)
+    print(f"{count} row(s)", file=out)
+    return count
+
+
+def write_csv(cursor, out=None) -> int:
+    """Write a result as CSV with a header row; returns the row count"""
+    out = out or sys.stdout
+    writer = csv.writer(out)
+    writer.writerow(column[0] for column in cursor.description)
+    count = 0
+    for row in iter_rows(cursor):
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def _json_default(value):
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode("utf-8", errors="replace")
+    return str(value)
+
+
+def write_jsonl(cursor, out=None) -> int:
+    """Write a result as one JSON object per line; returns the row count"""
+    out = out or sys.stdout
+    columns = [column[0] for column in cursor.description]
+    count = 0
+    for row in iter_rows(cursor):
+        out.write(json.dumps(dict(zip(columns, row)), default=_json_default) + "\n")
+        count += 1
+    return count
+
+
+def display_results(cursor, fmt: str = "table", out=None) -> int:
+    """
+    Stream the result held by cursor in the given format
+
+    Args:
+        cursor: Cursor holding an unread (unbuffered) result
+        fmt: One of FORMATS
+        out: Output stream (default stdout)
+
+    Returns:
+        Number of rows written
+    """
+    if fmt == "csv":
+        return write_csv(cursor, out)
+    if fmt == "jsonl":
+        return write_jsonl(cursor, out)
+    if fmt == "table":
+        return write_table(cursor, out)
+    raise ValueError(f"Unknown output format: {fmt}")
@@ -0,0 +1,287 @@
+"""
+Set-based versions of the correlated-subquery and product reports
+
+Each report pairs its original SQL (QueryTables.sql or Assignment4.sql
+query, or Assignment6 view) with a rewrite that reads each table once:
+window functions instead of correlated aggregates, an anti-join instead
+of NOT IN, and pre-aggregated CTEs instead of repeated counts. Product
+reports group the sold items by product_key and resolve titles with one
+Product join (Products.sql) instead of a conditional join per product
+type. The rewrites take parameters (%(name)s); with the defaults they
+return the same rows as the originals, which compare() checks.
+
+Order and product reports read OrderHistory and OrderItemHistory
+(Archive.sql), so orders moved to the archive by archive.py still count.
+Their rewrites take an order_date range (start inclusive, end exclusive;
+all history by default) that MySQL uses to skip the archive quarters
+outside it.
+
+Usage:
+    python reports.py [REPORT ...] [--check] [--repeat 3] [--format table]
+"""
+
+import argparse
+import datetime
+import statistics
+import time
+from collections import Counter, namedtuple
+
+import db_pool
+import render
+
+# title, original SQL, set-based SQL, default parameters
+Report = namedtuple("Report", "title original sql params")
+
+# Default order_date range of the order reports: MySQL's whole DATETIME range
+ALL_HISTORY = {"start": datetime.date(1000, 1, 1), "end": datetime.date(9999, 12, 31)}
+
+REPORTS = {
+    # Query 4: the customer's average was re-computed for every order
+    "orders_above_customer_average": Report(
+        "Orders above their customer's average amount",
+        """
+        SELECT o.order_id, o.customer_id, o.total_amount
+        FROM OrderHistory o
+        WHERE o.total_amount
+            > (SELECT AVG(o2.total_amount) FROM OrderHistory o2 WHERE o2.customer_id = o.customer_id)
+        """,
+        """
+        SELECT order_id, customer_id, total_amount
+        FROM (
+            SELECT order_id, customer_id, total_amount,
+                   AVG(total_amount) OVER (PARTITION BY customer_id) AS customer_average
+            FROM OrderHistory
+            WHERE order_date >= %(start)s AND order_date < %(end)s
+        ) o
+        WHERE total_amount > customer_average * %(factor)s
+        """,
+        {**ALL_HISTORY, "factor": 1},
+    ),
+    # Query 9: NOT IN re-checks the Order subquery for each customer
+    "customers_without_orders": Report(
+        "Customers who have not placed any orders",
+        """
+        SELECT customer_id, first_name, last_name
+        FROM Customer
+        WHERE customer_id NOT IN (SELECT customer_id FROM OrderHistory)
+        """,
+        """
+        SELECT c.customer_id, c.first_name, c.last_name
+        FROM Customer c
+        LEFT JOIN (
+            SELECT DISTINCT customer_id
+            FROM OrderHistory
+            WHERE order_date >= %(start)s AND order_date < %(end)s
+        ) o ON o.customer_id = c.customer_id
+        WHERE o.customer_id IS NULL
+        """,
+        dict(ALL_HISTORY),
+    ),
+    # Query 10: the movie count was computed twice per actor
+    "actors_in_several_movies": Report(
+        "Actors who have acted in more than one movie",
+        """
+        SELECT
+            a.actor_id,
+            CONCAT(a.first_name, ' ', a.last_name) AS actorname,
+            (SELECT COUNT(*) FROM Movie_Actor ma WHERE ma.actor_id = a.actor_id) AS moviecount
+        FROM Actor a
+        WHERE (SELECT COUNT(*) FROM Movie_Actor ma WHERE ma.actor_id = a.actor_id) > 1
+        """,
+        """
+        WITH movie_counts AS (
+            SELECT actor_id, COUNT(*) AS moviecount
+            FROM Movie_Actor
+            GROUP BY actor_id
+            HAVING COUNT(*) >= %(min_movies)s
+        )
+        SELECT
+            a.actor_id,
+            CONCAT(a.first_name, ' ', a.last_name) AS actorname,
+            m.moviecount
+        FROM movie_counts m
+        JOIN Actor a ON a.actor_id = m.actor_id
+        """,
+        {"min_movies": 2},
+    ),
+    # HighValueCustomerOrders: a grouped IN-subquery plus a global AVG
+    "high_value_customer_orders": Report(
+        "Orders of customers who spent more than the average order amount",
+        """
+        SELECT o.order_id, o.customer_id, o.order_date, o.total_amount
+        FROM OrderHistory o
+        WHERE o.customer_id IN (
+            SELECT c.customer_id
+            FROM Customer c
+            JOIN OrderHistory o2 ON c.customer_id = o2.customer_id
+            GROUP BY c.customer_id
+            HAVING SUM(o2.total_amount) > (SELECT AVG(total_amount) FROM OrderHistory)
+        )
+        ORDER BY o.total_amount DESC
+        """,
+        """
+        SELECT order_id, customer_id, order_date, total_amount
+        FROM (
+            SELECT order_id, customer_id, order_date, total_amount,
+                   SUM(total_amount) OVER (PARTITION BY customer_id) AS customer_total,
+                   AVG(total_amount) OVER () AS average_amount
+            FROM OrderHistory
+            WHERE order_date >= %(start)s AND order_date < %(end)s
+        ) o
+        WHERE customer_total > average_amount * %(factor)s
+        ORDER BY total_amount DESC
+        """,
+        {**ALL_HISTORY, "factor": 1},
+    ),
+    # Sales reports: the product title took two conditional joins
+    "best_sellers": Report(
+        "Best-selling products by units sold",
+        """
+        SELECT oi.product_type, oi.product_id, COALESCE(m.title, a.title) AS title,
+               SUM(oi.quantity) AS units_sold, SUM(oi.quantity * oi.price_each) AS revenue
+        FROM OrderItemHistory oi
+        LEFT JOIN Movie m ON oi.product_type = 'MOVIE' AND m.movie_id = oi.product_id
+        LEFT JOIN MusicAlbum a ON oi.product_type = 'ALBUM' AND a.album_id = oi.product_id
+        GROUP BY oi.product_type, oi.product_id, m.title, a.title
+        ORDER BY units_sold DESC, oi.product_type, oi.product_id
+        LIMIT 10
+        """,
+        """
+        SELECT p.product_type, p.item_id, p.title, s.units_sold, s.revenue
+        FROM (
+            SELECT product_key, SUM(quantity) AS units_sold,
+                   SUM(quantity * price_each) AS revenue
+            FROM OrderItemHistory
+            WHERE order_date >= %(start)s AND order_date < %(end)s
+            GROUP BY product_key
+        ) s
+        JOIN Product p ON p.product_key = s.product_key
+        ORDER BY s.units_sold DESC, p.product_type, p.item_id
+        LIMIT %(limit)s
+        """,
+        {**ALL_HISTORY, "limit": 10},
+    ),
+    "revenue_by_product": Report(
+        "Revenue per product",
+        """
+        SELECT oi.product_type, oi.product_id, COALESCE(m.title, a.title) AS title,
+               SUM(oi.quantity * oi.price_each) AS revenue
+        FROM OrderItemHistory oi
+        LEFT JOIN Movie m ON oi.product_type = 'MOVIE' AND m.movie_id = oi.product_id
+        LEFT JOIN MusicAlbum a ON oi.product_type = 'ALBUM' AND a.album_id = oi.product_id
+        GROUP BY oi.product_type, oi.product_id, m.title, a.title
+        ORDER BY revenue DESC
+        """,
+        """
+        SELECT p.product_type, p.item_id, p.title, s.revenue
+        FROM (
+            SELECT product_key, SUM(quantity * price_each) AS revenue
+            FROM OrderItemHistory
+            WHERE order_date >= %(start)s AND order_date < %(end)s
+            GROUP BY product_key
+        ) s
+        JOIN Product p ON p.product_key = s.product_key
+        WHERE s.revenue >= %(min_revenue)s
+        ORDER BY s.revenue DESC
+        """,
+        {**ALL_HISTORY, "min_revenue": 0},
+    ),
+    # Assignment4.sql query 4: UNION of both tables, de-duplicated and sorted
+    "combined_catalog": Report(
+        "Movies and albums by title",
+        """
+        SELECT movie_id AS id, title, 'Movie' AS type FROM Movie
+        UNION
+        SELECT album_id AS id, title, 'Album' AS type FROM MusicAlbum
+        ORDER BY title
+        """,
+        """
+        SELECT item_id AS id, title, IF(product_type = 'MOVIE', 'Movie', 'Album') AS type
+        FROM Product
+        WHERE in_catalog
+        ORDER BY title
+        """,
+        {},
+    ),
+}
+
+
+def execute(cursor, name: str, **params):
+    """
+    Run a report on cursor, leaving its rows to be fetched
+
+    Args:
+        cursor: Database cursor
+        name: Key of REPORTS
+        params: Values replacing the report's default parameters
+    """
+    report = REPORTS[name]
+    unknown = params.keys() - report.params.keys()
+    if unknown:
+        raise ValueError(f"{name} does not take {', '.join(sorted(unknown))}")
+    cursor.execute(report.sql, {**report.params, **params} or None)
+
+
+def _time(conn, sql: str, params, repeat: int) -> tuple:
+    """Run a query repeat times; return (median ms, rows of the last run)"""
+    cursor = conn.cursor()
+    timings, rows = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cursor.execute(sql, params or None)
+        rows = cursor.fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    cursor.close()
+    return statistics.median(timings), rows
+
+
+def compare(conn, name: str, repeat: int = 3) -> dict:
+    """
+    Time a report against its original and check they return the same rows
+
+    Rows are compared as multisets, since rows with equal sort keys may come
+    back in any order.
+
+    Returns:
+        original_ms, set_based_ms, speedup, rows and same
+    """
+    report = REPORTS[name]
+    original_ms, original_rows = _time(conn, report.original, None, repeat)
+    set_based_ms, rows = _time(conn, report.sql, report.params, repeat)
+    return {
+        "original_ms": round(original_ms, 3),
+        "set_based_ms": round(set_based_ms, 3),
+        "speedup": round(original_ms / set_based_ms, 1) if set_based_ms else None,
+        "rows": len(rows),
+        "same": Counter(original_rows) == Counter(rows),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("reports", nargs="*", metavar="REPORT",
+                        help=f"Reports to run (all by default): {', '.join(REPORTS)}")
+    parser.add_argument("--check", action="store_true",
+                        help="Compare each report with its original instead of printing it")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--format", choices=render.FORMATS, default="table")
+    args = parser.parse_args()
+    unknown = [name for name in args.reports if name not in REPORTS]
+    if unknown:
+        parser.error(f"unknown report: {', '.join(unknown)}")
+
+    with db_pool.get_pool(True).get_connection() as conn:
+        for name in args.reports or REPORTS:
+            if args.check:
+                result = compare(conn, name, args.repeat)
+                print(f"{name:<32} " + ", ".join(f"{k}={v}" for k, v in result.items()))
+            else:
+                print(f"\n{REPORTS[name].title}")
+                cursor = conn.cursor()
+                execute(cursor, name)
+                render.display_results(cursor, args.format)
+                cursor.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+"""
+Daily sales rollups for date-range reports
+
+DailySales, DailyCustomerSales and DailyProductTypeSales (SalesRollups.sql)
+hold revenue, order counts and items sold per day, so a dashboard over a
+date range reads one row per day (DailySales has a row for every calendar
+day, zero-filled) instead of aggregating every order or generating the
+dates with a recursive CTE.
+
+The rollups are maintained incrementally: triggers log the days touched by
+order, item and payment writes in SalesRollupChange and refresh()
+recomputes only those days. backfill() rebuilds the whole history in
+chunks of days on parallel connections.
+
+Usage:
+    python sales_rollup.py refresh
+    python sales_rollup.py backfill [--workers 4] [--chunk-days 31]
+    python sales_rollup.py report START END [--by day|customer|product_type]
+                                            [--format table]
+"""
+
+import argparse
+import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import mysql.connector
+
+import db_pool
+import render
+
+BACKFILL_WORKERS = 4  # Parallel chunks (keep below db_pool.POOL_SIZE)
+CHUNK_DAYS = 31
+LOCK_NAME = "sales_rollup"  # Serializes refresh and backfill runs
+LOCK_TIMEOUT = 10  # Seconds to wait for another run to finish
+DELETE_BATCH = 1000  # Change log ids per DELETE
+
+# Statements recomputing the rollups of the days %(start)s to %(end)s, from
+# live and archived orders (the archive reads only the quarters in range)
+_CLEAR = (
+    "DELETE FROM DailyCustomerSales WHERE sales_date BETWEEN %(start)s AND %(end)s",
+    "DELETE FROM DailyProductTypeSales WHERE sales_date BETWEEN %(start)s AND %(end)s",
+    "DELETE FROM DailySales WHERE sales_date BETWEEN %(start)s AND %(end)s",
+)
+_RECOMPUTE = (
+    """
+    INSERT INTO DailyCustomerSales (customer_id, sales_date, orders, revenue)
+    SELECT customer_id, DATE(order_date), COUNT(*), SUM(total_amount)
+    FROM (
+        SELECT customer_id, order_date, total_amount
+        FROM `Order`
+        WHERE order_date >= %(start)s AND order_date < %(end)s + INTERVAL 1 DAY
+        UNION ALL
+        SELECT customer_id, order_date, total_amount
+        FROM OrderArchive
+        WHERE order_date >= %(start)s AND order_date < %(end)s + INTERVAL 1 DAY
+    ) o
+    GROUP BY customer_id, DATE(order_date)
+    """,
+    """
+    INSERT INTO DailyProductTypeSales (sales_date, product_type, items, revenue)
+    SELECT DATE(order_date), product_type, SUM(quantity), SUM(quantity * price_each)
+    FROM (
+        SELECT o.order_date, oi.product_type, oi.quantity, oi.price_each
+        FROM `Order` o
+        JOIN OrderItem oi ON oi.order_id = o.order_id
+        WHERE o.order_date >= %(start)s AND o.order_date < %(end)s + INTERVAL 1 DAY
+        UNION ALL
+        SELECT order_date, product_type, quantity, price_each
+        FROM OrderItemArchive
+        WHERE order_date >= %(start)s AND order_date < %(end)s + INTERVAL 1 DAY
+    ) oi
+    GROUP BY DATE(order_date), product_type
+    """,
+    """
+    UPDATE DailySales d
+    JOIN (
+        SELECT sales_date, SUM(orders) AS orders, SUM(revenue) AS revenue
+        FROM DailyCustomerSales
+        WHERE sales_date BETWEEN %(start)s AND %(end)s
+        GROUP BY sales_date
+    ) c ON c.sales_date = d.sales_date
+    SET d.orders = c.orders, d.revenue = c.revenue
+    """,
+    """
+    UPDATE DailySales d
+    JOIN (
+        SELECT sales_date, SUM(items) AS items
+        FROM DailyProductTypeSales
+        WHERE sales_date BETWEEN %(start)s AND %(end)s
+        GROUP BY sales_date
+    ) t ON t.sales_date = d.sales_date
+    SET d.items = t.items
+    """,
+    """
+    UPDATE DailySales d
+    JOIN (
+        SELECT DATE(payment_date) AS sales_date, SUM(amount) AS paid
+        FROM (
+            SELECT payment_date, amount
+            FROM Payment
+            WHERE payment_date >= %(start)s AND payment_date < %(end)s + INTERVAL 1 DAY
+            UNION ALL
+            SELECT payment_date, amount
+            FROM PaymentArchive
+            WHERE payment_date >= %(start)s AND payment_date < %(end)s + INTERVAL 1 DAY
+        ) p
+        GROUP BY DATE(payment_date)
+    ) p ON p.sales_date = d.sales_date
+    SET d.paid = p.paid
+    """,
+)
+
+# Dashboard queries over %(start)s to %(end)s, read from the rollups only
+REPORTS = {
+    "day": """
+        SELECT sales_date, orders, revenue, items, paid
+        FROM DailySales
+        WHERE sales_date BETWEEN %(start)s AND %(end)s
+        ORDER BY sales_date
+        """,
+    "customer": """
+        SELECT s.customer_id, c.first_name, c.last_name,
+               s.orders, s.revenue, s.first_order, s.last_order
+        FROM (
+            SELECT customer_id, SUM(orders) AS orders, SUM(revenue) AS revenue,
+                   MIN(sales_date) AS first_order, MAX(sales_date) AS last_order
+            FROM DailyCustomerSales
+            WHERE sales_date BETWEEN %(start)s AND %(end)s
+            GROUP BY customer_id
+        ) s
+        JOIN Customer c ON c.customer_id = s.customer_id
+        ORDER BY s.revenue DESC
+        """,
+    "product_type": """
+        SELECT product_type, SUM(items) AS items, SUM(revenue) AS revenue
+        FROM DailyProductTypeSales
+        WHERE sales_date BETWEEN %(start)s AND %(end)s
+        GROUP BY product_type
+        ORDER BY revenue DESC
+        """,
+}
+
+
+def _days(start: datetime.date, end: datetime.date) -> list:
+    return [start + datetime.timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def _runs(days) -> list:
+    """Group dates into (first, last) runs of consecutive days"""
+    runs = []
+    for day in sorted(set(days)):
+        if runs and day - runs[-1][1] == datetime.timedelta(days=1):
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return [tuple(run) for run in runs]
+
+
+def recompute(cursor, start: datetime.date, end: datetime.date, clear: bool = True):
+    """
+    Rebuild the rollup rows of the days start to end (inclusive)
+
+    Args:
+        cursor: Database cursor; the caller commits
+        start, end: First and last day
+        clear: Delete the days' current rows first (False when the rollup
+            tables are known to have none, as in a backfill)
+    """
+    params = {"start": start, "end": end}
+    if clear:
+        for sql in _CLEAR:
+            cursor.execute(sql, params)
+    cursor.executemany(
+        "INSERT INTO DailySales (sales_date) VALUES (%s)",
+        [(day,) for day in _days(start, end)],
+    )
+    for sql in _RECOMPUTE:
+        cursor.execute(sql, params)
+
+
+def _fill_calendar(cursor, first: datetime.date, last: datetime.date):
+    """Add zero rows so DailySales keeps one row per day from first to last"""
+    cursor.execute("SELECT MIN(sales_date), MAX(sales_date) FROM DailySales")
+    low, high = cursor.fetchone()
+    if low is None:
+        missing = _days(first, last)
+    else:
+        missing = _days(first, low - datetime.timedelta(days=1)) + _days(
+            high + datetime.timedelta(days=1), last
+        )
+    if missing:
+        cursor.executemany(
+            "INSERT INTO DailySales (sales_date) VALUES (%s)", [(day,) for day in missing]
+        )
+
+
+def _lock(cursor):
+    cursor.execute("SELECT GET_LOCK(%s, %s)", (LOCK_NAME, LOCK_TIMEOUT))
+    if cursor.fetchone()[0] != 1:
+        raise RuntimeError("Another sales rollup refresh or backfill is running")
+
+
+def _unlock(cursor):
+    cursor.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+    cursor.fetchall()
+
+
+def _clear_log(cursor, change_ids):
+    change_ids = list(change_ids)
+    for i in range(0, len(change_ids), DELETE_BATCH):
+        batch = change_ids[i : i + DELETE_BATCH]
+        cursor.execute(
+            f"DELETE FROM SalesRollupChange WHERE change_id IN ({', '.join(['%s'] * len(batch))})",
+            batch,
+        )
+
+
+def refresh(conn) -> dict:
+    """
+    Recompute the days changed since the last refresh
+
+    Only the logged changes that were read are removed from the log, so
+    writes committed during the refresh are picked up by the next one.
+
+    Args:
+        conn: Database connection (its open transaction is committed)
+
+    Returns:
+        days (recomputed), runs (ranges of consecutive days), changes
+        (log entries consumed) and seconds
+    """
+    start = time.perf_counter()
+    cursor = conn.cursor()
+    _lock(cursor)
+    try:
+        cursor.execute("SELECT change_id, sales_date FROM SalesRollupChange")
+        changes = cursor.fetchall()
+        days = {day for _, day in changes}
+        runs = _runs(days)
+        if runs:
+            _fill_calendar(cursor, runs[0][0], runs[-1][1])
+        for first, last in runs:
+            recompute(cursor, first, last)
+        _clear_log(cursor, (change_id for change_id, _ in changes))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        _unlock(cursor)
+        cursor.close()
+    return {
+        "days": len(days),
+        "runs": len(runs),
+        "changes": len(changes),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+
+
+def _backfill_chunk(pool, first: datetime.date, last: datetime.date):
+    with pool.get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            recompute(cursor, first, last, clear=False)
+            conn.commit()
+        except mysql.connector.Error:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+
+def backfill(pool, workers: int = BACKFILL_WORKERS, chunk_days: int = CHUNK_DAYS) -> dict:
+    """
+    Rebuild the rollups of the whole history in parallel chunks
+
+    The rollup tables are emptied, then each chunk of chunk_days days is
+    recomputed in its own transaction on its own pooled connection. Log
+    entries made before the backfill started are consumed; later ones are
+    left for refresh().
+
+    Args:
+        pool: Pool of connections to the store database
+        workers: Chunks recomputed at the same time
+        chunk_days: Days per chunk
+
+    Returns:
+        days, chunks, failed, seconds, plus {(first, last): error} errors
+    """
+    start = time.perf_counter()
+    with pool.get_connection() as conn:
+        cursor = conn.cursor()
+        _lock(cursor)
+        try:
+            cursor.execute("SELECT change_id FROM SalesRollupChange")
+            change_ids = [change_id for (change_id,) in cursor.fetchall()]
+            cursor.execute(
+                """SELECT MIN(first), MAX(last) FROM (
+                       SELECT DATE(MIN(order_date)) AS first, DATE(MAX(order_date)) AS last
+                       FROM OrderHistory
+                       UNION ALL
+                       SELECT DATE(MIN(payment_date)), DATE(MAX(payment_date)) FROM PaymentHistory
+                   ) bounds"""
+            )
+            first, last = cursor.fetchone()
+            for table in ("DailyCustomerSales", "DailyProductTypeSales", "DailySales"):
+                cursor.execute(f"DELETE FROM {table}")
+            conn.commit()
+
+            days = _days(first, last) if first is not None else []
+            chunks = [
+                (days[i], days[min(i + chunk_days, len(days)) - 1])
+                for i in range(0, len(days), chunk_days)
+            ]
+            errors = {}
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(_backfill_chunk, pool, *chunk): chunk for chunk in chunks
+                }
+                for future, chunk in futures.items():
+                    try:
+                        future.result()
+                    except mysql.connector.Error as err:
+                        errors[chunk] = err
+
+            if not errors:
+                _clear_log(cursor, change_ids)
+                conn.commit()
+        finally:
+            _unlock(cursor)
+            cursor.close()
+
+    return {
+        "days": len(days),
+        "chunks": len(chunks),
+        "failed": len(errors),
+        "seconds": round(time.perf_counter() - start, 3),
+        "errors": errors,
+    }
+
+
+def report(cursor, by: str, start: datetime.date, end: datetime.date):
+    """
+    Run a dashboard query on cursor, leaving its rows to be fetched
+
+    Args:
+        cursor: Database cursor
+        by: Key of REPORTS (day, customer or product_type)
+        start, end: First and last day of the range
+    """
+    cursor.execute(REPORTS[by], {"start": start, "end": end})
+
+
+def _date(text: str) -> datetime.date:
+    try:
+        return datetime.date.fromisoformat(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a YYYY-MM-DD date: {text!r}") from None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("refresh", help="Recompute the days changed since the last refresh")
+    backfill_parser = commands.add_parser("backfill", help="Rebuild the rollups of all history")
+    backfill_parser.add_argument("--workers", type=int, default=BACKFILL_WORKERS)
+    backfill_parser.add_argument("--chunk-days", type=int, default=CHUNK_DAYS)
+    report_parser = commands.add_parser("report", help="Show sales between two dates")
+    report_parser.add_argument("start", type=_date)
+    report_parser.add_argument("end", type=_date)
+    report_parser.add_argument("--by", choices=list(REPORTS), default="day")
+    report_parser.add_argument("--format", choices=render.FORMATS, default="table")
+    args = parser.parse_args()
+
+    if args.command == "backfill":
+        pool = db_pool.get_pool(True, pool_size=args.workers + 1)
+        stats = backfill(pool, args.workers, args.chunk_days)
+        for (first, last), err in stats.pop("errors").items():
+            print(f"{first} to {last}: {err}")
+        print(", ".join(f"{k}={v}" for k, v in stats.items()))
+        return
+
+    with db_pool.get_pool(True).get_connection() as conn:
+        stats = refresh(conn)
+        if args.command == "refresh":
+            print(", ".join(f"{k}={v}" for k, v in stats.items()))
+        else:
+            cursor = conn.cursor()
+            report(cursor, args.by, args.start, args.end)
+            render.display_results(cursor, args.format)
+            cursor.close()
+
+
+if __name__ == "__main__":
+    main()
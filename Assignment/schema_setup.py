@@ -0,0 +1,497 @@
+"""
+Dependency-ordered, parallel and repeatable schema setup
+
+The DDL scripts are split into objects: tables, views, indexes, triggers,
+procedures, and blocks of other statements that have to share a session.
+Each object runs after the objects it mentions were created and after
+the previous change to the same table, so everything else (e.g. indexes
+on different tables) is created concurrently over a few pooled
+connections.
+
+Setup is repeatable: the hash of every applied definition is stored in
+SchemaObject, and objects that still exist with an unchanged definition
+are skipped. A changed object is rebuilt along with everything that
+depends on it; a table that still holds rows is only dropped for that
+when the run is asked to rebuild (otherwise it is reported as failed).
+
+Secondary indexes, triggers and data migrations (POST_LOAD_SCRIPTS) are
+applied after the seed data is loaded, so the bulk inserts do not have
+to maintain them row by row.
+
+Usage:
+    python schema_setup.py [--fresh | --rebuild]
+                           [--seed PopulateTables.sql | --no-seed]
+                           [--schema-only] [--workers 4]
+"""
+
+import argparse
+import hashlib
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import mysql.connector
+
+import bulk_load
+import db_pool
+import query_metrics
+
+SCHEMA_SCRIPTS = ("CreateTables.sql", "Archive.sql", "Procedures.sql")
+POST_LOAD_SCRIPTS = (
+    "AddIndexes.sql",
+    "CatalogChanges.sql",
+    "StockRanking.sql",
+    "Products.sql",
+    "SalesRollups.sql",
+)
+SEED_SCRIPT = "PopulateTables.sql"
+SETUP_WORKERS = 4  # Concurrent DDL sessions (keep below db_pool.POOL_SIZE)
+
+_NO_SUCH_TABLE = 1146
+# The statement's goal is already met: duplicate column, key or foreign key
+# name, or a key to drop that is already gone
+_ALREADY_DONE = {1060, 1061, 1091, 1826}
+
+_SKIP = re.compile(r"^(?:CREATE\s+DATABASE|USE)\b", re.IGNORECASE)
+_DROP = re.compile(
+    r"^DROP\s+(TABLE|VIEW|PROCEDURE|TRIGGER)\s+IF\s+EXISTS\s+`?(\w+)`?\s*$", re.IGNORECASE
+)
+_CREATE = (
+    ("table", re.compile(r"^CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?`?(\w+)`?", re.IGNORECASE)),
+    ("view", re.compile(r"^CREATE\s+(?:OR\s+REPLACE\s+)?VIEW\s+`?(\w+)`?", re.IGNORECASE)),
+    (
+        "index",
+        re.compile(
+            r"^CREATE\s+(?:UNIQUE\s+|FULLTEXT\s+)?INDEX\s+`?(\w+)`?\s+ON\s+`?(\w+)`?",
+            re.IGNORECASE,
+        ),
+    ),
+    ("procedure", re.compile(r"^CREATE\s+PROCEDURE\s+`?(\w+)`?", re.IGNORECASE)),
+    (
+        "trigger",
+        re.compile(
+            r"^CREATE\s+TRIGGER\s+`?(\w+)`?\s+(?:BEFORE|AFTER)\s+\w+\s+ON\s+`?(\w+)`?",
+            re.IGNORECASE,
+        ),
+    ),
+)
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+
+# Kinds that change an existing table; they run one at a time per table
+_MODIFIERS = {"index", "trigger", "block"}
+
+STATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS SchemaObject (
+    name 			VARCHAR(150) PRIMARY KEY,
+    definition_hash CHAR(64) NOT NULL,
+    applied_at 		TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+)
+"""
+
+
+class DdlObject:
+    """One schema object and the statements that create it"""
+
+    def __init__(self, kind: str, name: str, script: str, table: str = None):
+        self.kind = kind
+        self.name = name
+        self.table = table  # Table of an index or trigger
+        self.script = script
+        self.statements = []
+        self.deps = set()  # Keys of the objects that must exist first
+
+    @property
+    def key(self) -> str:
+        if self.kind == "index":
+            return f"index:{self.table}.{self.name}"
+        return f"{self.kind}:{self.name}"
+
+    @property
+    def definition_hash(self) -> str:
+        text = "\n".join(" ".join(statement.split()) for statement in self.statements)
+        return hashlib.sha256(text.encode()).hexdigest()
+
+
+def split_objects(statements, script: str) -> list:
+    """
+    Group the statements of one script into DdlObjects
+
+    DROP ... IF EXISTS statements go with the object of the same name
+    created later in the script; other unnamed statements in a row form
+    one block, run on a single connection.
+    """
+    objects, drops, block = [], {}, None
+    for statement in statements:
+        if _SKIP.match(statement):
+            continue
+        drop = _DROP.match(statement)
+        if drop:
+            drops.setdefault((drop.group(1).lower(), drop.group(2)), []).append(statement)
+            continue
+        for kind, pattern in _CREATE:
+            match = pattern.match(statement)
+            if match:
+                table = match.group(2) if kind in ("index", "trigger") else None
+                obj = DdlObject(kind, match.group(1), script, table)
+                obj.statements = drops.pop((kind, obj.name), []) + [statement]
+                objects.append(obj)
+                block = None
+                break
+        else:
+            if block is None:
+                block = DdlObject("block", f"{script}#{len(objects)}", script)
+                objects.append(block)
+            block.statements.append(statement)
+    for (kind, name), leftover in drops.items():
+        obj = DdlObject("block", f"{script}:drop {kind} {name}", script)
+        obj.statements = leftover
+        objects.append(obj)
+    return objects
+
+
+def load_objects(paths, views=()) -> list:
+    """
+    Read the DDL scripts (and extra CREATE VIEW statements) in order and
+    work out the dependencies between their objects
+
+    Args:
+        paths: Script paths
+        views: Additional view definitions, created with the schema
+
+    Returns:
+        DdlObjects in script order, each with its deps filled in
+    """
+    objects = []
+    for path in paths:
+        with open(path, "r") as file:
+            objects += split_objects(bulk_load.iter_statements(file), path)
+    for sql in views:
+        objects += split_objects(bulk_load.iter_statements(sql.splitlines(True)), "views")
+
+    creators = {obj.name: obj for obj in objects if obj.kind in ("table", "view")}
+    mention = re.compile(
+        r"(?<![\w$])`?(" + "|".join(map(re.escape, creators)) + r")`?(?![\w$])"
+    )
+    last_change = {}  # table -> key of the latest object modifying it
+    for obj in objects:
+        text = _STRING.sub("''", "\n".join(obj.statements))
+        names = set(mention.findall(text))
+        if obj.kind in ("table", "view"):
+            names.discard(obj.name)
+        if obj.table:
+            names.add(obj.table)
+        obj.deps.update(creators[name].key for name in names if name in creators)
+        if obj.kind == "view":
+            # A view reads the columns its tables have after earlier changes
+            obj.deps.update(last_change[name] for name in names if name in last_change)
+        if obj.kind in _MODIFIERS:
+            # Indexes and triggers alter only their own table
+            for name in [obj.table] if obj.table else names:
+                if name in last_change:
+                    obj.deps.add(last_change[name])
+                last_change[name] = obj.key
+    return objects
+
+
+def existing_objects(conn, database: str) -> tuple:
+    """
+    What the database holds now
+
+    Returns:
+        (keys of the existing objects, stored definition hashes by key)
+    """
+    queries = (
+        ("table:", "SELECT TABLE_NAME FROM information_schema.TABLES "
+                   "WHERE TABLE_SCHEMA = %s AND TABLE_TYPE = 'BASE TABLE'"),
+        ("view:", "SELECT TABLE_NAME FROM information_schema.VIEWS WHERE TABLE_SCHEMA = %s"),
+        ("index:", "SELECT DISTINCT CONCAT(TABLE_NAME, '.', INDEX_NAME) "
+                   "FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = %s"),
+        ("procedure:", "SELECT ROUTINE_NAME FROM information_schema.ROUTINES "
+                       "WHERE ROUTINE_SCHEMA = %s AND ROUTINE_TYPE = 'PROCEDURE'"),
+        ("trigger:", "SELECT TRIGGER_NAME FROM information_schema.TRIGGERS "
+                     "WHERE TRIGGER_SCHEMA = %s"),
+    )
+    cursor = conn.cursor()
+    existing = set()
+    for prefix, sql in queries:
+        cursor.execute(sql, (database,))
+        existing.update(prefix + row[0] for row in cursor.fetchall())
+    try:
+        cursor.execute("SELECT name, definition_hash FROM SchemaObject")
+        hashes = dict(cursor.fetchall())
+    except mysql.connector.Error as err:
+        if err.errno != _NO_SUCH_TABLE:
+            raise
+        hashes = {}
+    cursor.close()
+    return existing, hashes
+
+
+def stale_objects(objects, existing, hashes) -> set:
+    """
+    Keys of the objects to (re)apply: missing or changed ones, and
+    everything that depends on them
+
+    Objects without a stored hash (created before SchemaObject existed)
+    are taken to be current unless something they depend on is stale.
+    """
+    stale = set()
+    for obj in objects:  # Script order, so dependencies come first
+        missing = obj.kind != "block" and obj.key not in existing
+        stored = hashes.get(obj.key)
+        changed = stored is not None and stored != obj.definition_hash
+        if missing or changed or obj.deps & stale:
+            stale.add(obj.key)
+    return stale
+
+
+def adopt_objects(conn, objects, stale, hashes):
+    """Store the hashes of current objects that were created untracked"""
+    rows = [
+        (obj.key, obj.definition_hash)
+        for obj in objects
+        if obj.key not in stale and obj.key not in hashes
+    ]
+    if rows:
+        cursor = conn.cursor()
+        cursor.executemany(
+            "INSERT INTO SchemaObject (name, definition_hash) VALUES (%s, %s)", rows
+        )
+        conn.commit()
+        cursor.close()
+
+
+def _run(cursor, statement: str):
+    try:
+        cursor.execute(statement)
+        if cursor.with_rows:
+            cursor.fetchall()
+    except mysql.connector.Error as err:
+        if err.errno not in _ALREADY_DONE:
+            raise
+
+
+def _row_count(cursor, table: str) -> int:
+    try:
+        cursor.execute(f"SELECT COUNT(*) FROM {bulk_load._quote_identifier(table)}")
+        return cursor.fetchall()[0][0]
+    except mysql.connector.Error as err:
+        if err.errno != _NO_SUCH_TABLE:
+            raise
+        return 0
+
+
+def _apply(pool, obj: DdlObject, rebuild: bool = False):
+    """
+    Create one object on its own pooled connection and store its hash
+
+    Raises:
+        RuntimeError: The object is a table that still holds rows and
+            rebuild is False
+    """
+    with query_metrics.screen(f"schema setup {obj.kind}"), pool.get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            if obj.kind == "table":
+                rows = _row_count(cursor, obj.name)
+                if rows and not rebuild:
+                    raise RuntimeError(
+                        f"table {obj.name} holds {rows} rows; rerun with --rebuild to drop it"
+                    )
+                if rows:
+                    print(f"Rebuilding table {obj.name}: dropping {rows} rows")
+                # Rebuilt parents may still be referenced by their (stale) children
+                cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+                _run(cursor, f"DROP TABLE IF EXISTS {bulk_load._quote_identifier(obj.name)}")
+            elif obj.kind == "index":
+                _run(
+                    cursor,
+                    f"DROP INDEX {bulk_load._quote_identifier(obj.name)} "
+                    f"ON {bulk_load._quote_identifier(obj.table)}",
+                )
+            for statement in obj.statements:
+                _run(cursor, statement)
+            cursor.execute(
+                """INSERT INTO SchemaObject (name, definition_hash) VALUES (%s, %s)
+                   ON DUPLICATE KEY UPDATE definition_hash = VALUES(definition_hash)""",
+                (obj.key, obj.definition_hash),
+            )
+            conn.commit()
+        finally:
+            if obj.kind == "table":
+                cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+            cursor.close()
+
+
+def apply_objects(
+    pool, objects, stale, workers: int = SETUP_WORKERS, rebuild: bool = False
+) -> dict:
+    """
+    Create the stale objects, each as soon as its dependencies exist
+
+    Args:
+        pool: Pool of connections to the target database
+        objects: DdlObjects (dependencies outside this list count as met)
+        stale: Keys of the objects to apply; the rest are skipped
+        workers: Number of objects created at the same time
+        rebuild: Drop stale tables even when they hold rows
+
+    Returns:
+        Statistics (created, unchanged, failed, seconds) plus a
+        {key: error} dict of the failures
+    """
+    start = time.perf_counter()
+    waiting = {obj.key: obj for obj in objects if obj.key in stale}
+    pending = set(waiting)
+    done, failed = set(), {}
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while waiting or running:
+            for key, obj in list(waiting.items()):
+                blocked = (obj.deps & pending) - done
+                if blocked & failed.keys():
+                    failed[key] = "skipped, depends on " + ", ".join(sorted(blocked & failed.keys()))
+                    del waiting[key]
+                elif not blocked:
+                    running[executor.submit(_apply, pool, obj, rebuild)] = obj
+                    del waiting[key]
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                obj = running.pop(future)
+                try:
+                    future.result()
+                    done.add(obj.key)
+                except (mysql.connector.Error, RuntimeError) as err:
+                    failed[obj.key] = err
+
+    return {
+        "created": len(done),
+        "unchanged": len(objects) - len(pending),
+        "failed": len(failed),
+        "seconds": round(time.perf_counter() - start, 3),
+        "errors": failed,
+    }
+
+
+def _tables_empty(conn, objects) -> bool:
+    cursor = conn.cursor()
+    try:
+        for obj in objects:
+            if obj.kind == "table":
+                cursor.execute(f"SELECT 1 FROM {bulk_load._quote_identifier(obj.name)} LIMIT 1")
+                if cursor.fetchall():
+                    return False
+        return True
+    finally:
+        cursor.close()
+
+
+def setup(
+    views=(),
+    seed: str = None,
+    fresh: bool = False,
+    rebuild: bool = False,
+    post_load: bool = True,
+    workers: int = SETUP_WORKERS,
+    database: str = db_pool.DATABASE,
+    **overrides,
+) -> dict:
+    """
+    Bring the database up to date with the scripts
+
+    Args:
+        views: Extra CREATE VIEW statements
+        seed: Data script loaded when every table is still empty
+        fresh: Drop the database first
+        rebuild: Drop changed tables even when they hold rows (their
+            data is lost); without it such tables are reported as failed
+        post_load: Create the POST_LOAD_SCRIPTS objects (after seeding);
+            False leaves them for a later call, once the data is loaded
+        workers: Number of objects created at the same time
+        database: Target database
+        overrides: Connection settings passed to db_pool.get_pool
+
+    Returns:
+        Statistics per phase ("schema", "seed", "post_load")
+    """
+    with db_pool.get_pool(False, **overrides).get_connection() as conn:
+        cursor = conn.cursor()
+        if fresh:
+            cursor.execute(f"DROP DATABASE IF EXISTS {bulk_load._quote_identifier(database)}")
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS {bulk_load._quote_identifier(database)}")
+        cursor.close()
+
+    pool = db_pool.get_pool(True, database=database, **overrides)
+    if fresh:
+        # Pooled sessions still point at the dropped database
+        pool.reset()
+    with pool.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(STATE_TABLE_SQL)
+        cursor.close()
+        objects = load_objects(SCHEMA_SCRIPTS + POST_LOAD_SCRIPTS, views)
+        existing, hashes = existing_objects(conn, database)
+        stale = stale_objects(objects, existing, hashes)
+        adopt_objects(conn, objects, stale, hashes)
+
+    schema = [obj for obj in objects if obj.script not in POST_LOAD_SCRIPTS]
+    phases = {"schema": apply_objects(pool, schema, stale, workers, rebuild)}
+
+    if seed:
+        with pool.get_connection() as conn:
+            if _tables_empty(conn, schema):
+                phases["seed"] = bulk_load.execute_script(
+                    conn, seed, on_error=lambda statement, err: print(f"Error executing: {err}")
+                )
+            else:
+                phases["seed"] = {"skipped": "tables already hold data"}
+
+    if post_load:
+        later = [obj for obj in objects if obj.script in POST_LOAD_SCRIPTS]
+        phases["post_load"] = apply_objects(pool, later, stale, workers, rebuild)
+    return phases
+
+
+def format_phases(phases: dict) -> str:
+    """Summary of setup() statistics, with one line per failed object"""
+    lines = []
+    for phase, stats in phases.items():
+        errors = stats.get("errors") or {}
+        summary = {name: value for name, value in stats.items() if name != "errors"}
+        lines.append(f"{phase}: {bulk_load.format_stats(summary)}")
+        lines += [f"  {key}: {err}" for key, err in errors.items()]
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create or update the MovieMusicStore schema")
+    parser.add_argument("--fresh", action="store_true", help="Drop the database first")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Drop and recreate changed tables even if they hold rows")
+    parser.add_argument("--seed", default=SEED_SCRIPT,
+                        help="Data script loaded into empty tables")
+    parser.add_argument("--no-seed", action="store_true")
+    parser.add_argument("--schema-only", action="store_true",
+                        help="Leave out the indexes and triggers of the post-load scripts")
+    parser.add_argument("--workers", type=int, default=SETUP_WORKERS)
+    args = parser.parse_args()
+
+    # The Assignment6 views are created with the schema
+    from Assignment6 import VIEWS
+
+    phases = setup(
+        VIEWS.values(),
+        seed=None if args.no_seed else args.seed,
+        fresh=args.fresh,
+        rebuild=args.rebuild,
+        post_load=not args.schema_only,
+        workers=args.workers,
+    )
+    print(format_phases(phases))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Catalog search backed by the FULLTEXT indexes in CreateTables.sql
+
+Search terms are turned into InnoDB boolean-mode queries where every word
+is required and matched as a prefix (`+word*`), and results are ordered
+by relevance. Words the FULLTEXT parser ignores (shorter than the minimum
+token size, or stopwords) are matched with LIKE instead.
+"""
+
+import re
+
+MIN_TOKEN_SIZE = 3  # innodb_ft_min_token_size
+SEARCH_LIMIT = 1000  # Maximum number of results returned per search
+
+# Default InnoDB FULLTEXT stopwords (INFORMATION_SCHEMA.INNODB_FT_DEFAULT_STOPWORD)
+STOPWORDS = frozenset(
+    "a about an are as at be by com de en for from how i in is it la of on or "
+    "that the this to was what when where who will with und www".split()
+)
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(term: str) -> list:
+    """Split a search term into lowercase words, dropping punctuation"""
+    return _WORD.findall(term.lower())
+
+
+def split_terms(term: str) -> tuple:
+    """
+    Separate words the FULLTEXT index can match from those it ignores
+
+    Returns:
+        (indexed words, words to match with LIKE)
+    """
+    indexed, other = [], []
+    for word in tokenize(term):
+        if len(word) >= MIN_TOKEN_SIZE and word not in STOPWORDS:
+            indexed.append(word)
+        else:
+            other.append(word)
+    return indexed, other
+
+
+def boolean_query(words) -> str:
+    """Build a boolean-mode query requiring every word as a prefix"""
+    return " ".join(f"+{word}*" for word in words)
+
+
+def _like_filters(columns, words):
+    """LIKE conditions requiring each word to appear in one of the columns"""
+    conditions, params = [], []
+    for word in words:
+        conditions.append("(" + " OR ".join(f"{col} LIKE %s" for col in columns) + ")")
+        params.extend([f"%{word}%"] * len(columns))
+    return conditions, params
+
+
+def movie_search(term: str, limit: int = SEARCH_LIMIT) -> tuple:
+    """
+    Build the movie title search
+
+    Args:
+        term: Text typed by the user
+        limit: Maximum number of rows
+
+    Returns:
+        (sql, params) returning rows shaped like the movie list
+    """
+    indexed, other = split_terms(term)
+    conditions, params = _like_filters(["title"], other)
+    order = "movie_id"
+    order_params = []
+    if indexed:
+        query = boolean_query(indexed)
+        conditions.insert(0, "MATCH(title) AGAINST (%s IN BOOLEAN MODE)")
+        params.insert(0, query)
+        order = "MATCH(title) AGAINST (%s IN BOOLEAN MODE) DESC, movie_id"
+        order_params = [query]
+
+    where = " AND ".join(conditions) or "1 = 1"
+    sql = f"""
+        SELECT movie_id, title, genre, release_date, rating, runtime_minutes, stock_count
+        FROM Movie
+        WHERE {where}
+        ORDER BY {order}
+        LIMIT %s
+    """
+    return sql, tuple(params + order_params + [limit])
+
+
+def music_search(term: str, limit: int = SEARCH_LIMIT) -> tuple:
+    """
+    Build the album title / artist name search
+
+    Args:
+        term: Text typed by the user
+        limit: Maximum number of rows
+
+    Returns:
+        (sql, params) returning rows shaped like the music list
+    """
+    indexed, other = split_terms(term)
+    params = []
+    order = "ma.album_id"
+
+    if indexed:
+        query = boolean_query(indexed)
+        # Each FULLTEXT index is probed on its own and the hits are combined
+        matched = """
+            ma.album_id IN (
+                SELECT album_id FROM MusicAlbum
+                WHERE MATCH(title) AGAINST (%s IN BOOLEAN MODE)
+                UNION
+                SELECT aa2.album_id FROM Album_Artist aa2
+                JOIN Artist a2 ON aa2.artist_id = a2.artist_id
+                WHERE MATCH(a2.artist_name) AGAINST (%s IN BOOLEAN MODE)
+            )
+        """
+        params += [query, query]
+        order = """
+            MATCH(ma.title) AGAINST (%s IN BOOLEAN MODE)
+            + IFNULL(MAX(MATCH(a.artist_name) AGAINST (%s IN BOOLEAN MODE)), 0) DESC,
+            ma.album_id
+        """
+    else:
+        matched = "1 = 1"
+
+    having, having_params = _like_filters(
+        ["ma.title", "GROUP_CONCAT(a.artist_name)"], other
+    )
+    sql = f"""
+        SELECT ma.album_id, ma.title,
+               GROUP_CONCAT(a.artist_name ORDER BY a.artist_name SEPARATOR ', '),
+               ma.genre, ma.release_date, ma.stock_count
+        FROM MusicAlbum ma
+        LEFT JOIN Album_Artist aa ON ma.album_id = aa.album_id
+        LEFT JOIN Artist a ON aa.artist_id = a.artist_id
+        WHERE {matched}
+        GROUP BY ma.album_id, ma.title, ma.genre, ma.release_date, ma.stock_count
+        {"HAVING " + " AND ".join(having) if having else ""}
+        ORDER BY {order}
+        LIMIT %s
+    """
+    params += having_params
+    if indexed:
+        params += [query, query]
+    return sql, tuple(params + [limit])
+
+
+def cache_key(term: str) -> str:
+    """
+    Normalized form of a term; if one key starts with another, its results
+    are a subset of the shorter key's results
+    """
+    return " ".join(tokenize(term))
+
+
+def matches(term: str, *fields) -> bool:
+    """
+    In-memory equivalent of the SQL searches, used to refine cached results
+
+    Indexed words must all prefix-match words of one field (like MATCH on a
+    single FULLTEXT index); the remaining words must appear as substrings
+    of any field (like the LIKE filters).
+
+    Args:
+        term: Search term
+        fields: Searchable text values of a row (None is ignored)
+    """
+    indexed, other = split_terms(term)
+    texts = [str(field).lower() for field in fields if field is not None]
+
+    for word in other:
+        if not any(word in text for text in texts):
+            return False
+    if not indexed:
+        return True
+    for text in texts:
+        words = tokenize(text)
+        if all(any(w.startswith(word) for w in words) for word in indexed):
+            return True
+    return False
@@ -0,0 +1,164 @@
+"""
+Benchmark the FULLTEXT title search against the old LIKE '%term%' path
+
+Builds a scratch database with a synthetic title table, grows it to each
+requested size and times both search paths for a fixed set of terms.
+
+Usage:
+    python search_benchmark.py [--sizes 10000 100000 1000000] [--repeat 5]
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+
+import db_pool
+import search
+from datagen import make_title, make_vocabulary
+
+BENCH_DATABASE = "MovieMusicStoreSearchBench"
+INSERT_BATCH = 5000
+
+
+def grow(conn, rng, vocabulary, current: int, target: int):
+    """Insert synthetic titles until the table holds target rows"""
+    cursor = conn.cursor()
+    while current < target:
+        batch = min(INSERT_BATCH, target - current)
+        cursor.executemany(
+            "INSERT INTO bench_title (title) VALUES (%s)",
+            [(make_title(rng, vocabulary),) for _ in range(batch)],
+        )
+        conn.commit()
+        current += batch
+    cursor.close()
+    return current
+
+
+def time_query(conn, sql, params, repeat):
+    """Run a query repeat times; return (median ms, rows returned)"""
+    cursor = conn.cursor()
+    timings, rows = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cursor.execute(sql, params)
+        rows = len(cursor.fetchall())
+        timings.append((time.perf_counter() - start) * 1000)
+    cursor.close()
+    return statistics.median(timings), rows
+
+
+def benchmark_terms(vocabulary) -> list:
+    """A common word, a mid-frequency word, a rare word, a prefix and a phrase"""
+    words, _ = vocabulary
+    return [
+        words[0],
+        words[len(words) // 10],
+        words[-1],
+        words[1][:4],
+        f"{words[2]} {words[5]}",
+    ]
+
+
+def run(sizes, repeat, seed):
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(rng)
+    terms = benchmark_terms(vocabulary)
+
+    with db_pool.get_pool(False).get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"DROP DATABASE IF EXISTS {BENCH_DATABASE}")
+        cursor.execute(f"CREATE DATABASE {BENCH_DATABASE}")
+        cursor.close()
+
+    results = []
+    with db_pool.get_pool(True, database=BENCH_DATABASE).get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE bench_title (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                title VARCHAR(150) NOT NULL
+            )
+        """)
+        cursor.close()
+
+        rows = 0
+        for size in sorted(sizes):
+            rows = grow(conn, rng, vocabulary, rows, size)
+
+            cursor = conn.cursor()
+            start = time.perf_counter()
+            cursor.execute("ALTER TABLE bench_title ADD FULLTEXT INDEX ft_title (title)")
+            index_ms = (time.perf_counter() - start) * 1000
+            cursor.close()
+
+            for term in terms:
+                like_ms, like_rows = time_query(
+                    conn,
+                    "SELECT id, title FROM bench_title WHERE title LIKE %s",
+                    (f"%{term}%",),
+                    repeat,
+                )
+                indexed, _ = search.split_terms(term)
+                query = search.boolean_query(indexed)
+                ft_ms, ft_rows = time_query(
+                    conn,
+                    """SELECT id, title FROM bench_title
+                       WHERE MATCH(title) AGAINST (%s IN BOOLEAN MODE)
+                       ORDER BY MATCH(title) AGAINST (%s IN BOOLEAN MODE) DESC""",
+                    (query, query),
+                    repeat,
+                )
+                results.append({
+                    "rows": size,
+                    "term": term,
+                    "like_ms": round(like_ms, 3),
+                    "like_matches": like_rows,
+                    "fulltext_ms": round(ft_ms, 3),
+                    "fulltext_matches": ft_rows,
+                    "speedup": round(like_ms / ft_ms, 1) if ft_ms else None,
+                    "index_build_ms": round(index_ms, 1),
+                })
+
+            # Rebuilding after the next batch is faster than maintaining it
+            cursor = conn.cursor()
+            cursor.execute("ALTER TABLE bench_title DROP INDEX ft_title")
+            cursor.close()
+
+    with db_pool.get_pool(False).get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"DROP DATABASE IF EXISTS {BENCH_DATABASE}")
+        cursor.close()
+    return results
+
+
+def print_results(results):
+    header = f"{'rows':>9} {'term':<20} {'LIKE ms':>10} {'FT ms':>10} {'speedup':>8} {'LIKE/FT hits':>14}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['rows']:>9} {r['term']:<20} {r['like_ms']:>10} {r['fulltext_ms']:>10} "
+            f"{str(r['speedup']) + 'x':>8} {str(r['like_matches']) + '/' + str(r['fulltext_matches']):>14}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat, args.seed)
+    print_results(results)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
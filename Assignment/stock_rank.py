@@ -0,0 +1,82 @@
+"""
+Movie stock ranking queries backed by the StockLevel table
+
+Ranks match MovieStockRanking (RANK() OVER (ORDER BY stock_count DESC)),
+but are read from the per-stock-level counts of StockRanking.sql instead
+of sorting every movie. Each query costs an index lookup plus a scan of
+the stock levels involved, which stays small however many movies there
+are. Movies with the same stock share a rank and are listed newest first,
+the order idx_movie_stock gives when read backwards.
+"""
+
+# The same queries through the window-function view, for comparison
+WINDOW_QUERIES = {
+    "top": "SELECT * FROM MovieStockRanking ORDER BY StockRank LIMIT %s",
+    "rank": "SELECT StockRank FROM MovieStockRanking WHERE movie_id = %s",
+    "between": "SELECT * FROM MovieStockRanking WHERE StockRank BETWEEN %s AND %s",
+}
+
+TOP_SQL = """
+    SELECT m.movie_id, m.title, m.stock_count, r.first_rank AS StockRank
+    FROM (
+        SELECT movie_id, title, stock_count
+        FROM Movie
+        ORDER BY stock_count DESC, movie_id DESC
+        LIMIT %s
+    ) m
+    JOIN StockLevelRank r ON r.stock_count = m.stock_count
+    ORDER BY m.stock_count DESC, m.movie_id DESC
+"""
+
+RANK_SQL = """
+    SELECT CAST(1 + IFNULL(SUM(l.movies), 0) AS UNSIGNED)
+    FROM Movie m
+    LEFT JOIN StockLevel l ON l.stock_count > m.stock_count
+    WHERE m.movie_id = %s
+    GROUP BY m.movie_id
+"""
+
+BETWEEN_SQL = """
+    SELECT m.movie_id, m.title, m.stock_count, r.first_rank AS StockRank
+    FROM StockLevelRank r
+    JOIN Movie m ON m.stock_count = r.stock_count
+    WHERE r.first_rank BETWEEN %s AND %s
+    ORDER BY m.stock_count DESC, m.movie_id DESC
+"""
+
+
+def _rows(conn, sql: str, params) -> list:
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    rows = cursor.fetchall()
+    cursor.close()
+    return rows
+
+
+def top(conn, limit: int) -> list:
+    """
+    The limit best-stocked movies
+
+    Returns:
+        (movie_id, title, stock_count, StockRank) rows, highest stock first
+    """
+    return _rows(conn, TOP_SQL, (limit,))
+
+
+def rank_of(conn, movie_id: int):
+    """Stock rank of one movie, or None if it does not exist"""
+    rows = _rows(conn, RANK_SQL, (movie_id,))
+    return rows[0][0] if rows else None
+
+
+def between(conn, first: int, last: int) -> list:
+    """
+    Movies ranked first to last (inclusive)
+
+    As with RANK(), a tie may start before first; those movies are left
+    out, and every movie sharing rank last is included.
+
+    Returns:
+        (movie_id, title, stock_count, StockRank) rows in rank order
+    """
+    return _rows(conn, BETWEEN_SQL, (first, last))
@@ -0,0 +1,203 @@
+"""
+Benchmark the maintained stock ranking against the MovieStockRanking view
+
+Builds a scratch database with a Movie table (only the columns the
+ranking reads), grows it to each requested size and times "top N",
+"rank of a movie" and "ranks A to B" through the window-function view and
+through StockRanking.sql. The answers of both are compared, and the cost
+of the ranking triggers is measured on a batch of stock updates.
+
+Usage:
+    python stock_rank_benchmark.py [--sizes 10000 100000 1000000] [--repeat 5]
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+
+import bulk_load
+import db_pool
+import stock_rank
+from Assignment6 import VIEWS
+from datagen import make_title, make_vocabulary
+
+BENCH_DATABASE = "MovieMusicStoreRankBench"
+INSERT_BATCH = 5000
+TOP_N = 10
+RANK_WINDOW = 100  # Ranks per "between" query
+STOCK_UPDATES = 1000  # Single-row updates timed with and without the triggers
+RANK_TRIGGERS = ("trg_stock_level_insert", "trg_stock_level_update", "trg_stock_level_delete")
+
+
+def grow(conn, rng, vocabulary, current: int, target: int) -> int:
+    """Insert synthetic movies (datagen's stock distribution) up to target rows"""
+    cursor = conn.cursor()
+    # Bulk rows are counted by the rebuild, not by the triggers
+    for trigger in RANK_TRIGGERS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    while current < target:
+        batch = min(INSERT_BATCH, target - current)
+        cursor.executemany(
+            "INSERT INTO Movie (title, stock_count) VALUES (%s, %s)",
+            [
+                (make_title(rng, vocabulary), int(rng.paretovariate(1.5) * 5))
+                for _ in range(batch)
+            ],
+        )
+        conn.commit()
+        current += batch
+    cursor.close()
+    return current
+
+
+def time_query(conn, sql, params, repeat):
+    """Run a query repeat times; return (median ms, rows of the last run)"""
+    cursor = conn.cursor()
+    timings, rows = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    cursor.close()
+    return statistics.median(timings), rows
+
+
+def update_stock(conn, rng, size: int, count: int = STOCK_UPDATES) -> float:
+    """Change the stock of count random movies one statement at a time; return ms"""
+    cursor = conn.cursor()
+    start = time.perf_counter()
+    for _ in range(count):
+        cursor.execute(
+            "UPDATE Movie SET stock_count = %s WHERE movie_id = %s",
+            (int(rng.paretovariate(1.5) * 5), rng.randint(1, size)),
+        )
+    conn.commit()
+    elapsed = (time.perf_counter() - start) * 1000
+    cursor.close()
+    return round(elapsed, 1)
+
+
+def _ranked(rows) -> set:
+    """(movie_id, StockRank) pairs, ignoring the order of tied movies"""
+    return {(row[0], row[3]) for row in rows}
+
+
+def run(sizes, repeat, seed):
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(rng)
+
+    with db_pool.get_pool(False).get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"DROP DATABASE IF EXISTS {BENCH_DATABASE}")
+        cursor.execute(f"CREATE DATABASE {BENCH_DATABASE}")
+        cursor.close()
+
+    results = []
+    with db_pool.get_pool(True, database=BENCH_DATABASE).get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE Movie (
+                movie_id INT AUTO_INCREMENT PRIMARY KEY,
+                title VARCHAR(150) NOT NULL,
+                stock_count INT NOT NULL DEFAULT 0,
+                INDEX idx_movie_stock (stock_count)
+            )
+        """)
+        cursor.execute(VIEWS["MovieStockRanking"])
+        cursor.close()
+
+        rows = 0
+        for size in sorted(sizes):
+            rows = grow(conn, rng, vocabulary, rows, size)
+            update_ms_without = update_stock(conn, rng, size)
+
+            start = time.perf_counter()
+            bulk_load.execute_script(conn, "StockRanking.sql")
+            build_ms = (time.perf_counter() - start) * 1000
+            update_ms_with = update_stock(conn, rng, size)
+
+            movie_id = rng.randint(1, size)
+            first = size // 2
+            cases = (
+                ("top", (TOP_N,), stock_rank.TOP_SQL, (TOP_N,)),
+                ("rank", (movie_id,), stock_rank.RANK_SQL, (movie_id,)),
+                (
+                    "between",
+                    (first, first + RANK_WINDOW - 1),
+                    stock_rank.BETWEEN_SQL,
+                    (first, first + RANK_WINDOW - 1),
+                ),
+            )
+            for query, window_params, sql, params in cases:
+                window_ms, window_rows = time_query(
+                    conn, stock_rank.WINDOW_QUERIES[query], window_params, repeat
+                )
+                maintained_ms, maintained_rows = time_query(conn, sql, params, repeat)
+                if query == "rank":
+                    same = window_rows == maintained_rows
+                elif query == "top":
+                    # Ties at the cut-off may pick different movies
+                    same = [row[3] for row in window_rows] == [row[3] for row in maintained_rows]
+                else:
+                    same = _ranked(window_rows) == _ranked(maintained_rows)
+                results.append({
+                    "rows": size,
+                    "query": query,
+                    "window_ms": round(window_ms, 3),
+                    "maintained_ms": round(maintained_ms, 3),
+                    "speedup": round(window_ms / maintained_ms, 1) if maintained_ms else None,
+                    "results": len(maintained_rows),
+                    "same": same,
+                    "build_ms": round(build_ms, 1),
+                    "update_ms_without_triggers": update_ms_without,
+                    "update_ms_with_triggers": update_ms_with,
+                })
+
+    with db_pool.get_pool(False).get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f"DROP DATABASE IF EXISTS {BENCH_DATABASE}")
+        cursor.close()
+    return results
+
+
+def print_results(results):
+    header = (
+        f"{'rows':>9} {'query':<8} {'window ms':>10} {'ranked ms':>10} "
+        f"{'speedup':>8} {'rows':>6} {'same':>5}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['rows']:>9} {r['query']:<8} {r['window_ms']:>10} {r['maintained_ms']:>10} "
+            f"{str(r['speedup']) + 'x':>8} {r['results']:>6} {str(r['same']):>5}"
+        )
+    print(f"\n{STOCK_UPDATES} stock updates (ms) and StockLevel build time:")
+    for r in results:
+        if r["query"] == "top":
+            print(
+                f"{r['rows']:>9}: {r['update_ms_without_triggers']} without triggers, "
+                f"{r['update_ms_with_triggers']} with triggers; built in {r['build_ms']} ms"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat, args.seed)
+    print_results(results)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
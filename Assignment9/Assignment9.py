@@ -5,71 +5,442 @@ Requires:
 - tkinter
 """
 
+import argparse
+import sys
+import time
+from itertools import count
+from pathlib import Path
+
 import mysql.connector
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import filedialog, ttk, messagebox
+
+# Shared database helpers live next to the Assignment6 CLI
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Assignment"))
+import bulk_ops  # noqa: E402
+import column_sort  # noqa: E402
+import db_pool  # noqa: E402
+import query_metrics  # noqa: E402
+import search  # noqa: E402
+import stock_rank  # noqa: E402
+from artist_cache import ArtistCache, add_album, link_artists, split_names  # noqa: E402
+from catalog_cache import AlbumRow, CachedPager, CatalogCache, MovieRow  # noqa: E402
+from catalog_queries import (  # noqa: E402
+    MOVIE_CATALOG_SQL,
+    MOVIE_PAGE_SQL,
+    MOVIE_SORT_SQL,
+    MUSIC_CATALOG_SQL,
+    MUSIC_PAGE_SQL,
+    MUSIC_SORT_SQL,
+    SORT_LIMIT,
+)
+from db_worker import QueryWorker  # noqa: E402
+from paging import KeysetPager, PagedTree, add_scrollbar  # noqa: E402
+from search_cache import SearchCache  # noqa: E402
+
+SEARCH_DEBOUNCE_MS = 250  # Quiet time after the last keystroke before searching
+CATALOG_SYNC_MS = 5000  # How often the catalog cache checks for other writers
+STARTUP_MILESTONES = ("first_paint", "connected", "first_data")
+
+
+def make_pager(page_sql: str) -> KeysetPager:
+    """Build a keyset pager from a page query template"""
+    return KeysetPager(
+        page_sql.format(op=">", direction="ASC"),
+        page_sql.format(op="<", direction="DESC"),
+    )
 
 
 class MovieMusicStoreGUI:
     """Main GUI class for the Movie Music Store application"""
 
-    def __init__(self):
-        """Initialize the main application window and setup UI components"""
+    def __init__(self, measure_startup: bool = False):
+        """
+        Initialize the main application window and setup UI components
+
+        Nothing here waits for the database: the pool connects lazily, the
+        connection is checked in the background (see connect_db) and each
+        tab loads its data the first time it is shown.
+
+        Args:
+            measure_startup: Print the startup milestones to stderr and
+                close the window once the first data is shown
+        """
+        self.started = time.perf_counter()
+        self.measure_startup = measure_startup
+        self.startup_times = {}  # milestone -> ms since the window was created
+
         self.root = tk.Tk()
         self.root.title("Movie Music Store Management System")
         self.root.geometry("800x600")
+        self.root.bind("<Map>", self.on_map, add="+")
 
-        # Setup database connection
-        self.db = self.connect_db()
+        self.pool = db_pool.get_pool(True)
+        self.connected = None  # None while the connection is being checked
+        self.artist_cache = ArtistCache()
+        self.setup_menu()
+
+        # Status bar and background query worker
+        self.status_var = tk.StringVar(value="Ready")
+        self.connection_var = tk.StringVar()
+        self.setup_status_bar()
+        self.worker = QueryWorker(self.root, self.pool, on_status=self.update_status)
 
         # Initialize search variables
         self.movie_search_var = tk.StringVar()
         self.music_search_var = tk.StringVar()
 
-        # Create main notebook for tabs
+        # Catalog rows held in memory; pages fall back to the database until warm
+        self.movie_catalog = CatalogCache(
+            "Movie", "movie_id", MovieRow, MOVIE_CATALOG_SQL, fields=(1,)
+        )
+        self.music_catalog = CatalogCache(
+            "MusicAlbum", "ma.album_id", AlbumRow, MUSIC_CATALOG_SQL, fields=(1, 2)
+        )
+
+        # Column sort and filter per tab, and the search results they apply to
+        self.views = {
+            "movie": column_sort.ListView(column_sort.MOVIE_COLUMNS),
+            "music": column_sort.ListView(column_sort.MUSIC_COLUMNS),
+        }
+        self._results = {"movie": None, "music": None}  # tab -> (serial, rows)
+        self._result_serial = count()
+
+        # Create main notebook for tabs; each tab loads on first activation
         self.notebook = ttk.Notebook(self.root)
         self.notebook.pack(expand=True, fill="both", padx=10, pady=5)
+        self.tabs = {}  # notebook tab id -> "movie" or "music"
+        self._filter_loaders = {}  # tab -> loads the filter choices
+        self._loaded_tabs = set()
 
         # Setup tabs
         self.setup_movie_tab()
         self.setup_music_tab()
+        self.notebook.bind("<<NotebookTabChanged>>", lambda _: self.load_current_tab())
+
+        # Search as you type, with cached results per term
+        self.movie_search_cache = SearchCache(fields=(1,))
+        self.music_search_cache = SearchCache(fields=(1, 2))
+        self._search_timers = {}
+        self.movie_search_var.trace_add(
+            "write", lambda *_: self.debounce("movie_search", self.search_movies)
+        )
+        self.music_search_var.trace_add(
+            "write", lambda *_: self.debounce("music_search", self.search_music)
+        )
+        self.connect_db()
+
+    def connect_db(self):
+        """
+        Open the first pooled connection in the background
+
+        The status bar shows the connection state; once connected, the
+        visible tab loads and the catalog caches warm up. A failure offers
+        a retry instead of blocking the window.
+        """
+        self.connected = None
+        self.connection_var.set("Connecting to database...")
+        self.retry_button.pack_forget()
+
+        def connected(_):
+            self.connected = True
+            self.mark_startup("connected")
+            self.connection_var.set(f"Connected to {self.pool.connect_args.get('database')}")
+            self.load_current_tab()
+            self.warm_catalogs()
+
+        def failed(err):
+            self.connected = False
+            self.connection_var.set("Database unavailable")
+            self.retry_button.pack(side="right", padx=5)
+            if self.measure_startup:
+                self.finish_startup()
+            else:
+                messagebox.showerror("Database Error", f"Failed to connect to database: {err}")
+
+        self.worker.submit(
+            lambda conn: conn.connection_id,
+            connected,
+            failed,
+            key="connect",
+            cancellable=False,
+            label="connect",
+        )
+
+    def on_map(self, event):
+        """Record the first paint once the main window is mapped"""
+        if event.widget is self.root and "first_paint" not in self.startup_times:
+            # Idle callbacks run in order, so the window's redraws come first
+            self.root.after_idle(lambda: self.mark_startup("first_paint"))
+
+    def mark_startup(self, milestone: str):
+        """
+        Record the first time a startup milestone is reached
+
+        Args:
+            milestone: One of STARTUP_MILESTONES
+        """
+        if milestone in self.startup_times:
+            return
+        self.startup_times[milestone] = round((time.perf_counter() - self.started) * 1000, 1)
+        if all(name in self.startup_times for name in STARTUP_MILESTONES):
+            self.finish_startup()
+
+    def finish_startup(self):
+        """In startup measurement mode, report the milestones and close"""
+        if not self.measure_startup:
+            return
+        self.measure_startup = False
+        print(
+            "startup: "
+            + ", ".join(
+                f"{name}={self.startup_times.get(name, 'n/a')}ms"
+                for name in STARTUP_MILESTONES
+            ),
+            file=sys.stderr,
+        )
+        self.root.after_idle(self.root.destroy)
+
+    def load_current_tab(self):
+        """Load the shown tab's list and filter choices the first time it is shown"""
+        tab = self.tabs.get(self.notebook.select())
+        if tab is None or tab in self._loaded_tabs or not self.connected:
+            return
+        self._loaded_tabs.add(tab)
+        self._filter_loaders[tab]()
+        if self._results[tab] is None:
+            self.show_list(tab)
+
+    def setup_menu(self):
+        """Setup the menu bar"""
+        menubar = tk.Menu(self.root)
+        db_menu = tk.Menu(menubar, tearoff=0)
+        db_menu.add_command(label="Pool Statistics", command=self.show_pool_stats)
+        db_menu.add_command(label="Query Metrics", command=self.show_query_metrics)
+        db_menu.add_command(label="Stock Ranking", command=self.show_stock_ranking)
+        menubar.add_cascade(label="Database", menu=db_menu)
+        self.root.config(menu=menubar)
+
+    def show_pool_stats(self):
+        """Show connection pool and catalog cache statistics"""
+        lines = [db_pool.format_stats()]
+        for catalog in (self.movie_catalog, self.music_catalog):
+            lines.append(f"Catalog {catalog.table}")
+            for name, value in catalog.stats().items():
+                lines.append(f"  {name:<16} {value}")
+        messagebox.showinfo("Connection Pool", "\n".join(lines))
+
+    def show_query_metrics(self):
+        """Show per-screen and per-statement query timings"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Query Metrics")
+        dialog.geometry("900x500")
+
+        text = tk.Text(dialog, wrap="none", font="TkFixedFont")
+        text.pack(fill="both", expand=True, padx=10, pady=5)
+
+        def refresh():
+            text.delete("1.0", "end")
+            text.insert("1.0", query_metrics.format_snapshot())
+
+        def save_json():
+            path = filedialog.asksaveasfilename(
+                parent=dialog, defaultextension=".json", filetypes=[("JSON", "*.json")]
+            )
+            if path:
+                with open(path, "w", encoding="utf-8") as file:
+                    file.write(query_metrics.to_json())
+
+        def reset():
+            query_metrics.reset()
+            refresh()
+
+        buttons = ttk.Frame(dialog)
+        buttons.pack(fill="x", padx=10, pady=5)
+        ttk.Button(buttons, text="Refresh", command=refresh).pack(side="left")
+        ttk.Button(buttons, text="Reset", command=reset).pack(side="left", padx=5)
+        ttk.Button(buttons, text="Save JSON...", command=save_json).pack(side="right")
+        refresh()
+
+    def show_stock_ranking(self):
+        """Browse movies by stock rank (see stock_rank)"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Movie Stock Ranking")
+        dialog.geometry("700x450")
+
+        controls = ttk.Frame(dialog)
+        controls.pack(fill="x", padx=10, pady=5)
+        ttk.Label(controls, text="Top:").pack(side="left")
+        top_entry = ttk.Entry(controls, width=6)
+        top_entry.insert(0, "20")
+        top_entry.pack(side="left", padx=(0, 5))
+        ttk.Label(controls, text="Ranks:").pack(side="left", padx=(10, 0))
+        first_entry = ttk.Entry(controls, width=8)
+        first_entry.pack(side="left")
+        ttk.Label(controls, text="to").pack(side="left", padx=2)
+        last_entry = ttk.Entry(controls, width=8)
+        last_entry.pack(side="left", padx=(0, 5))
+        ttk.Label(controls, text="Movie ID:").pack(side="left", padx=(10, 0))
+        movie_entry = ttk.Entry(controls, width=8)
+        movie_entry.pack(side="left", padx=(0, 5))
+
+        list_frame = ttk.Frame(dialog)
+        list_frame.pack(fill="both", expand=True, padx=10, pady=5)
+        tree = ttk.Treeview(
+            list_frame, columns=("Rank", "ID", "Title", "Stock"), show="headings"
+        )
+        for column, width in (("Rank", 60), ("ID", 60), ("Title", 380), ("Stock", 60)):
+            tree.heading(column, text=column)
+            tree.column(column, width=width)
+        add_scrollbar(list_frame, tree)
+        tree.pack(side="left", fill="both", expand=True)
+        status = ttk.Label(dialog)
+        status.pack(fill="x", padx=10, pady=(0, 5))
+
+        def show(rows):
+            tree.delete(*tree.get_children())
+            for movie_id, title, stock, rank in rows:
+                tree.insert("", "end", values=(rank, movie_id, title, stock))
+            status.config(text=f"{len(rows)} movie(s)")
+
+        def run(fn):
+            self.worker.submit(
+                fn,
+                show,
+                self.show_error("Failed to read the stock ranking", "Database Error"),
+                key="stock_ranking",
+                label="Stock ranking",
+            )
+
+        def numbers(*entries):
+            try:
+                return [int(entry.get()) for entry in entries]
+            except ValueError:
+                messagebox.showerror("Error", "Enter whole numbers", parent=dialog)
+                return None
+
+        def show_top():
+            values = numbers(top_entry)
+            if values:
+                run(lambda conn: stock_rank.top(conn, values[0]))
+
+        def show_ranks():
+            values = numbers(first_entry, last_entry)
+            if values:
+                run(lambda conn: stock_rank.between(conn, *values))
+
+        def find_movie():
+            values = numbers(movie_entry)
+            if not values:
+                return
+
+            def find(conn):
+                rank = stock_rank.rank_of(conn, values[0])
+                return [] if rank is None else stock_rank.between(conn, rank, rank)
+
+            run(find)
+
+        ttk.Button(controls, text="Show", command=show_top).pack(side="left")
+        ttk.Button(controls, text="Show Ranks", command=show_ranks).pack(side="left", padx=5)
+        ttk.Button(controls, text="Find", command=find_movie).pack(side="left")
+        show_top()
+
+    def warm_catalogs(self):
+        """Load both catalogs in the background, then keep them in sync"""
+
+        def warm(conn):
+            return [catalog.warm(conn) for catalog in (self.movie_catalog, self.music_catalog)]
+
+        def done(ready):
+            if any(ready):
+                self.root.after(CATALOG_SYNC_MS, self.sync_catalogs)
+
+        self.worker.submit(
+            warm,
+            done,
+            self.show_error("Failed to load the catalog cache", "Database Error"),
+            cancellable=False,
+        )
+
+    def sync_catalogs(self):
+        """Pick up rows changed by other clients and refresh what is shown"""
+
+        def sync(conn):
+            return self.movie_catalog.sync(conn), self.music_catalog.sync(conn)
+
+        def done(changed):
+            for tab, tab_changed in zip(("movie", "music"), changed):
+                # Tabs not shown yet load current rows when they are opened
+                if tab_changed and tab in self._loaded_tabs:
+                    self.after_bulk_change(tab)
+
+        # Errors are not shown: a lost connection is reported by the next user action
+        self.worker.submit(sync, done, lambda err: None, key="catalog_sync")
+        self.root.after(CATALOG_SYNC_MS, self.sync_catalogs)
+
+    def setup_status_bar(self):
+        """Setup the status bar showing in-flight database work"""
+        status_frame = ttk.Frame(self.root)
+        status_frame.pack(side="bottom", fill="x", padx=10, pady=(0, 5))
+
+        ttk.Label(status_frame, textvariable=self.status_var).pack(side="left")
+        self.cancel_button = ttk.Button(
+            status_frame, text="Cancel", command=self.cancel_queries, state="disabled"
+        )
+        self.cancel_button.pack(side="right")
+        # Packed next to the connection state only while the database is unreachable
+        self.retry_button = ttk.Button(status_frame, text="Retry", command=self.connect_db)
+        ttk.Label(status_frame, textvariable=self.connection_var).pack(side="right", padx=10)
+
+    def update_status(self, in_flight: int):
+        """
+        Show how many database calls are still running
+
+        Args:
+            in_flight: Number of queued or running queries
+        """
+        if in_flight:
+            self.status_var.set(f"Working... ({in_flight} queries in flight)")
+            self.cancel_button.config(state="normal")
+        else:
+            self.status_var.set("Ready")
+            self.cancel_button.config(state="disabled")
+
+    def cancel_queries(self):
+        """Cancel all running reads"""
+        self.worker.cancel_all()
+
+    def debounce(self, name: str, callback):
+        """
+        Run callback once no new call for name arrived within the debounce delay
 
-    def connect_db(
-        self, use_database: bool = True
-    ) -> mysql.connector.connection.MySQLConnection:
+        Args:
+            name: Identifies the debounced action
+            callback: Function to run after the quiet period
         """
-        Establish database connection with error handling
+        timer = self._search_timers.pop(name, None)
+        if timer is not None:
+            self.root.after_cancel(timer)
+        self._search_timers[name] = self.root.after(SEARCH_DEBOUNCE_MS, callback)
+
+    def show_error(self, message: str, title: str = "Error"):
+        """
+        Build an error callback for background database calls
 
         Args:
-            use_database: Whether to connect to specific database or just server
+            message: Text shown before the database error
+            title: Message box title
 
         Returns:
-            MySQL connection object
+            Callback taking the mysql error
         """
-        try:
-            if use_database:
-                return mysql.connector.connect(
-                    host="localhost",
-                    user="root",  # Replace with your username
-                    password="",  # Replace with your password
-                    database="MovieMusicStore",
-                )
-            else:
-                return mysql.connector.connect(
-                    host="localhost",
-                    user="root",  # Replace with your username
-                    password="",  # Replace with your password
-                )
-        except mysql.connector.Error as err:
-            messagebox.showerror(
-                "Database Error", f"Failed to connect to database: {err}"
-            )
-            return None
+        return lambda err: messagebox.showerror(title, f"{message}: {err}")
 
     def setup_movie_tab(self):
         """Setup the Movies tab with all CRUD operations"""
         movie_tab = ttk.Frame(self.notebook)
         self.notebook.add(movie_tab, text="Movies")
+        self.tabs[str(movie_tab)] = "movie"
 
         # Movie Search Frame
         search_frame = ttk.LabelFrame(movie_tab, text="Search Movies", padding=10)
@@ -82,26 +453,34 @@ class MovieMusicStoreGUI:
             side="left"
         )
 
+        self.setup_filter_frame(movie_tab, "movie")
+
         # Movie List
         list_frame = ttk.LabelFrame(movie_tab, text="Movie List", padding=10)
         list_frame.pack(fill="both", expand=True, padx=5, pady=5)
 
-        columns = (
-            "ID",
-            "Title",
-            "Genre",
-            "Release Date",
-            "Rating",
-            "Runtime (min)",
-            "Stock",
+        columns = tuple(column.heading for column in column_sort.MOVIE_COLUMNS)
+        self.movie_tree = ttk.Treeview(
+            list_frame, columns=columns, show="headings", selectmode="extended"
         )
-        self.movie_tree = ttk.Treeview(list_frame, columns=columns, show="headings")
 
-        for col in columns:
-            self.movie_tree.heading(col, text=col)
+        for position, col in enumerate(columns):
+            self.movie_tree.heading(
+                col, text=col, command=lambda c=position: self.sort_list("movie", c)
+            )
             self.movie_tree.column(col, width=100)
 
+        scrollbar = add_scrollbar(list_frame, self.movie_tree)
         self.movie_tree.pack(fill="both", expand=True)
+        self.movie_pages = PagedTree(
+            self.movie_tree,
+            scrollbar,
+            CachedPager(make_pager(MOVIE_PAGE_SQL), self.movie_catalog),
+            self.worker,
+            self.show_error("Failed to fetch movies", "Database Error"),
+            name="Movies",
+            on_load=lambda rows: self.mark_startup("first_data"),
+        )
 
         # Movie CRUD Frame
         crud_frame = ttk.Frame(movie_tab)
@@ -116,14 +495,22 @@ class MovieMusicStoreGUI:
         ttk.Button(crud_frame, text="Delete Movie", command=self.delete_movie).pack(
             side="left", padx=5
         )
-
-        # Load initial data
-        self.refresh_movie_list()
+        ttk.Button(
+            crud_frame,
+            text="Adjust Stock",
+            command=lambda: self.show_adjust_stock_dialog("movie"),
+        ).pack(side="left", padx=5)
+        ttk.Button(
+            crud_frame,
+            text="Paste Import",
+            command=lambda: self.show_paste_import_dialog("movie"),
+        ).pack(side="left", padx=5)
 
     def setup_music_tab(self):
         """Setup the Music tab with all CRUD operations"""
         music_tab = ttk.Frame(self.notebook)
         self.notebook.add(music_tab, text="Music")
+        self.tabs[str(music_tab)] = "music"
 
         # Music Search Frame
         search_frame = ttk.LabelFrame(music_tab, text="Search Music", padding=10)
@@ -136,18 +523,34 @@ class MovieMusicStoreGUI:
             side="left"
         )
 
+        self.setup_filter_frame(music_tab, "music")
+
         # Music List
         list_frame = ttk.LabelFrame(music_tab, text="Music List", padding=10)
         list_frame.pack(fill="both", expand=True, padx=5, pady=5)
 
-        columns = ("ID", "Title", "Artist", "Genre", "Release Date", "Stock")
-        self.music_tree = ttk.Treeview(list_frame, columns=columns, show="headings")
+        columns = tuple(column.heading for column in column_sort.MUSIC_COLUMNS)
+        self.music_tree = ttk.Treeview(
+            list_frame, columns=columns, show="headings", selectmode="extended"
+        )
 
-        for col in columns:
-            self.music_tree.heading(col, text=col)
+        for position, col in enumerate(columns):
+            self.music_tree.heading(
+                col, text=col, command=lambda c=position: self.sort_list("music", c)
+            )
             self.music_tree.column(col, width=100)
 
+        scrollbar = add_scrollbar(list_frame, self.music_tree)
         self.music_tree.pack(fill="both", expand=True)
+        self.music_pages = PagedTree(
+            self.music_tree,
+            scrollbar,
+            CachedPager(make_pager(MUSIC_PAGE_SQL), self.music_catalog),
+            self.worker,
+            self.show_error("Failed to fetch music", "Database Error"),
+            name="Music",
+            on_load=lambda rows: self.mark_startup("first_data"),
+        )
 
         # Music CRUD Frame
         crud_frame = ttk.Frame(music_tab)
@@ -162,53 +565,180 @@ class MovieMusicStoreGUI:
         ttk.Button(crud_frame, text="Delete Music", command=self.delete_music).pack(
             side="left", padx=5
         )
-
-        # Load initial data
-        self.refresh_music_list()
+        ttk.Button(
+            crud_frame,
+            text="Adjust Stock",
+            command=lambda: self.show_adjust_stock_dialog("music"),
+        ).pack(side="left", padx=5)
+        ttk.Button(
+            crud_frame,
+            text="Paste Import",
+            command=lambda: self.show_paste_import_dialog("music"),
+        ).pack(side="left", padx=5)
 
     def refresh_movie_list(self):
-        """Refresh the movie list from database"""
-        try:
-            cursor = self.db.cursor()
-            cursor.execute("""
-                SELECT movie_id, title, genre, release_date, rating, runtime_minutes, stock_count 
-                FROM Movie
-            """)
-
-            # Clear existing items
-            for item in self.movie_tree.get_children():
-                self.movie_tree.delete(item)
-
-            # Insert new data
-            for row in cursor.fetchall():
-                self.movie_tree.insert("", "end", values=row)
-
-            cursor.close()
-        except mysql.connector.Error as err:
-            messagebox.showerror("Database Error", f"Failed to fetch movies: {err}")
+        """Reload the first page of the movie list from database"""
+        self.worker.cancel("movie_search")
+        self._results["movie"] = None
+        self.show_list("movie")
 
     def refresh_music_list(self):
-        """Refresh the music list from database"""
-        try:
-            cursor = self.db.cursor()
-            cursor.execute("""
-                SELECT ma.album_id, ma.title, a.artist_name, ma.genre, ma.release_date, ma.stock_count 
-                FROM MusicAlbum ma 
-                LEFT JOIN Album_Artist aa ON ma.album_id = aa.album_id
-                LEFT JOIN Artist a ON aa.artist_id = a.artist_id
-            """)
-
-            # Clear existing items
-            for item in self.music_tree.get_children():
-                self.music_tree.delete(item)
-
-            # Insert new data
-            for row in cursor.fetchall():
-                self.music_tree.insert("", "end", values=row)
-
-            cursor.close()
-        except mysql.connector.Error as err:
-            messagebox.showerror("Database Error", f"Failed to fetch music: {err}")
+        """Reload the first page of the music list from database"""
+        self.worker.cancel("music_search")
+        self._results["music"] = None
+        self.show_list("music")
+
+    def setup_filter_frame(self, parent: ttk.Frame, tab: str):
+        """
+        Setup the filter bar above a list
+
+        Args:
+            parent: Tab frame
+            tab: "movie" or "music"
+        """
+        view = self.views[tab]
+        table = "Movie" if tab == "movie" else "MusicAlbum"
+        frame = ttk.LabelFrame(parent, text="Filter", padding=5)
+        frame.pack(fill="x", padx=5)
+
+        fields = {}
+        choices = [
+            column.sql for column in view.columns if column.sql in ("genre", "rating")
+        ]
+        layout = [("Genre:", "genre")]
+        if "rating" in choices:
+            layout.append(("Rating:", "rating"))
+        layout += [
+            ("Year:", "year_from"),
+            ("to", "year_to"),
+            ("Stock:", "stock_min"),
+            ("to", "stock_max"),
+        ]
+        for label, name in layout:
+            ttk.Label(frame, text=label).pack(side="left")
+            if name in choices:
+                entry = ttk.Combobox(frame, width=12)
+            else:
+                entry = ttk.Entry(frame, width=6)
+            entry.pack(side="left", padx=(2, 8))
+            entry.bind("<Return>", lambda _: apply())
+            fields[name] = entry
+
+        def apply():
+            values = {}
+            try:
+                for name, entry in fields.items():
+                    text = entry.get().strip()
+                    if not text:
+                        continue
+                    values[name] = text if name in choices else int(text)
+            except ValueError:
+                messagebox.showerror("Error", "Years and stock must be whole numbers")
+                return
+            view.filter = column_sort.Filter(**values)
+            self.show_list(tab)
+
+        def clear():
+            for entry in fields.values():
+                entry.delete(0, "end")
+            view.filter = column_sort.Filter()
+            self.show_list(tab)
+
+        ttk.Button(frame, text="Clear", command=clear).pack(side="right")
+        ttk.Button(frame, text="Apply", command=apply).pack(side="right", padx=5)
+
+        # Offer the values in use (read through the column indexes)
+        def load_choices(conn):
+            return {
+                name: [
+                    row[0]
+                    for row in conn.execute(
+                        f"SELECT DISTINCT {name} FROM {table} WHERE {name} IS NOT NULL ORDER BY {name}"
+                    ).fetchall()
+                ]
+                for name in choices
+            }
+
+        def show_choices(values):
+            for name, options in values.items():
+                fields[name].configure(values=options)
+
+        # Loaded with the tab (see load_current_tab)
+        self._filter_loaders[tab] = lambda: self.worker.submit(
+            load_choices, show_choices, lambda err: None
+        )
+
+    def sort_list(self, tab: str, column: int):
+        """
+        Sort a list by a column; clicking again reverses the order and
+        clicking ID returns to key order
+
+        Args:
+            tab: "movie" or "music"
+            column: Position of the clicked column
+        """
+        self.views[tab].toggle(column)
+        self.show_list(tab)
+
+    def update_headings(self, tab: str):
+        """Mark the sorted column and direction in the list headings"""
+        tree = self.movie_tree if tab == "movie" else self.music_tree
+        sort = self.views[tab].sort
+        for position, column in enumerate(self.views[tab].columns):
+            arrow = ""
+            if sort is not None and sort[0] == position:
+                arrow = " \u25bc" if sort[1] else " \u25b2"
+            tree.heading(column.heading, text=column.heading + arrow)
+
+    def show_list(self, tab: str):
+        """
+        Show a list in its chosen sort order and filter
+
+        Search results and fully cached catalogs are sorted and filtered in
+        memory. Otherwise the server sorts, or, for columns it cannot sort
+        by, the rows already loaded are sorted.
+
+        Args:
+            tab: "movie" or "music"
+        """
+        view = self.views[tab]
+        pages, catalog, sort_sql = (
+            (self.movie_pages, self.movie_catalog, MOVIE_SORT_SQL)
+            if tab == "movie"
+            else (self.music_pages, self.music_catalog, MUSIC_SORT_SQL)
+        )
+        self.update_headings(tab)
+        self.worker.cancel(f"{tab}_sort")
+
+        results = self._results[tab]
+        if results is not None:
+            serial, rows = results
+            if not view.active:
+                pages.show_rows(rows)
+                return
+            index = view.index(("search", serial), lambda: rows)
+        elif not view.active:
+            pages.reload()
+            return
+        elif catalog.complete:
+            index = view.index(
+                ("catalog", catalog.generation), lambda: catalog.rows() or []
+            )
+        elif view.server_sortable:
+            sql, params = view.query(sort_sql, SORT_LIMIT)
+            self.worker.submit(
+                lambda conn: conn.execute(sql, params).fetchall(),
+                pages.show_rows,
+                self.show_error("Failed to sort the list", "Database Error"),
+                key=f"{tab}_sort",
+                label=f"{tab} sort",
+            )
+            return
+        else:
+            index = column_sort.SortIndex(
+                sorted(pages.index.rows.values(), key=lambda row: row[0])
+            )
+        pages.show_rows(view.apply(index, SORT_LIMIT))
 
     def show_add_movie_dialog(self):
         """Show dialog for adding a new movie"""
@@ -242,28 +772,35 @@ class MovieMusicStoreGUI:
         stock_entry.pack()
 
         def save():
-            try:
-                cursor = self.db.cursor()
-                cursor.execute(
+            values = (
+                title_entry.get(),
+                genre_entry.get(),
+                year_entry.get(),
+                rating_entry.get(),
+                runtime_entry.get(),
+                stock_entry.get(),
+            )
+
+            def insert(conn):
+                cursor = conn.execute(
                     """INSERT INTO Movie 
                        (title, genre, release_date, rating, runtime_minutes, stock_count) 
                        VALUES (%s, %s, %s, %s, %s, %s)""",
-                    (
-                        title_entry.get(),
-                        genre_entry.get(),
-                        year_entry.get(),
-                        rating_entry.get(),
-                        runtime_entry.get(),
-                        stock_entry.get(),
-                    ),
+                    values,
                 )
-                self.db.commit()
-                cursor.close()
-                self.refresh_movie_list()
+                movie_id = cursor.lastrowid
+                conn.commit()
+                return movie_id, self.movie_pages.pager.fetch_row(conn, movie_id)
+
+            def done(result):
+                self.movie_search_cache.invalidate()
+                self.movie_pages.patch(*result)
                 dialog.destroy()
                 messagebox.showinfo("Success", "Movie added successfully!")
-            except mysql.connector.Error as err:
-                messagebox.showerror("Error", f"Failed to add movie: {err}")
+
+            self.worker.submit(
+                insert, done, self.show_error("Failed to add movie"), cancellable=False
+            )
 
         ttk.Button(dialog, text="Save", command=save).pack(pady=10)
 
@@ -278,7 +815,7 @@ class MovieMusicStoreGUI:
         title_entry = ttk.Entry(dialog)
         title_entry.pack()
 
-        ttk.Label(dialog, text="Artist:").pack()
+        ttk.Label(dialog, text="Artists (comma separated):").pack()
         artist_entry = ttk.Entry(dialog)
         artist_entry.pack()
 
@@ -295,43 +832,32 @@ class MovieMusicStoreGUI:
         stock_entry.pack()
 
         def save():
-            try:
-                cursor = self.db.cursor()
-                cursor.execute(
-                    """INSERT INTO MusicAlbum (title, genre, release_date, stock_count) 
-                       VALUES (%s, %s, %s, %s)""",
-                    (
-                        title_entry.get(),
-                        genre_entry.get(),
-                        release_date_entry.get(),
-                        stock_entry.get(),
-                    ),
-                )
-                # Get the last inserted album_id
-                album_id = cursor.lastrowid
-
-                # Insert the artist
-                cursor.execute(
-                    """INSERT INTO Artist (artist_name, active_status) 
-                       VALUES (%s, 'ACTIVE')
-                       ON DUPLICATE KEY UPDATE artist_id=LAST_INSERT_ID(artist_id)""",
-                    (artist_entry.get(),),
-                )
-                artist_id = cursor.lastrowid
-
-                # Create the album-artist relationship
-                cursor.execute(
-                    """INSERT INTO Album_Artist (album_id, artist_id) 
-                       VALUES (%s, %s)""",
-                    (album_id, artist_id),
-                )
-                self.db.commit()
-                cursor.close()
-                self.refresh_music_list()
+            album = (
+                title_entry.get(),
+                genre_entry.get() or None,
+                release_date_entry.get() or None,
+                stock_entry.get() or None,
+            )
+            artist_names = split_names(artist_entry.get())
+
+            def insert(conn):
+                # One round trip for the album and all of its artists
+                try:
+                    album_id = add_album(conn, self.artist_cache, album, artist_names)
+                except mysql.connector.Error:
+                    self.artist_cache.invalidate()
+                    raise
+                return album_id, self.music_pages.pager.fetch_row(conn, album_id)
+
+            def done(result):
+                self.music_search_cache.invalidate()
+                self.music_pages.patch(*result)
                 dialog.destroy()
                 messagebox.showinfo("Success", "Music added successfully!")
-            except mysql.connector.Error as err:
-                messagebox.showerror("Error", f"Failed to add music: {err}")
+
+            self.worker.submit(
+                insert, done, self.show_error("Failed to add music"), cancellable=False
+            )
 
         ttk.Button(dialog, text="Save", command=save).pack(pady=10)
 
@@ -343,58 +869,59 @@ class MovieMusicStoreGUI:
             return
 
         # Get selected movie data
-        movie_id = self.movie_tree.item(selected[0])["values"][0]
+        movie_id = int(selected[0])
 
         dialog = tk.Toplevel(self.root)
         dialog.title("Edit Movie")
-        dialog.geometry("300x200")
+        dialog.geometry("300x300")
 
         # Get current values
-        current_values = self.movie_tree.item(selected[0])["values"]
+        current_values = self.movie_pages.index.rows[movie_id]
 
         # Create input fields with current values
-        ttk.Label(dialog, text="Title:").pack()
-        title_entry = ttk.Entry(dialog)
-        title_entry.insert(0, current_values[1])
-        title_entry.pack()
-
-        ttk.Label(dialog, text="Genre:").pack()
-        genre_entry = ttk.Entry(dialog)
-        genre_entry.insert(0, current_values[2])
-        genre_entry.pack()
-
-        ttk.Label(dialog, text="Release Year:").pack()
-        year_entry = ttk.Entry(dialog)
-        year_entry.insert(0, current_values[3])
-        year_entry.pack()
-
-        ttk.Label(dialog, text="Price:").pack()
-        price_entry = ttk.Entry(dialog)
-        price_entry.insert(0, current_values[4])
-        price_entry.pack()
+        entries = []
+        labels = (
+            "Title:",
+            "Genre:",
+            "Release Date (YYYY-MM-DD):",
+            "Rating:",
+            "Runtime (minutes):",
+            "Stock Count:",
+        )
+        for position, label in enumerate(labels, start=1):
+            ttk.Label(dialog, text=label).pack()
+            entry = ttk.Entry(dialog)
+            value = current_values[position]
+            entry.insert(0, "" if value is None else str(value))
+            entry.pack()
+            entries.append(entry)
 
         def save():
-            try:
-                cursor = self.db.cursor()
-                cursor.execute(
-                    """UPDATE Movies 
-                       SET title=%s, genre=%s, release_year=%s, price=%s 
+            values = tuple(entry.get() or None for entry in entries) + (movie_id,)
+
+            def update(conn):
+                conn.execute(
+                    """UPDATE Movie 
+                       SET title=%s, genre=%s, release_date=%s, rating=%s,
+                           runtime_minutes=%s, stock_count=%s 
                        WHERE movie_id=%s""",
-                    (
-                        title_entry.get(),
-                        genre_entry.get(),
-                        year_entry.get(),
-                        price_entry.get(),
-                        movie_id,
-                    ),
+                    values,
                 )
-                self.db.commit()
-                cursor.close()
-                self.refresh_movie_list()
+                conn.commit()
+                return movie_id, self.movie_pages.pager.fetch_row(conn, movie_id)
+
+            def done(result):
+                self.movie_search_cache.invalidate()
+                self.movie_pages.patch(*result)
                 dialog.destroy()
                 messagebox.showinfo("Success", "Movie updated successfully!")
-            except mysql.connector.Error as err:
-                messagebox.showerror("Error", f"Failed to update movie: {err}")
+
+            self.worker.submit(
+                update,
+                done,
+                self.show_error("Failed to update movie"),
+                cancellable=False,
+            )
 
         ttk.Button(dialog, text="Save", command=save).pack(pady=10)
 
@@ -406,168 +933,409 @@ class MovieMusicStoreGUI:
             return
 
         # Get selected music data
-        music_id = self.music_tree.item(selected[0])["values"][0]
+        music_id = int(selected[0])
 
         dialog = tk.Toplevel(self.root)
         dialog.title("Edit Music")
         dialog.geometry("300x250")
 
         # Get current values
-        current_values = self.music_tree.item(selected[0])["values"]
+        current_values = self.music_pages.index.rows[music_id]
 
         # Create input fields with current values
-        ttk.Label(dialog, text="Title:").pack()
-        title_entry = ttk.Entry(dialog)
-        title_entry.insert(0, current_values[1])
-        title_entry.pack()
-
-        ttk.Label(dialog, text="Artist:").pack()
-        artist_entry = ttk.Entry(dialog)
-        artist_entry.insert(0, current_values[2])
-        artist_entry.pack()
-
-        ttk.Label(dialog, text="Genre:").pack()
-        genre_entry = ttk.Entry(dialog)
-        genre_entry.insert(0, current_values[3])
-        genre_entry.pack()
-
-        ttk.Label(dialog, text="Release Year:").pack()
-        year_entry = ttk.Entry(dialog)
-        year_entry.insert(0, current_values[4])
-        year_entry.pack()
-
-        ttk.Label(dialog, text="Price:").pack()
-        price_entry = ttk.Entry(dialog)
-        price_entry.insert(0, current_values[5])
-        price_entry.pack()
+        entries = []
+        labels = (
+            "Title:",
+            "Artist(s), comma separated:",
+            "Genre:",
+            "Release Date (YYYY-MM-DD):",
+            "Stock Count:",
+        )
+        for position, label in enumerate(labels, start=1):
+            ttk.Label(dialog, text=label).pack()
+            entry = ttk.Entry(dialog)
+            value = current_values[position]
+            entry.insert(0, "" if value is None else str(value))
+            entry.pack()
+            entries.append(entry)
 
         def save():
-            try:
-                cursor = self.db.cursor()
-                cursor.execute(
-                    """UPDATE Music 
-                       SET title=%s, artist=%s, genre=%s, release_year=%s, price=%s 
-                       WHERE music_id=%s""",
-                    (
-                        title_entry.get(),
-                        artist_entry.get(),
-                        genre_entry.get(),
-                        year_entry.get(),
-                        price_entry.get(),
-                        music_id,
-                    ),
+            title, artists, genre, release_date, stock = (
+                entry.get() or None for entry in entries
+            )
+            artist_names = split_names(artists)
+            artists_changed = artists != current_values[2]
+
+            def update(conn):
+                conn.execute(
+                    """UPDATE MusicAlbum 
+                       SET title=%s, genre=%s, release_date=%s, stock_count=%s 
+                       WHERE album_id=%s""",
+                    (title, genre, release_date, stock, music_id),
                 )
-                self.db.commit()
-                cursor.close()
-                self.refresh_music_list()
+                if artists_changed:
+                    # Relink the album to the edited artist list
+                    conn.execute(
+                        "DELETE FROM Album_Artist WHERE album_id = %s", (music_id,)
+                    )
+                    try:
+                        link_artists(conn, self.artist_cache, music_id, artist_names)
+                    except mysql.connector.Error:
+                        self.artist_cache.invalidate()
+                        raise
+                conn.commit()
+                return music_id, self.music_pages.pager.fetch_row(conn, music_id)
+
+            def done(result):
+                self.music_search_cache.invalidate()
+                self.music_pages.patch(*result)
                 dialog.destroy()
                 messagebox.showinfo("Success", "Music updated successfully!")
-            except mysql.connector.Error as err:
-                messagebox.showerror("Error", f"Failed to update music: {err}")
+
+            self.worker.submit(
+                update,
+                done,
+                self.show_error("Failed to update music"),
+                cancellable=False,
+            )
 
         ttk.Button(dialog, text="Save", command=save).pack(pady=10)
 
     def delete_movie(self):
-        """Delete selected movie"""
+        """Delete the selected movies in one transaction"""
         selected = self.movie_tree.selection()
         if not selected:
             messagebox.showwarning("Warning", "Please select a movie to delete")
             return
 
+        count = len(selected)
         if messagebox.askyesno(
-            "Confirm Delete", "Are you sure you want to delete this movie?"
+            "Confirm Delete",
+            "Are you sure you want to delete this movie?"
+            if count == 1
+            else f"Are you sure you want to delete these {count} movies?",
         ):
-            try:
-                movie_id = self.movie_tree.item(selected[0])["values"][0]
-                cursor = self.db.cursor()
-                cursor.execute("DELETE FROM Movie WHERE movie_id = %s", (movie_id,))
-                self.db.commit()
-                cursor.close()
-                self.refresh_movie_list()
-                messagebox.showinfo("Success", "Movie deleted successfully!")
-            except mysql.connector.Error as err:
-                messagebox.showerror("Error", f"Failed to delete movie: {err}")
+            movie_ids = [int(item) for item in selected]
+
+            def delete(conn):
+                deleted = bulk_ops.delete_rows(conn, "Movie", "movie_id", movie_ids)
+                for movie_id in movie_ids:
+                    self.movie_catalog.patch(movie_id, None)
+                return deleted
+
+            def done(deleted):
+                self.movie_search_cache.invalidate()
+                for movie_id in movie_ids:
+                    self.movie_pages.patch(movie_id, None)
+                messagebox.showinfo("Success", f"{deleted} movie(s) deleted successfully!")
+
+            self.worker.submit(
+                delete,
+                done,
+                self.show_error("Failed to delete movie"),
+                cancellable=False,
+            )
 
     def delete_music(self):
-        """Delete selected music"""
+        """Delete the selected albums in one transaction"""
         selected = self.music_tree.selection()
         if not selected:
             messagebox.showwarning("Warning", "Please select a music item to delete")
             return
 
+        count = len(selected)
         if messagebox.askyesno(
-            "Confirm Delete", "Are you sure you want to delete this music?"
+            "Confirm Delete",
+            "Are you sure you want to delete this music?"
+            if count == 1
+            else f"Are you sure you want to delete these {count} albums?",
         ):
+            music_ids = [int(item) for item in selected]
+
+            def delete(conn):
+                # Album_Artist rows are removed by the cascade
+                deleted = bulk_ops.delete_rows(conn, "MusicAlbum", "album_id", music_ids)
+                for music_id in music_ids:
+                    self.music_catalog.patch(music_id, None)
+                return deleted
+
+            def done(deleted):
+                self.music_search_cache.invalidate()
+                for music_id in music_ids:
+                    self.music_pages.patch(music_id, None)
+                messagebox.showinfo("Success", f"{deleted} album(s) deleted successfully!")
+
+            self.worker.submit(
+                delete,
+                done,
+                self.show_error("Failed to delete music"),
+                cancellable=False,
+            )
+
+    def after_bulk_change(self, tab: str):
+        """
+        Show the result of a multi-row change with a single refresh
+
+        Args:
+            tab: "movie" or "music"
+        """
+        if tab == "movie":
+            self.movie_search_cache.invalidate()
+            if search.tokenize(self.movie_search_var.get()):
+                self.search_movies()
+            elif self.views["movie"].active:
+                self.show_list("movie")
+            else:
+                self.movie_pages.refresh()
+        else:
+            self.music_search_cache.invalidate()
+            if search.tokenize(self.music_search_var.get()):
+                self.search_music()
+            elif self.views["music"].active:
+                self.show_list("music")
+            else:
+                self.music_pages.refresh()
+
+    def show_adjust_stock_dialog(self, tab: str):
+        """
+        Add to (or take from) the stock of every selected row at once
+
+        Args:
+            tab: "movie" or "music"
+        """
+        tree, table, key_column, catalog = (
+            (self.movie_tree, "Movie", "movie_id", self.movie_catalog)
+            if tab == "movie"
+            else (self.music_tree, "MusicAlbum", "album_id", self.music_catalog)
+        )
+        selected = tree.selection()
+        if not selected:
+            messagebox.showwarning("Warning", "Please select the items to restock")
+            return
+        keys = [int(item) for item in selected]
+
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Adjust Stock")
+        dialog.geometry("300x120")
+
+        ttk.Label(
+            dialog, text=f"Add to stock of {len(keys)} selected item(s) (negative to remove):"
+        ).pack(pady=5)
+        delta_entry = ttk.Entry(dialog)
+        delta_entry.insert(0, "10")
+        delta_entry.pack()
+
+        def save():
             try:
-                music_id = self.music_tree.item(selected[0])["values"][0]
-                cursor = self.db.cursor()
-                # Delete from Album_Artist first (cascade will handle the rest)
-                cursor.execute(
-                    "DELETE FROM MusicAlbum WHERE album_id = %s", (music_id,)
-                )
-                self.db.commit()
-                cursor.close()
-                self.refresh_music_list()
-                messagebox.showinfo("Success", "Music deleted successfully!")
-            except mysql.connector.Error as err:
-                messagebox.showerror("Error", f"Failed to delete music: {err}")
+                delta = int(delta_entry.get())
+            except ValueError:
+                messagebox.showerror("Error", "Enter a whole number", parent=dialog)
+                return
+
+            def update(conn):
+                updated = bulk_ops.adjust_stock(conn, table, key_column, keys, delta)
+                catalog.reload_keys(conn, keys)
+                return updated
+
+            def done(updated):
+                dialog.destroy()
+                self.after_bulk_change(tab)
+                messagebox.showinfo("Success", f"Stock updated for {updated} item(s)")
+
+            self.worker.submit(
+                update, done, self.show_error("Failed to adjust stock"), cancellable=False
+            )
+
+        ttk.Button(dialog, text="Apply", command=save).pack(pady=10)
+
+    def show_paste_import_dialog(self, tab: str):
+        """
+        Import rows pasted from a spreadsheet, or restock by ID and quantity
+
+        Args:
+            tab: "movie" or "music"
+        """
+        if tab == "movie":
+            table, key_column, catalog = "Movie", "movie_id", self.movie_catalog
+            columns, import_rows = bulk_ops.MOVIE_COLUMNS, bulk_ops.import_movies
+        else:
+            table, key_column, catalog = "MusicAlbum", "album_id", self.music_catalog
+            columns = bulk_ops.MUSIC_COLUMNS
+
+            def import_rows(conn, rows):
+                return bulk_ops.import_music(conn, rows, self.artist_cache)
+
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Paste Import")
+        dialog.geometry("600x400")
+
+        mode = tk.StringVar(value="add")
+        ttk.Radiobutton(
+            dialog, text="Add new rows: " + ", ".join(columns), variable=mode, value="add"
+        ).pack(anchor="w", padx=10, pady=(10, 0))
+        ttk.Radiobutton(
+            dialog, text="Restock: ID, quantity", variable=mode, value="restock"
+        ).pack(anchor="w", padx=10)
+
+        ttk.Label(
+            dialog, text="Paste cells copied from a spreadsheet (or CSV lines) below:"
+        ).pack(anchor="w", padx=10, pady=(10, 0))
+        text = tk.Text(dialog, height=15)
+        text.pack(fill="both", expand=True, padx=10, pady=5)
+
+        def paste_clipboard():
+            try:
+                text.insert("end", self.root.clipboard_get())
+            except tk.TclError:
+                messagebox.showwarning("Warning", "The clipboard is empty", parent=dialog)
+
+        def save():
+            try:
+                if mode.get() == "add":
+                    rows = bulk_ops.parse_paste(text.get("1.0", "end"), columns)
+
+                    def run(conn):
+                        imported = import_rows(conn, rows)
+                        # New keys are only known to the change log
+                        catalog.sync(conn)
+                        return imported
+
+                    message = "{} row(s) imported"
+                else:
+                    rows = [
+                        (int(key), int(quantity))
+                        for key, quantity in bulk_ops.parse_paste(
+                            text.get("1.0", "end"), bulk_ops.RESTOCK_COLUMNS
+                        )
+                    ]
+
+                    def run(conn):
+                        updated = bulk_ops.restock(conn, table, key_column, rows)
+                        catalog.reload_keys(conn, sorted({key for key, _ in rows}))
+                        return updated
+
+                    message = "Stock updated for {} item(s)"
+            except (TypeError, ValueError) as err:
+                messagebox.showerror("Error", f"Could not read the pasted rows: {err}", parent=dialog)
+                return
+            if not rows:
+                messagebox.showwarning("Warning", "Nothing to import", parent=dialog)
+                return
+
+            def done(count):
+                dialog.destroy()
+                self.after_bulk_change(tab)
+                messagebox.showinfo("Success", message.format(count))
+
+            self.worker.submit(
+                run, done, self.show_error("Import failed, no rows were changed"), cancellable=False
+            )
+
+        buttons = ttk.Frame(dialog)
+        buttons.pack(fill="x", padx=10, pady=5)
+        ttk.Button(buttons, text="Paste from Clipboard", command=paste_clipboard).pack(side="left")
+        ttk.Button(buttons, text="Import", command=save).pack(side="right")
+
+    def show_results(self, tab: str, rows):
+        """Show search results, sorted and filtered like the list"""
+        self._results[tab] = (next(self._result_serial), rows)
+        self.show_list(tab)
 
     def search_movies(self):
-        """Search movies based on title"""
+        """Search movie titles; a newer search supersedes this one"""
+        timer = self._search_timers.pop("movie_search", None)
+        if timer is not None:
+            self.root.after_cancel(timer)
         search_term = self.movie_search_var.get()
-        try:
-            cursor = self.db.cursor()
-            cursor.execute(
-                "SELECT * FROM Movies WHERE title LIKE %s", (f"%{search_term}%",)
-            )
+        if not search.tokenize(search_term):
+            self.worker.cancel("movie_search")
+            self.refresh_movie_list()
+            return
 
-            # Clear existing items
-            for item in self.movie_tree.get_children():
-                self.movie_tree.delete(item)
+        # Served from the cache, or refined from a cached shorter term
+        cached = self.movie_search_cache.get(search_term)
+        if cached is not None:
+            self.worker.cancel("movie_search")
+            self.show_results("movie", cached)
+            return
 
-            # Insert matching data
-            for row in cursor.fetchall():
-                self.movie_tree.insert("", "end", values=row)
+        sql, params = search.movie_search(search_term)
+        generation = self.movie_search_cache.generation
 
-            cursor.close()
-        except mysql.connector.Error as err:
-            messagebox.showerror("Error", f"Failed to search movies: {err}")
+        def run_search(conn):
+            rows = self.movie_catalog.search(search_term, search.SEARCH_LIMIT)
+            return rows if rows is not None else conn.execute(sql, params).fetchall()
+
+        def done(rows):
+            complete = len(rows) < search.SEARCH_LIMIT
+            self.movie_search_cache.put(search_term, rows, complete, generation)
+            self.show_results("movie", rows)
+
+        # Show matching data, best matches first (search results are not paged)
+        self.worker.submit(
+            run_search,
+            done,
+            self.show_error("Failed to search movies"),
+            key="movie_search",
+        )
 
     def search_music(self):
-        """Search music based on title or artist"""
+        """Search album titles and artist names; a newer search supersedes this one"""
+        timer = self._search_timers.pop("music_search", None)
+        if timer is not None:
+            self.root.after_cancel(timer)
         search_term = self.music_search_var.get()
-        try:
-            cursor = self.db.cursor()
-            cursor.execute(
-                """
-                SELECT ma.album_id, ma.title, a.artist_name, ma.genre, ma.release_date, ma.stock_count 
-                FROM MusicAlbum ma 
-                LEFT JOIN Album_Artist aa ON ma.album_id = aa.album_id
-                LEFT JOIN Artist a ON aa.artist_id = a.artist_id
-                WHERE ma.title LIKE %s OR a.artist_name LIKE %s
-            """,
-                (f"%{search_term}%", f"%{search_term}%"),
-            )
+        if not search.tokenize(search_term):
+            self.worker.cancel("music_search")
+            self.refresh_music_list()
+            return
+
+        # Served from the cache, or refined from a cached shorter term
+        cached = self.music_search_cache.get(search_term)
+        if cached is not None:
+            self.worker.cancel("music_search")
+            self.show_results("music", cached)
+            return
+
+        sql, params = search.music_search(search_term)
+        generation = self.music_search_cache.generation
 
-            # Clear existing items
-            for item in self.music_tree.get_children():
-                self.music_tree.delete(item)
+        def run_search(conn):
+            rows = self.music_catalog.search(search_term, search.SEARCH_LIMIT)
+            return rows if rows is not None else conn.execute(sql, params).fetchall()
 
-            # Insert matching data
-            for row in cursor.fetchall():
-                self.music_tree.insert("", "end", values=row)
+        def done(rows):
+            complete = len(rows) < search.SEARCH_LIMIT
+            self.music_search_cache.put(search_term, rows, complete, generation)
+            self.show_results("music", rows)
 
-            cursor.close()
-        except mysql.connector.Error as err:
-            messagebox.showerror("Error", f"Failed to search music: {err}")
+        # Show matching data, best matches first (search results are not paged)
+        self.worker.submit(
+            run_search,
+            done,
+            self.show_error("Failed to search music"),
+            key="music_search",
+        )
 
     def run(self):
         """Start the application"""
         self.root.mainloop()
+        self.worker.shutdown()
+        db_pool.close_all()
 
 
 def main():
-    app = MovieMusicStoreGUI()
+    parser = argparse.ArgumentParser(description="Movie Music Store GUI")
+    parser.add_argument("--slow-ms", type=float, default=query_metrics.SLOW_QUERY_MS,
+                        help="Log statements at least this slow (milliseconds)")
+    parser.add_argument("--slow-log", default=query_metrics.SLOW_LOG_PATH,
+                        help="Slow-query log file ('-' for stderr)")
+    parser.add_argument("--measure-startup", action="store_true",
+                        help="Print the time to first paint and to first data, then exit")
+    args = parser.parse_args()
+    query_metrics.configure(args.slow_ms, args.slow_log)
+
+    app = MovieMusicStoreGUI(measure_startup=args.measure_startup)
     app.run()
 
 
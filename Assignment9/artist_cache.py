@@ -0,0 +1,149 @@
+"""
+Artist name to artist_id resolution
+
+Names are unique in Artist (uq_artist_name), so a name that was resolved
+once always maps to the same id. Known names are answered from memory;
+the rest are created if needed and looked up with one IN query.
+"""
+
+import threading
+
+import mysql.connector
+
+_NO_SUCH_PROCEDURE = 1305  # ER_SP_DOES_NOT_EXIST
+
+
+def split_names(text) -> list:
+    """Artist names from a comma separated list, without blanks or repeats"""
+    names = {}
+    for name in (text or "").split(","):
+        if name.strip():
+            names.setdefault(name.strip().lower(), name.strip())
+    return list(names.values())
+
+
+class ArtistCache:
+    """Case-insensitive map of artist names to ids, shared by worker threads"""
+
+    def __init__(self):
+        self._ids = {}  # lowercase name -> artist_id
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self):
+        """
+        Forget every name; call when a transaction that resolved names
+        failed, since artists it created were rolled back
+        """
+        with self._lock:
+            self._ids.clear()
+
+    def resolve(self, conn, names) -> dict:
+        """
+        Return the artist_id of every name, creating unknown artists
+
+        Args:
+            conn: Connection inside the caller's transaction
+            names: Artist names
+
+        Returns:
+            Mapping of lowercase name to artist_id
+        """
+        wanted = {name.strip().lower(): name.strip() for name in names if name.strip()}
+        with self._lock:
+            found = {key: self._ids[key] for key in wanted if key in self._ids}
+            self.hits += len(found)
+            self.misses += len(wanted) - len(found)
+        missing = [name for key, name in wanted.items() if key not in found]
+        if not missing:
+            return found
+
+        cursor = conn.cursor()
+        try:
+            resolved = self._lookup(cursor, missing)
+            new = [name for name in missing if name.lower() not in resolved]
+            if new:
+                # IGNORE: another session may create the same name meanwhile
+                cursor.executemany(
+                    "INSERT IGNORE INTO Artist (artist_name, active_status) VALUES (%s, 'ACTIVE')",
+                    [(name,) for name in new],
+                )
+                resolved.update(self._lookup(cursor, new))
+        finally:
+            cursor.close()
+
+        with self._lock:
+            self._ids.update(resolved)
+        found.update(resolved)
+        return found
+
+    @staticmethod
+    def _lookup(cursor, names) -> dict:
+        cursor.execute(
+            f"SELECT artist_name, MIN(artist_id) FROM Artist "
+            f"WHERE artist_name IN ({', '.join(['%s'] * len(names))}) GROUP BY artist_name",
+            names,
+        )
+        return {name.lower(): artist_id for name, artist_id in cursor.fetchall()}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"names": len(self._ids), "hits": self.hits, "misses": self.misses}
+
+
+def link_artists(conn, cache: ArtistCache, album_id: int, names) -> int:
+    """
+    Link an album to the named artists (resolved through cache)
+
+    Returns:
+        Number of links written
+    """
+    ids = cache.resolve(conn, names)
+    links = [(album_id, artist_id) for artist_id in sorted(set(ids.values()))]
+    if links:
+        cursor = conn.cursor()
+        try:
+            cursor.executemany(
+                "INSERT IGNORE INTO Album_Artist (album_id, artist_id) VALUES (%s, %s)", links
+            )
+        finally:
+            cursor.close()
+    return len(links)
+
+
+def add_album(conn, cache: ArtistCache, album, names) -> int:
+    """
+    Insert an album with its artists and commit
+
+    Uses the add_album stored procedure (Procedures.sql), which costs one
+    round trip whatever the number of artists. Databases without the
+    procedure fall back to a batched insert through the artist cache.
+
+    Args:
+        album: (title, genre, release_date, stock_count)
+        names: Artist names
+
+    Returns:
+        The new album_id
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.callproc("add_album", (*album, ", ".join(names)))
+        album_id = next(
+            row[0] for result in cursor.stored_results() for row in result.fetchall()
+        )
+    except mysql.connector.Error as err:
+        if err.errno != _NO_SUCH_PROCEDURE:
+            raise
+        cursor.execute(
+            """INSERT INTO MusicAlbum (title, genre, release_date, stock_count)
+               VALUES (%s, %s, %s, %s)""",
+            (*album[:3], album[3] or 0),
+        )
+        album_id = cursor.lastrowid
+        link_artists(conn, cache, album_id, names)
+    finally:
+        cursor.close()
+    conn.commit()
+    return album_id
@@ -0,0 +1,192 @@
+"""
+Multi-row catalog changes for the GUI
+
+Every operation runs as one transaction with multi-row statements or
+executemany, so acting on hundreds of selected rows costs a handful of
+round trips and a single commit instead of one dialog, commit and list
+refresh per row.
+"""
+
+import csv
+import io
+
+import mysql.connector
+
+from artist_cache import ArtistCache, split_names
+
+IN_CHUNK = 1000  # Keys per IN (...) list
+
+# Columns filled by a pasted row, in the order of the tab's list (minus ID)
+MOVIE_COLUMNS = ("title", "genre", "release_date", "rating", "runtime_minutes", "stock_count")
+MUSIC_COLUMNS = ("title", "artist", "genre", "release_date", "stock_count")
+RESTOCK_COLUMNS = ("id", "quantity")
+
+
+def _chunks(keys, size: int = IN_CHUNK):
+    keys = list(keys)
+    for start in range(0, len(keys), size):
+        yield keys[start : start + size]
+
+
+def _transaction(conn, fn):
+    """Run fn(cursor) and commit, rolling everything back if it fails"""
+    cursor = conn.cursor()
+    try:
+        result = fn(cursor)
+        conn.commit()
+        return result
+    except mysql.connector.Error:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def delete_rows(conn, table: str, key_column: str, keys) -> int:
+    """
+    Delete every row whose key is in keys
+
+    Returns:
+        Number of rows deleted
+    """
+
+    def run(cursor):
+        deleted = 0
+        for chunk in _chunks(keys):
+            cursor.execute(
+                f"DELETE FROM {table} WHERE {key_column} IN ({', '.join(['%s'] * len(chunk))})",
+                chunk,
+            )
+            deleted += cursor.rowcount
+        return deleted
+
+    return _transaction(conn, run)
+
+
+def adjust_stock(conn, table: str, key_column: str, keys, delta: int) -> int:
+    """
+    Add delta to stock_count of every row in keys (never below zero)
+
+    Returns:
+        Number of rows updated
+    """
+
+    def run(cursor):
+        updated = 0
+        for chunk in _chunks(keys):
+            cursor.execute(
+                f"""UPDATE {table}
+                    SET stock_count = GREATEST(0, stock_count + %s)
+                    WHERE {key_column} IN ({', '.join(['%s'] * len(chunk))})""",
+                [delta] + chunk,
+            )
+            updated += cursor.rowcount
+        return updated
+
+    return _transaction(conn, run)
+
+
+def restock(conn, table: str, key_column: str, quantities) -> int:
+    """
+    Add a per-row quantity to stock_count, e.g. from a delivery note
+
+    Args:
+        quantities: Iterable of (key, quantity)
+
+    Returns:
+        Number of rows updated
+    """
+
+    def run(cursor):
+        cursor.executemany(
+            f"""UPDATE {table}
+                SET stock_count = GREATEST(0, stock_count + %s)
+                WHERE {key_column} = %s""",
+            [(quantity, key) for key, quantity in quantities],
+        )
+        return cursor.rowcount
+
+    return _transaction(conn, run)
+
+
+def parse_paste(text: str, columns) -> list:
+    """
+    Parse rows copied from a spreadsheet (tab separated) or CSV text
+
+    A first row repeating the column names is skipped, empty cells become
+    None and missing trailing cells are padded.
+
+    Args:
+        text: Pasted text
+        columns: Expected column names
+
+    Returns:
+        List of tuples with one value per column
+
+    Raises:
+        ValueError: If a row has more cells than there are columns
+    """
+    delimiter = "\t" if "\t" in text else ","
+    rows = []
+    for number, record in enumerate(csv.reader(io.StringIO(text.strip()), delimiter=delimiter), 1):
+        cells = [cell.strip() for cell in record]
+        if not any(cells):
+            continue
+        if number == 1 and [cell.lower().replace(" ", "_") for cell in cells] == list(columns[: len(cells)]):
+            continue
+        if len(cells) > len(columns):
+            raise ValueError(f"Line {number} has {len(cells)} values, expected {len(columns)}")
+        cells += [""] * (len(columns) - len(cells))
+        rows.append(tuple(cell or None for cell in cells))
+    return rows
+
+
+def import_movies(conn, rows) -> int:
+    """Insert parsed MOVIE_COLUMNS rows with one executemany"""
+
+    def run(cursor):
+        cursor.executemany(
+            f"""INSERT INTO Movie ({', '.join(MOVIE_COLUMNS)})
+                VALUES ({', '.join(['%s'] * len(MOVIE_COLUMNS))})""",
+            # An empty stock cell means none in stock
+            [row[:-1] + (row[-1] or 0,) for row in rows],
+        )
+        return cursor.rowcount
+
+    return _transaction(conn, run)
+
+
+def import_music(conn, rows, artists: ArtistCache) -> int:
+    """
+    Insert parsed MUSIC_COLUMNS rows; the artist cell may list several
+    comma separated names, and unknown artists are created
+
+    Args:
+        artists: Cache resolving artist names to ids
+    """
+
+    def run(cursor):
+        names = {name for row in rows for name in split_names(row[1])}
+        ids = artists.resolve(conn, names)
+
+        links = []
+        for title, album_artists, genre, release_date, stock in rows:
+            # Album ids are needed for the links, so albums go in one by one
+            cursor.execute(
+                """INSERT INTO MusicAlbum (title, genre, release_date, stock_count)
+                   VALUES (%s, %s, %s, %s)""",
+                (title, genre, release_date, stock or 0),
+            )
+            album_id = cursor.lastrowid
+            links += [(album_id, ids[name.lower()]) for name in split_names(album_artists)]
+        if links:
+            cursor.executemany(
+                "INSERT IGNORE INTO Album_Artist (album_id, artist_id) VALUES (%s, %s)", links
+            )
+        return len(rows)
+
+    try:
+        return _transaction(conn, run)
+    except mysql.connector.Error:
+        artists.invalidate()
+        raise
@@ -0,0 +1,362 @@
+"""
+In-memory catalog of movie and album rows
+
+The catalog is loaded once at startup and then kept current in two ways:
+rows written by this GUI are patched in after each CRUD call, and writes
+by other clients are picked up by polling the CatalogChange log
+(CatalogChanges.sql) and re-reading only the logged rows. Change ids are
+taken in insert order but committed in any order, so each poll re-reads
+the ids within CHANGE_WINDOW of the newest one seen and applies those it
+has not seen yet. Paging,
+searching and sorting are answered from memory whenever the catalog holds
+the rows they need.
+
+Memory is bounded by a byte budget per table. When a table does not fit,
+only its lowest primary keys are kept (rows are evicted from the high end)
+and requests beyond that range fall through to the database.
+"""
+
+import sys
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import namedtuple
+
+import mysql.connector
+
+import search
+
+MEMORY_BUDGET = 64 * 1024 * 1024  # Bytes per cached table
+LOAD_CHUNK = 5000  # Rows per query while warming
+IN_CHUNK = 1000  # Keys per re-read of changed rows
+CHANGE_RETENTION_DAYS = 1  # Older change log entries are pruned at warm-up
+CHANGE_WINDOW = 1000  # Change ids re-read behind the newest seen (late commits)
+_NO_SUCH_TABLE = 1146
+
+# Row types with the same field order as the list queries (tuples, no __dict__)
+MovieRow = namedtuple(
+    "MovieRow", "movie_id title genre release_date rating runtime_minutes stock_count"
+)
+AlbumRow = namedtuple("AlbumRow", "album_id title artists genre release_date stock_count")
+
+
+def row_size(row) -> int:
+    """Approximate bytes held by a row object and its values"""
+    return sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+
+
+class CatalogCache:
+    """Rows of one catalog table, ordered by primary key"""
+
+    def __init__(
+        self,
+        table: str,
+        key_column: str,
+        row_type,
+        select_sql: str,
+        fields,
+        budget: int = MEMORY_BUDGET,
+    ):
+        """
+        Args:
+            table: Table name as logged in CatalogChange
+            key_column: Primary key column as referenced in select_sql
+            row_type: namedtuple class for the rows
+            select_sql: Query returning rows in key order, with a {where}
+                placeholder for the key filter and a {limit} placeholder
+            fields: Positions of the searchable text columns
+            budget: Maximum bytes of row data to keep
+        """
+        self.table = table
+        self.key_column = key_column
+        self.row_type = row_type
+        self.select_sql = select_sql
+        self.fields = fields
+        self.budget = budget
+
+        self._lock = threading.Lock()
+        self._rows = {}  # key -> row
+        self._keys = []  # sorted keys
+        self._bytes = 0
+        self.limit_key = None  # Every row with key <= limit_key is held; None = all rows
+        self.ready = False  # False until warmed, or when the change log is missing
+        self.last_change = 0  # Newest change id applied
+        self._seen = set()  # Applied change ids within CHANGE_WINDOW of last_change
+        self.synced_at = 0.0  # time.monotonic() of the last warm or sync
+        self.generation = 0  # Bumped whenever the held rows change
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.reloads = 0
+
+    # Loading -----------------------------------------------------------
+
+    def _select(self, conn, where: str = "", params=(), limit: str = "") -> list:
+        cursor = conn.cursor()
+        cursor.execute(self.select_sql.format(where=where, limit=limit), params)
+        rows = [self.row_type(*row) for row in cursor.fetchall()]
+        cursor.close()
+        return rows
+
+    def _max_change(self, conn) -> int:
+        cursor = conn.cursor()
+        cursor.execute("SELECT MAX(change_id) FROM CatalogChange")
+        (high,) = cursor.fetchone()
+        cursor.close()
+        return high or 0
+
+    def warm(self, conn) -> bool:
+        """
+        Load the table (or as much of it as the budget allows)
+
+        Returns:
+            True if the cache is usable; False when CatalogChange does not
+            exist, since other writers could then not be detected
+        """
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                "DELETE FROM CatalogChange WHERE changed_at < NOW() - INTERVAL %s DAY",
+                (CHANGE_RETENTION_DAYS,),
+            )
+            conn.commit()
+            cursor.close()
+            # Changes made while loading are replayed by the next sync
+            synced_at = time.monotonic()
+            last_change = self._max_change(conn)
+        except mysql.connector.Error as err:
+            if err.errno != _NO_SUCH_TABLE:
+                raise
+            with self._lock:
+                self.ready = False
+            return False
+
+        rows, size, after, limit_key = [], 0, 0, None
+        while True:
+            chunk = self._select(
+                conn, f"WHERE {self.key_column} > %s", (after,), f"LIMIT {LOAD_CHUNK}"
+            )
+            for row in chunk:
+                size += row_size(row)
+                if size > self.budget:
+                    limit_key = row[0] - 1
+                    break
+                rows.append(row)
+            if limit_key is not None or len(chunk) < LOAD_CHUNK:
+                break
+            after = chunk[-1][0]
+
+        with self._lock:
+            self._rows = {row[0]: row for row in rows}
+            self._keys = [row[0] for row in rows]
+            self._bytes = sum(row_size(row) for row in rows)
+            self.limit_key = limit_key
+            self.last_change = last_change
+            self._seen = set()
+            self.synced_at = synced_at
+            self.ready = True
+            self.reloads += 1
+            self.generation += 1
+        return True
+
+    def sync(self, conn) -> bool:
+        """
+        Re-read the rows changed since the last sync
+
+        Entries committed late with an id below the newest one seen are
+        still picked up while they are within CHANGE_WINDOW of it.
+
+        Returns:
+            True if any row of this table changed
+        """
+        if not self.ready:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            last, seen, synced_at = self.last_change, self._seen, self.synced_at
+        if now - synced_at > CHANGE_RETENTION_DAYS * 24 * 3600:
+            # Entries we have not read yet may have been pruned; start over
+            return self.warm(conn)
+
+        cursor = conn.cursor()
+        cursor.execute(
+            """SELECT change_id, row_id FROM CatalogChange
+               WHERE change_id > %s AND table_name = %s""",
+            (max(0, last - CHANGE_WINDOW), self.table),
+        )
+        changes = [
+            (change_id, key) for change_id, key in cursor.fetchall() if change_id not in seen
+        ]
+        cursor.close()
+
+        keys = sorted({key for _, key in changes})
+        self.reload_keys(conn, keys)
+        with self._lock:
+            self.last_change = max([self.last_change] + [change_id for change_id, _ in changes])
+            horizon = self.last_change - CHANGE_WINDOW
+            self._seen = {
+                change_id
+                for change_id in self._seen.union(change_id for change_id, _ in changes)
+                if change_id > horizon
+            }
+            self.synced_at = now
+        return bool(keys)
+
+    def reload_keys(self, conn, keys):
+        """Re-read the given keys from the database and patch them in"""
+        for start in range(0, len(keys), IN_CHUNK):
+            chunk = keys[start : start + IN_CHUNK]
+            rows = self._select(
+                conn,
+                f"WHERE {self.key_column} IN ({', '.join(['%s'] * len(chunk))})",
+                chunk,
+            )
+            found = {row[0]: row for row in rows}
+            for key in chunk:
+                self.patch(key, found.get(key))
+
+    # Updates -----------------------------------------------------------
+
+    def patch(self, key, row):
+        """
+        Store the current row for key (None if it was deleted)
+
+        Rows past the held key range are ignored; inserts that overflow the
+        budget evict rows from the high end of the range.
+        """
+        with self._lock:
+            if not self.ready:
+                return
+            old = self._rows.pop(key, None)
+            if old is not None:
+                self._bytes -= row_size(old)
+                self.generation += 1
+                if row is None:
+                    del self._keys[bisect_left(self._keys, key)]
+            if row is None:
+                return
+            if self.limit_key is not None and key > self.limit_key:
+                return
+            row = row if isinstance(row, self.row_type) else self.row_type(*row)
+            self._rows[key] = row
+            self._bytes += row_size(row)
+            self.generation += 1
+            if old is None:
+                insort(self._keys, key)
+            self._evict()
+
+    def _evict(self):
+        while self._bytes > self.budget and self._keys:
+            key = self._keys.pop()
+            self._bytes -= row_size(self._rows.pop(key))
+            self.limit_key = key - 1
+            self.evictions += 1
+
+    def clear(self):
+        """Drop every row; the cache is unused until warmed again"""
+        with self._lock:
+            self._rows.clear()
+            self._keys.clear()
+            self._bytes = 0
+            self.ready = False
+            self.generation += 1
+
+    # Reads -------------------------------------------------------------
+
+    @property
+    def complete(self) -> bool:
+        """True when every row of the table is held"""
+        return self.ready and self.limit_key is None
+
+    def _count(self, hit: bool):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def page_after(self, key, limit: int):
+        """
+        Up to limit rows with keys greater than key, or None if the held
+        range cannot answer
+        """
+        with self._lock:
+            if not self.ready:
+                self._count(False)
+                return None
+            start = bisect_right(self._keys, key)
+            keys = self._keys[start : start + limit]
+            if len(keys) < limit and self.limit_key is not None:
+                self._count(False)
+                return None
+            self._count(True)
+            return [self._rows[k] for k in keys]
+
+    def page_before(self, key, limit: int):
+        """Up to limit rows with keys below key, in key order, or None"""
+        with self._lock:
+            if not self.ready or (self.limit_key is not None and key - 1 > self.limit_key):
+                self._count(False)
+                return None
+            end = bisect_left(self._keys, key)
+            self._count(True)
+            return [self._rows[k] for k in self._keys[max(0, end - limit) : end]]
+
+    def search(self, term: str, limit: int):
+        """Rows matching term (see search.matches), or None if incomplete"""
+        with self._lock:
+            if not self.complete:
+                self._count(False)
+                return None
+            rows = [self._rows[k] for k in self._keys]
+            self._count(True)
+        fields = self.fields
+        return [
+            row for row in rows if search.matches(term, *(row[i] for i in fields))
+        ][:limit]
+
+    def rows(self):
+        """Every row in key order, or None if incomplete"""
+        with self._lock:
+            if not self.complete:
+                self._count(False)
+                return None
+            self._count(True)
+            return [self._rows[k] for k in self._keys]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "rows": len(self._keys),
+                "bytes": self._bytes,
+                "budget": self.budget,
+                "complete": self.complete,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "reloads": self.reloads,
+                "last_change": self.last_change,
+            }
+
+
+class CachedPager:
+    """KeysetPager front end that answers pages from a CatalogCache"""
+
+    def __init__(self, pager, cache: CatalogCache):
+        self.pager = pager
+        self.cache = cache
+        self.page_size = pager.page_size
+
+    def fetch_after(self, conn, key=0, limit=None) -> list:
+        rows = self.cache.page_after(key, limit or self.page_size)
+        return rows if rows is not None else self.pager.fetch_after(conn, key, limit)
+
+    def fetch_before(self, conn, key) -> list:
+        rows = self.cache.page_before(key, self.page_size)
+        return rows if rows is not None else self.pager.fetch_before(conn, key)
+
+    def fetch_row(self, conn, key):
+        """Re-read a row from the database (after a write) and patch it in"""
+        row = self.pager.fetch_row(conn, key)
+        self.cache.patch(key, row)
+        return row
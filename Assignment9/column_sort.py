@@ -0,0 +1,213 @@
+"""
+Sorting and filtering of the catalog lists by column
+
+Each column's sort keys are computed once from the typed values (numbers,
+dates, case-folded text) and every sorted order is kept until the rows
+change, so sorting the same rows again only reads a cached list. Lists
+whose rows are not all in memory are sorted and filtered by the server
+instead (ListView.query), through the column indexes from AddIndexes.sql.
+"""
+
+import datetime
+from collections import namedtuple
+from itertools import islice
+
+# Heading, SQL column (None if the server cannot sort by it cheaply)
+Column = namedtuple("Column", "heading sql")
+
+MOVIE_COLUMNS = (
+    Column("ID", "movie_id"),
+    Column("Title", "title"),
+    Column("Genre", "genre"),
+    Column("Release Date", "release_date"),
+    Column("Rating", "rating"),
+    Column("Runtime (min)", "runtime_minutes"),
+    Column("Stock", "stock_count"),
+)
+
+MUSIC_COLUMNS = (
+    Column("ID", "album_id"),
+    Column("Title", "title"),
+    Column("Artist", None),
+    Column("Genre", "genre"),
+    Column("Release Date", "release_date"),
+    Column("Stock", "stock_count"),
+)
+
+# Filter values; None means the condition is not used
+Filter = namedtuple(
+    "Filter",
+    "genre rating year_from year_to stock_min stock_max",
+    defaults=(None,) * 6,
+)
+
+
+def sort_key(value):
+    """
+    Key ordering values of one column like MySQL does: NULLs first, text
+    case-insensitively. Values of different types never compare directly.
+    """
+    if value is None:
+        return (0, 0)
+    if isinstance(value, str):
+        return (3, value.casefold())
+    if isinstance(value, datetime.date):
+        return (2, value)
+    return (1, value)
+
+
+class SortIndex:
+    """Rows in key order with their sort keys and sorted orders cached"""
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self._keys = {}  # column -> sort key of every row
+        self._orders = {}  # column -> rows in ascending order
+
+    def keys(self, column: int) -> list:
+        """Sort keys of one column, computed on first use"""
+        keys = self._keys.get(column)
+        if keys is None:
+            keys = self._keys[column] = [sort_key(row[column]) for row in self.rows]
+        return keys
+
+    def ordered(self, column: int, descending: bool = False) -> list:
+        """
+        Rows ordered by a column
+
+        The sort is stable, so equal values stay in key order. Descending
+        is the ascending order reversed (equal values newest first), which
+        is also what the server returns when it reads an index backwards.
+        """
+        rows = self._orders.get(column)
+        if rows is None:
+            keys = self.keys(column)
+            positions = sorted(range(len(self.rows)), key=keys.__getitem__)
+            rows = self._orders[column] = [self.rows[i] for i in positions]
+        return rows[::-1] if descending else rows
+
+
+class ListView:
+    """The sort order and filter chosen for one catalog list"""
+
+    def __init__(self, columns):
+        """
+        Args:
+            columns: Column of every position in the list's rows
+        """
+        self.columns = columns
+        self.sort = None  # (column, descending), None for key order
+        self.filter = Filter()
+        self._positions = {column.sql: i for i, column in enumerate(columns) if column.sql}
+        self._source = None
+        self._index = None
+
+    @property
+    def active(self) -> bool:
+        """True when the list is sorted or filtered"""
+        return self.sort is not None or any(value is not None for value in self.filter)
+
+    def toggle(self, column: int):
+        """Sort by column, reversing the order if already sorted by it"""
+        if column == 0:
+            self.sort = None
+        else:
+            self.sort = (column, self.sort == (column, False))
+
+    def index(self, source, load_rows) -> SortIndex:
+        """
+        SortIndex over the rows of source, rebuilt only when source changes
+
+        Args:
+            source: Hashable token identifying the rows and their version
+            load_rows: Called without arguments to get the rows if needed
+        """
+        if self._index is None or source != self._source:
+            self._index = SortIndex(load_rows())
+            self._source = source
+        return self._index
+
+    def _value(self, row, sql: str):
+        position = self._positions.get(sql)
+        return None if position is None else row[position]
+
+    def matches(self, row) -> bool:
+        """True if the row passes every condition of the filter"""
+        f = self.filter
+        if f.genre is not None and (self._value(row, "genre") or "").casefold() != f.genre.casefold():
+            return False
+        if f.rating is not None and (self._value(row, "rating") or "").casefold() != f.rating.casefold():
+            return False
+        if f.year_from is not None or f.year_to is not None:
+            released = self._value(row, "release_date")
+            if released is None:
+                return False
+            if f.year_from is not None and released.year < f.year_from:
+                return False
+            if f.year_to is not None and released.year > f.year_to:
+                return False
+        stock = self._value(row, "stock_count")
+        if f.stock_min is not None and (stock is None or stock < f.stock_min):
+            return False
+        if f.stock_max is not None and (stock is None or stock > f.stock_max):
+            return False
+        return True
+
+    def apply(self, index: SortIndex, limit: int) -> list:
+        """The first limit rows of index that pass the filter, in sort order"""
+        rows = index.ordered(*self.sort) if self.sort else index.rows
+        if not any(value is not None for value in self.filter):
+            return rows[:limit]
+        return list(islice(filter(self.matches, rows), limit))
+
+    @property
+    def server_sortable(self) -> bool:
+        """True if the server can produce this view"""
+        return self.sort is None or self.columns[self.sort[0]].sql is not None
+
+    def query(self, template: str, limit: int) -> tuple:
+        """
+        Fill a sort query template with the filter and sort order
+
+        Args:
+            template: SQL with {where} and {order} placeholders and a
+                trailing LIMIT %s
+            limit: Maximum number of rows
+
+        Returns:
+            (sql, params)
+        """
+        f = self.filter
+        conditions, params = [], []
+        if f.genre is not None:
+            conditions.append("genre = %s")
+            params.append(f.genre)
+        if f.rating is not None:
+            conditions.append("rating = %s")
+            params.append(f.rating)
+        # Date ranges rather than YEAR(release_date) so the index is usable
+        if f.year_from is not None:
+            conditions.append("release_date >= %s")
+            params.append(datetime.date(f.year_from, 1, 1))
+        if f.year_to is not None:
+            conditions.append("release_date < %s")
+            params.append(datetime.date(f.year_to + 1, 1, 1))
+        if f.stock_min is not None:
+            conditions.append("stock_count >= %s")
+            params.append(f.stock_min)
+        if f.stock_max is not None:
+            conditions.append("stock_count <= %s")
+            params.append(f.stock_max)
+
+        key = self.columns[0].sql
+        if self.sort is None:
+            order = key
+        else:
+            column, descending = self.sort
+            direction = " DESC" if descending else ""
+            # Secondary indexes end with the primary key, so this ORDER BY
+            # is read straight from the column's index
+            order = f"{self.columns[column].sql}{direction}, {key}{direction}"
+
+        where = "WHERE " + " AND ".join(conditions) if conditions else ""
+        return template.format(where=where, order=order), params + [limit]
@@ -0,0 +1,221 @@
+"""
+Background execution of database calls for the Tk GUI
+
+Jobs run on worker threads with a pooled connection; their results are
+handed back to the Tk main loop through a queue polled with root.after,
+so callbacks always run on the main thread.
+"""
+
+import itertools
+import queue
+import threading
+
+import mysql.connector
+
+import query_metrics
+
+WORKER_THREADS = 2
+POLL_MS = 25  # How often the main loop checks for finished jobs
+
+
+def job_label(fn) -> str:
+    """Name a job after its function, e.g. search_movies.run_search"""
+    name = getattr(fn, "__qualname__", type(fn).__name__)
+    parts = [part for part in name.split(".") if part != "<locals>"]
+    # Drop the class of a GUI method; the method names the screen
+    if len(parts) > 2 and parts[0][:1].isupper():
+        parts = parts[1:]
+    return ".".join(parts)
+
+
+class Job:
+    """A database call submitted to the worker"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, fn, on_success, on_error, key, cancellable, label=None, on_cancel=None):
+        self.id = next(self._ids)
+        self.fn = fn
+        self.label = label or job_label(fn)
+        self.on_success = on_success
+        self.on_error = on_error
+        self.on_cancel = on_cancel
+        self.key = key
+        self.cancellable = cancellable
+        self.cancelled = False
+        self.connection_id = None  # Server thread id while the job runs (QueryWorker._owner)
+
+
+class QueryWorker:
+    """Runs database calls off the Tk main loop"""
+
+    def __init__(self, root, pool, threads: int = WORKER_THREADS, on_status=None):
+        """
+        Args:
+            root: Tk root window whose event loop receives the results
+            pool: Connection pool the jobs run against
+            threads: Number of worker threads
+            on_status: Called with the number of in-flight jobs when it changes
+        """
+        self.root = root
+        self.pool = pool
+        self.on_status = on_status
+        self.threads = threads
+
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._lock = threading.Lock()
+        self._active = {}  # job id -> Job, submitted but not yet delivered
+        self._latest = {}  # key -> newest Job for that key
+        # Held while a job takes or gives up its connection and while a KILL
+        # is sent, so a KILL never reaches a connection another job now uses
+        self._owner = threading.Lock()
+        self._stopped = False
+
+        for _ in range(threads):
+            threading.Thread(target=self._run, daemon=True).start()
+        self.root.after(POLL_MS, self._poll)
+
+    @property
+    def in_flight(self) -> int:
+        """Number of jobs submitted but not yet delivered"""
+        with self._lock:
+            return len(self._active)
+
+    def submit(
+        self,
+        fn,
+        on_success=None,
+        on_error=None,
+        key=None,
+        cancellable=True,
+        label=None,
+        on_cancel=None,
+    ):
+        """
+        Queue a database call
+
+        Args:
+            fn: Callable taking a pooled connection; runs on a worker thread
+            on_success: Called on the main loop with fn's return value
+            on_error: Called on the main loop with the raised mysql error
+            key: Jobs sharing a key supersede each other; the older one is cancelled
+            cancellable: False for writes that must not be interrupted
+            label: Screen its statements are reported under in query_metrics
+                (by default the name of fn)
+            on_cancel: Called on the main loop if the job is cancelled, unless
+                a newer job with the same key replaced it
+
+        Returns:
+            The submitted Job
+        """
+        job = Job(fn, on_success, on_error, key, cancellable, label, on_cancel)
+        with self._lock:
+            previous = self._latest.get(key) if key is not None else None
+            if key is not None:
+                self._latest[key] = job
+            self._active[job.id] = job
+        if previous is not None and previous.cancellable:
+            self._cancel(previous)
+        self._jobs.put(job)
+        self._notify()
+        return job
+
+    def cancel(self, key):
+        """Cancel the newest job submitted with key"""
+        with self._lock:
+            job = self._latest.get(key)
+        if job is not None and job.cancellable:
+            self._cancel(job)
+
+    def cancel_all(self):
+        """Cancel every cancellable job that has not been delivered yet"""
+        with self._lock:
+            jobs = [job for job in self._active.values() if job.cancellable]
+        for job in jobs:
+            self._cancel(job)
+
+    def _cancel(self, job):
+        job.cancelled = True
+        if job.connection_id is not None:
+            # Abort the statement on the server so the connection frees up
+            threading.Thread(target=self._kill_query, args=(job,), daemon=True).start()
+
+    def _kill_query(self, job):
+        try:
+            with self.pool.get_connection() as conn:
+                with self._owner:
+                    # The job may have finished (and its connection gone to the
+                    # next job) while this connection was checked out
+                    if job.connection_id is None:
+                        return
+                    cursor = conn.cursor()
+                    cursor.execute(f"KILL QUERY {int(job.connection_id)}")
+                    cursor.close()
+        except mysql.connector.Error:
+            pass  # The query most likely finished in the meantime
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            if job.cancelled:
+                self._results.put((job, None, None))
+                continue
+            try:
+                with query_metrics.screen(job.label), self.pool.get_connection() as conn:
+                    with self._owner:
+                        job.connection_id = conn.connection_id
+                    try:
+                        result = job.fn(conn)
+                    finally:
+                        with self._owner:
+                            job.connection_id = None
+                self._results.put((job, result, None))
+            except Exception as err:  # Delivered to the main loop below
+                self._results.put((job, None, err))
+
+    def _poll(self):
+        delivered = False
+        while True:
+            try:
+                job, result, error = self._results.get_nowait()
+            except queue.Empty:
+                break
+            delivered = True
+            with self._lock:
+                self._active.pop(job.id, None)
+                latest = self._latest.get(job.key) is job
+                if latest:
+                    del self._latest[job.key]
+            if job.cancelled:
+                if job.on_cancel is not None and (latest or job.key is None):
+                    job.on_cancel()
+                continue
+            if error is not None:
+                if job.on_error is not None and isinstance(
+                    error, mysql.connector.Error
+                ):
+                    job.on_error(error)
+                else:
+                    self.root.report_callback_exception(
+                        type(error), error, error.__traceback__
+                    )
+            elif job.on_success is not None:
+                job.on_success(result)
+        if delivered:
+            self._notify()
+        if not self._stopped:
+            self.root.after(POLL_MS, self._poll)
+
+    def _notify(self):
+        if self.on_status is not None:
+            self.on_status(self.in_flight)
+
+    def shutdown(self):
+        """Stop polling and let the worker threads exit"""
+        self._stopped = True
+        self.cancel_all()
+        for _ in range(self.threads):
+            self._jobs.put(None)
@@ -0,0 +1,257 @@
+"""
+Keyset pagination and virtual scrolling for the catalog Treeviews
+
+Only a sliding window of rows is kept in the tree; pages are fetched on
+demand as the user scrolls towards either end of the window.
+"""
+
+import tkinter as tk
+from tkinter import ttk
+
+from catalog_queries import PAGE_SIZE
+from tree_sync import TreeIndex
+
+MAX_PAGES = 4  # Pages held in the tree (visible window plus prefetch margin)
+PREFETCH = 0.2  # Fetch the next page once the view is this close to an edge
+
+
+class KeysetPager:
+    """Fetches pages of rows ordered by an integer primary key"""
+
+    def __init__(self, after_sql: str, before_sql: str, page_size=PAGE_SIZE):
+        """
+        Args:
+            after_sql: Query taking (key, limit) returning rows with key > %s
+            before_sql: Query taking (key, limit) returning rows with key < %s
+            page_size: Number of rows per page
+
+        Both queries must return rows in ascending key order with the key
+        in the first column.
+        """
+        self.after_sql = after_sql
+        self.before_sql = before_sql
+        self.page_size = page_size
+
+    def _fetch(self, conn, sql, key, limit=None):
+        # Prepared once per connection and reused for every page
+        return conn.execute(sql, (key, limit or self.page_size)).fetchall()
+
+    def fetch_after(self, conn, key=0, limit=None) -> list:
+        """Return the page of rows following key (the first page for 0)"""
+        return self._fetch(conn, self.after_sql, key, limit)
+
+    def fetch_before(self, conn, key) -> list:
+        """Return the page of rows preceding key"""
+        return self._fetch(conn, self.before_sql, key)
+
+    def fetch_row(self, conn, key):
+        """Return the row for key, or None if it no longer exists"""
+        rows = self.fetch_after(conn, key - 1, 1)
+        return rows[0] if rows and rows[0][0] == key else None
+
+
+class PagedTree:
+    """Keeps a bounded window of pager rows in a Treeview while scrolling"""
+
+    def __init__(
+        self,
+        tree: ttk.Treeview,
+        scrollbar: ttk.Scrollbar,
+        pager: KeysetPager,
+        worker,
+        on_error=None,
+        max_pages: int = MAX_PAGES,
+        name: str = None,
+        on_load=None,
+    ):
+        """
+        Args:
+            tree: Treeview showing the rows
+            scrollbar: Vertical scrollbar attached to the tree
+            pager: Source of the pages
+            worker: QueryWorker that runs the page queries
+            on_error: Called with the mysql error if a page query fails
+            max_pages: Number of pages kept in the tree
+            name: Label of the page queries in query_metrics
+            on_load: Called with the rows whenever the first page is shown
+        """
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.pager = pager
+        self.worker = worker
+        self.on_error = on_error
+        self.on_load = on_load
+        self.max_rows = pager.page_size * max_pages
+        self.key = ("pages", str(tree))
+        self.label = f"{name or tree} pages"
+        self.index = TreeIndex(tree)
+
+        self.at_start = True
+        self.at_end = True
+        self.paging = False  # False while the tree shows a static result set
+        self._pending = False
+
+        tree.configure(yscrollcommand=self._on_scroll)
+        scrollbar.configure(command=tree.yview)
+
+    def _failed(self, err):
+        self._pending = False
+        if self.on_error is not None:
+            self.on_error(err)
+
+    def _cancelled(self):
+        # A cancelled page load delivers no rows; let scrolling fetch again
+        self._pending = False
+
+    def reload(self):
+        """Drop the current window and load the first page in the background"""
+        self._pending = True
+        self.worker.submit(
+            lambda conn: self.pager.fetch_after(conn, 0),
+            self._show_first,
+            self._failed,
+            key=self.key,
+            label=self.label,
+            on_cancel=self._cancelled,
+        )
+
+    def _show_first(self, rows):
+        self.index.replace(rows)
+        self.paging = True
+        self.at_start = True
+        self.at_end = len(rows) < self.pager.page_size
+        self.tree.yview_moveto(0)
+        self._pending = False
+        if self.on_load is not None:
+            self.on_load(rows)
+
+    def refresh(self):
+        """
+        Re-read the rows in the current window and apply only the differences,
+        keeping the scroll position and selection
+        """
+        first = self.index.first_key()
+        if not self.paging or first is None:
+            self.reload()
+            return
+
+        last = self.index.last_key()
+        limit = max(len(self.index), self.pager.page_size)
+        self._pending = True
+        self.worker.submit(
+            lambda conn: self.pager.fetch_after(conn, first - 1, limit),
+            lambda rows: self._apply_window(rows, last),
+            self._failed,
+            key=self.key,
+            label=self.label,
+            on_cancel=self._cancelled,
+        )
+
+    def _apply_window(self, rows, last):
+        self._pending = False
+        if not self.at_end:
+            # Rows past the old window belong to pages that are not loaded
+            rows = [row for row in rows if row[0] <= last]
+        self.index.replace(rows)
+
+    def patch(self, key, row):
+        """
+        Apply a single-row change without reloading
+
+        Args:
+            key: Primary key of the changed row
+            row: Current row values, or None if the row was deleted
+        """
+        if row is None:
+            self.index.remove(key)
+        elif key in self.index:
+            self.index.upsert(row)
+        elif self.paging:
+            # New rows are only shown if they fall inside the loaded window
+            first, last = self.index.first_key(), self.index.last_key()
+            after_start = self.at_start or first is None or key > first
+            before_end = self.at_end or last is None or key < last
+            if after_start and before_end:
+                self.index.upsert(row)
+
+    def show_rows(self, rows):
+        """Show a fixed result set (e.g. search results) without paging"""
+        # A page still in flight would otherwise land in the search results
+        self.worker.cancel(self.key)
+        self._pending = False
+        self.index.replace(rows)
+        self.paging = False
+        self.at_start = self.at_end = True
+        self.tree.yview_moveto(0)
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if not self.paging or self._pending or not len(self.index):
+            return
+        first, last = float(first), float(last)
+        if last >= 1.0 - PREFETCH and not self.at_end:
+            self._pending = True
+            after = self.index.last_key()
+            self.worker.submit(
+                lambda conn: self.pager.fetch_after(conn, after),
+                self._append,
+                self._failed,
+                key=self.key,
+                label=self.label,
+                on_cancel=self._cancelled,
+            )
+        elif first <= PREFETCH and not self.at_start:
+            self._pending = True
+            before = self.index.first_key()
+            self.worker.submit(
+                lambda conn: self.pager.fetch_before(conn, before),
+                self._prepend,
+                self._failed,
+                key=self.key,
+                label=self.label,
+                on_cancel=self._cancelled,
+            )
+
+    def _anchor(self):
+        """Topmost visible item, used to keep the view steady while trimming"""
+        return self.tree.identify_row(1) or None
+
+    def _restore(self, anchor):
+        if anchor and self.tree.exists(anchor):
+            children = self.tree.get_children()
+            self.tree.yview_moveto(children.index(anchor) / len(children))
+
+    def _append(self, rows):
+        self._pending = False
+        self.at_end = len(rows) < self.pager.page_size
+        if not rows:
+            return
+
+        anchor = self._anchor()
+        self.index.append(rows)
+        excess = len(self.index) - self.max_rows
+        if excess > 0:
+            self.index.trim_front(excess)
+            self.at_start = False
+        self._restore(anchor)
+
+    def _prepend(self, rows):
+        self._pending = False
+        self.at_start = len(rows) < self.pager.page_size
+        if not rows:
+            return
+
+        anchor = self._anchor()
+        self.index.prepend(rows)
+        excess = len(self.index) - self.max_rows
+        if excess > 0:
+            self.index.trim_back(excess)
+            self.at_end = False
+        self._restore(anchor)
+
+
+def add_scrollbar(parent: tk.Widget, tree: ttk.Treeview) -> ttk.Scrollbar:
+    """Pack a vertical scrollbar beside the tree"""
+    scrollbar = ttk.Scrollbar(parent, orient="vertical", command=tree.yview)
+    scrollbar.pack(side="right", fill="y")
+    return scrollbar
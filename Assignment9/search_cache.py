@@ -0,0 +1,89 @@
+"""
+LRU cache of search results with in-memory prefix refinement
+
+When a term extends a cached term (e.g. "matr" after "mat"), the cached
+rows are a superset of the answer, so they are filtered in memory instead
+of querying the database again.
+"""
+
+from collections import OrderedDict
+
+import search
+
+CACHE_SIZE = 64  # Number of search terms kept per tab
+
+
+class SearchCache:
+    """Search results keyed by normalized term, least recently used evicted"""
+
+    def __init__(self, fields, capacity: int = CACHE_SIZE):
+        """
+        Args:
+            fields: Column positions of the searchable text in each row
+            capacity: Maximum number of cached terms
+        """
+        self.fields = fields
+        self.capacity = capacity
+        self._entries = OrderedDict()  # key -> (rows, complete)
+        self.generation = 0  # Bumped on every invalidation
+        self.hits = 0
+        self.refinements = 0
+        self.misses = 0
+
+    def _store(self, key, rows, complete):
+        self._entries[key] = (rows, complete)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def get(self, term: str):
+        """
+        Cached rows for term, refined from a shorter cached term if possible
+
+        Returns:
+            List of rows, or None if the database has to be queried
+        """
+        key = search.cache_key(term)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+        # Longest cached prefix whose result set was not truncated
+        best = None
+        for cached, (rows, complete) in self._entries.items():
+            if complete and key.startswith(cached):
+                if best is None or len(cached) > len(best):
+                    best = cached
+        if best is None:
+            self.misses += 1
+            return None
+
+        rows = [
+            row
+            for row in self._entries[best][0]
+            if search.matches(term, *(row[i] for i in self.fields))
+        ]
+        self._store(key, rows, True)
+        self.refinements += 1
+        return rows
+
+    def put(self, term: str, rows, complete: bool, generation: int):
+        """
+        Cache the database result for term
+
+        Args:
+            term: Search term
+            rows: Rows returned by the search
+            complete: False if the result was cut off by the search limit
+            generation: Value of self.generation when the query was sent;
+                results of queries that raced with an invalidation are dropped
+        """
+        if generation == self.generation:
+            self._store(search.cache_key(term), list(rows), complete)
+
+    def invalidate(self):
+        """Forget every cached result (called after the catalog changes)"""
+        self._entries.clear()
+        self.generation += 1
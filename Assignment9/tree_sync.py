@@ -0,0 +1,152 @@
+"""
+Primary-key indexed Treeview updates
+
+Rows are keyed by their primary key (first column) so a refresh only
+touches the items that actually changed, and a single-row CRUD operation
+can be patched in place without reloading the list. Untouched items keep
+their position, selection and the current scroll offset.
+"""
+
+from bisect import bisect_left, insort
+
+from tkinter import ttk
+
+
+class TreeIndex:
+    """Maps primary keys to Treeview items and applies row-level diffs"""
+
+    def __init__(self, tree: ttk.Treeview):
+        self.tree = tree
+        self.items = {}  # primary key -> item id
+        self.rows = {}  # primary key -> values last written to the item
+        self._sorted = []  # shown primary keys in ascending order, for upsert
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, key):
+        return key in self.items
+
+    def keys(self) -> list:
+        """Primary keys in display order"""
+        return [int(item) for item in self.tree.get_children()]
+
+    def first_key(self):
+        children = self.tree.get_children()
+        return int(children[0]) if children else None
+
+    def last_key(self):
+        children = self.tree.get_children()
+        return int(children[-1]) if children else None
+
+    def clear(self):
+        """Remove every item"""
+        self.tree.delete(*self.tree.get_children())
+        self.items.clear()
+        self.rows.clear()
+        self._sorted.clear()
+
+    def _insert(self, index, row):
+        key = row[0]
+        item = self.tree.insert("", index, iid=str(key), values=row)
+        self.items[key] = item
+        self.rows[key] = tuple(row)
+        insort(self._sorted, key)
+
+    def _update(self, row):
+        key = row[0]
+        row = tuple(row)
+        if self.rows[key] != row:
+            self.tree.item(self.items[key], values=row)
+            self.rows[key] = row
+            return True
+        return False
+
+    def remove(self, key) -> bool:
+        """
+        Delete the item for key if it is shown
+
+        Returns:
+            True if an item was deleted
+        """
+        item = self.items.pop(key, None)
+        if item is None:
+            return False
+        self.rows.pop(key, None)
+        del self._sorted[bisect_left(self._sorted, key)]
+        if self.tree.exists(item):
+            self.tree.delete(item)
+        return True
+
+    def replace(self, rows) -> tuple:
+        """
+        Make the tree show exactly rows, in order, touching only what changed
+
+        Args:
+            rows: New rows with the primary key in the first column
+
+        Returns:
+            (inserted, updated, deleted) item counts
+        """
+        wanted = {row[0] for row in rows}
+        stale = [key for key in self.items if key not in wanted]
+        for key in stale:
+            self.remove(key)
+
+        inserted = updated = 0
+        for index, row in enumerate(rows):
+            key = row[0]
+            if key in self.items:
+                updated += self._update(row)
+                if self.tree.index(self.items[key]) != index:
+                    self.tree.move(self.items[key], "", index)
+            else:
+                self._insert(index, row)
+                inserted += 1
+        return inserted, updated, len(stale)
+
+    def append(self, rows):
+        """Add rows after the last item"""
+        for row in rows:
+            if row[0] in self.items:
+                self._update(row)
+            else:
+                self._insert("end", row)
+
+    def prepend(self, rows):
+        """Add rows, in order, before the first item"""
+        for index, row in enumerate(rows):
+            if row[0] in self.items:
+                self._update(row)
+            else:
+                self._insert(index, row)
+
+    def trim_front(self, count: int):
+        """Drop the first count items"""
+        for item in self.tree.get_children()[:count]:
+            self.remove(int(item))
+
+    def trim_back(self, count: int):
+        """Drop the last count items"""
+        if count > 0:
+            for item in self.tree.get_children()[-count:]:
+                self.remove(int(item))
+
+    def upsert(self, row, keep_sorted: bool = True) -> bool:
+        """
+        Update the item for row in place, or insert it at its key position
+
+        Args:
+            row: Row with the primary key in the first column
+            keep_sorted: Insert new rows in primary key order (else append)
+
+        Returns:
+            True if the tree changed
+        """
+        if row[0] in self.items:
+            return self._update(row)
+        # The position among the shown keys is the display position while
+        # the tree is in key order, without reading its children back
+        index = bisect_left(self._sorted, row[0]) if keep_sorted else "end"
+        self._insert(index, row)
+        return True
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# The assignments are script directories that import their modules by name
+ROOT = Path(__file__).resolve().parent.parent
+for directory in ("Assignment", "Assignment9"):
+    sys.path.insert(0, str(ROOT / directory))
@@ -0,0 +1,38 @@
+import datetime
+
+import pytest
+
+import archive
+
+
+@pytest.mark.parametrize(
+    "day, start, name",
+    [
+        (datetime.date(2024, 1, 1), datetime.date(2024, 1, 1), "p2024q1"),
+        (datetime.date(2024, 3, 31), datetime.date(2024, 1, 1), "p2024q1"),
+        (datetime.date(2024, 8, 15), datetime.date(2024, 7, 1), "p2024q3"),
+        (datetime.date(2024, 12, 31), datetime.date(2024, 10, 1), "p2024q4"),
+    ],
+)
+def test_quarter_start_and_partition_name(day, start, name):
+    assert archive.quarter_start(day) == start
+    assert archive.partition_name(day) == name
+
+
+def test_next_quarter_wraps_into_the_next_year():
+    assert archive.next_quarter(datetime.date(2024, 5, 20)) == datetime.date(2024, 7, 1)
+    assert archive.next_quarter(datetime.date(2024, 11, 2)) == datetime.date(2025, 1, 1)
+
+
+@pytest.mark.parametrize(
+    "day, months, expected",
+    [
+        (datetime.date(2024, 6, 15), 0, datetime.date(2024, 6, 1)),
+        (datetime.date(2024, 6, 15), 5, datetime.date(2024, 1, 1)),
+        (datetime.date(2024, 6, 15), 6, datetime.date(2023, 12, 1)),
+        (datetime.date(2024, 1, 31), 12, datetime.date(2023, 1, 1)),
+        (datetime.date(2024, 3, 1), 27, datetime.date(2021, 12, 1)),
+    ],
+)
+def test_months_ago(day, months, expected):
+    assert archive.months_ago(day, months) == expected
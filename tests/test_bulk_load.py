@@ -0,0 +1,60 @@
+import bulk_load
+
+
+def statements(text):
+    return list(bulk_load.iter_statements(text.splitlines(True)))
+
+
+def test_iter_statements_ignores_delimiters_in_strings_and_comments():
+    text = (
+        "INSERT INTO Movie (title) VALUES ('a;b'), (\"it\\'s; fine\"), ('O''Brien;');\n"
+        "-- a comment; not a statement\n"
+        "# another; comment\n"
+        "/* block; comment */ SELECT 1;\n"
+        "SELECT `odd;name` FROM t"
+    )
+    assert [" ".join(s.split()) for s in statements(text)] == [
+        "INSERT INTO Movie (title) VALUES ('a;b'), (\"it\\'s; fine\"), ('O''Brien;')",
+        "/* block; comment */ SELECT 1",
+        "SELECT `odd;name` FROM t",
+    ]
+
+
+def test_iter_statements_follows_delimiter_directives():
+    text = (
+        "DELIMITER //\n"
+        "CREATE PROCEDURE p()\nBEGIN\n  SELECT 1;\n  SELECT 2;\nEND //\n"
+        "DELIMITER ;\n"
+        "CALL p();\n"
+    )
+    assert statements(text) == [
+        "CREATE PROCEDURE p()\nBEGIN\n  SELECT 1;\n  SELECT 2;\nEND",
+        "CALL p()",
+    ]
+
+
+def test_merge_inserts_batches_runs_of_the_same_table_and_columns():
+    source = [
+        "INSERT INTO Movie (title) VALUES ('a')",
+        "insert into Movie  (title) values ('b'), ('c')",
+        "INSERT INTO Actor (name) VALUES ('x')",
+        "UPDATE Movie SET title = 'z'",
+        "INSERT INTO Actor (name) VALUES ('y')",
+    ]
+    assert list(bulk_load.merge_inserts(source)) == [
+        ("INSERT INTO Movie (title) VALUES ('a'), ('b'), ('c')", source[:2]),
+        ("INSERT INTO Actor (name) VALUES ('x')", source[2:3]),
+        (source[3], source[3:4]),
+        ("INSERT INTO Actor (name) VALUES ('y')", source[4:]),
+    ]
+
+
+def test_merge_inserts_respects_the_size_limit_and_upserts():
+    source = [f"INSERT INTO t (v) VALUES ({i})" for i in range(4)]
+    upsert = "INSERT INTO t (v) VALUES (9) ON DUPLICATE KEY UPDATE v = 9"
+    merged = list(bulk_load.merge_inserts(source + [upsert], max_bytes=6))
+    assert [statement for statement, _ in merged] == [
+        "INSERT INTO t (v) VALUES (0), (1)",
+        "INSERT INTO t (v) VALUES (2), (3)",
+        upsert,
+    ]
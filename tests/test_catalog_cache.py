@@ -0,0 +1,79 @@
+from collections import namedtuple
+
+from catalog_cache import CatalogCache
+
+Row = namedtuple("Row", "item_id title")
+
+
+class FakeCatalog:
+    """Connection and cursor over an in-memory table and change log"""
+
+    def __init__(self, rows):
+        self.rows = dict(rows)  # key -> title
+        self.changes = []  # committed (change_id, table_name, row_id)
+
+    def cursor(self):
+        return self
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+    def execute(self, sql, params=()):
+        if sql.startswith("DELETE"):
+            self.result = []
+        elif "MAX(change_id)" in sql:
+            self.result = [(max((change[0] for change in self.changes), default=None),)]
+        elif "FROM CatalogChange" in sql:
+            after, table = params
+            self.result = [
+                (cid, key) for cid, name, key in self.changes if cid > after and name == table
+            ]
+        elif " IN (" in sql:
+            self.result = [(key, self.rows[key]) for key in params if key in self.rows]
+        else:
+            (after,) = params
+            self.result = sorted((key, title) for key, title in self.rows.items() if key > after)
+
+    def fetchone(self):
+        return self.result[0]
+
+    def fetchall(self):
+        return self.result
+
+    def write(self, change_id, key, title):
+        self.rows[key] = title
+        self.changes.append((change_id, "Item", key))
+
+
+def make_cache(conn):
+    cache = CatalogCache("Item", "item_id", Row, "SELECT {where} {limit}", (1,))
+    assert cache.warm(conn)
+    return cache
+
+
+def test_sync_applies_a_change_committed_below_the_newest_id():
+    conn = FakeCatalog({1: "a", 2: "b"})
+    cache = make_cache(conn)
+
+    conn.write(11, 2, "b2")  # Id 10 went to a transaction still open
+    assert cache.sync(conn)
+    conn.write(10, 1, "a2")  # ...which commits after the sync
+    assert cache.sync(conn)
+
+    assert cache.rows() == [Row(1, "a2"), Row(2, "b2")]
+    assert not cache.sync(conn)
+
+
+def test_sync_does_not_rewarm_over_id_gaps():
+    conn = FakeCatalog({1: "a"})
+    cache = make_cache(conn)
+    conn.write(1, 1, "a1")
+    cache.sync(conn)
+
+    conn.write(5, 1, "a5")  # Ids 2-4 were rolled back
+    assert cache.sync(conn)
+    assert cache.reloads == 1
+    assert cache.rows() == [Row(1, "a5")]
@@ -0,0 +1,27 @@
+import re
+from pathlib import Path
+
+import bulk_load
+import reports
+from Assignment6 import VIEWS
+
+ASSIGNMENT = Path(__file__).resolve().parent.parent / "Assignment"
+HISTORY = re.compile(r"\b(OrderHistory|OrderItemHistory|PaymentHistory|\w+Archive)\b")
+ORDER_TABLES = re.compile(r"`Order`|\bOrderItem\b|\bPayment\b")
+
+
+def test_routine_views_and_queries_read_live_orders_only():
+    # Scanning the archive is left to the explicit all-history reports
+    with open(ASSIGNMENT / "QueryTables.sql") as file:
+        statements = list(bulk_load.iter_statements(file))
+    for sql in [*VIEWS.values(), *statements]:
+        assert not HISTORY.search(sql), sql
+
+
+def test_order_reports_read_history_within_an_order_date_range():
+    for name, report in reports.REPORTS.items():
+        if not (HISTORY.search(report.original) or ORDER_TABLES.search(report.original)):
+            continue
+        assert not ORDER_TABLES.search(report.original + report.sql), name
+        assert "order_date >= %(start)s AND order_date < %(end)s" in report.sql, name
+        assert report.params.keys() >= reports.ALL_HISTORY.keys(), name
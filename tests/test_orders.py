@@ -0,0 +1,89 @@
+import pytest
+
+import orders
+from orders import CartItem, OutOfStock
+
+
+class FakeStock:
+    """Connection and cursor over an in-memory {(table, id): stock_count}"""
+
+    def __init__(self, stock):
+        self.stock = stock
+        self.committed = dict(stock)
+        self.orders = []
+        self.rowcount = 0
+        self.lastrowid = None
+
+    def cursor(self):
+        return self
+
+    def commit(self):
+        self.committed = dict(self.stock)
+
+    def rollback(self):
+        self.stock = dict(self.committed)
+
+    def close(self):
+        pass
+
+    def execute(self, sql, params=()):
+        if sql.startswith("SAVEPOINT"):
+            self.savepoint = dict(self.stock)
+        elif sql.startswith("ROLLBACK TO SAVEPOINT"):
+            self.stock = dict(self.savepoint)
+        elif sql.startswith("SELECT"):
+            table = sql.split(" FROM ")[1].split()[0]
+            self.rows = [
+                (key, self.stock[table, key]) for key in params if (table, key) in self.stock
+            ]
+        elif "INTO `Order`" in sql:
+            self.orders.append(params)
+            self.lastrowid = len(self.orders)
+
+    def executemany(self, sql, rows):
+        if sql.startswith("UPDATE"):
+            table = sql.split()[1]
+            self.rowcount = 0
+            for quantity, key, _ in rows:
+                if self.stock.get((table, key), 0) >= quantity:
+                    self.stock[table, key] -= quantity
+                    self.rowcount += 1
+
+    def fetchall(self):
+        return self.rows
+
+
+def test_merge_cart_combines_and_sorts():
+    cart = orders.merge_cart(
+        [("MOVIE", 2, 1, "9.99"), ("ALBUM", 1, 1, 5), ("MOVIE", 2, 2, "9.99")]
+    )
+    assert [(item.product_type, item.product_id, item.quantity) for item in cart] == [
+        ("ALBUM", 1, 1),
+        ("MOVIE", 2, 3),
+    ]
+
+
+def test_place_order_takes_stock():
+    conn = FakeStock({("Movie", 1): 3, ("MusicAlbum", 7): 2})
+    cart = [CartItem("MOVIE", 1, 3, "9.99"), CartItem("ALBUM", 7, 1, "5.00")]
+
+    assert orders.place_order(conn, 1, cart) == 1
+    assert conn.committed == {("Movie", 1): 0, ("MusicAlbum", 7): 1}
+
+
+def test_out_of_stock_reports_only_the_short_items_of_a_mixed_cart():
+    # The movies are reserved before the album turns out to be short; they
+    # must not be reported with the stock the cart itself just took
+    conn = FakeStock({("Movie", 1): 3, ("Movie", 2): 5, ("MusicAlbum", 7): 1})
+    cart = [
+        CartItem("MOVIE", 1, 3, "9.99"),
+        CartItem("MOVIE", 2, 1, "9.99"),
+        CartItem("ALBUM", 7, 2, "5.00"),
+    ]
+
+    with pytest.raises(OutOfStock) as error:
+        orders.place_order(conn, 1, cart)
+
+    assert error.value.missing == [("ALBUM", 7, 2, 1)]
+    assert conn.stock == {("Movie", 1): 3, ("Movie", 2): 5, ("MusicAlbum", 7): 1}
+    assert conn.orders == []
@@ -0,0 +1,65 @@
+import pytest
+
+import db_pool
+import query_metrics
+
+
+class FakeConnection:
+    unread_result = False
+
+
+class FakePreparedCursor:
+    """Unbuffered cursor that reads one row ahead, like the prepared cursor"""
+
+    with_rows = True
+    rowcount = -1
+
+    def __init__(self, connection, rows):
+        self.connection = connection
+        self.rows = list(rows)
+        connection.unread_result = True
+
+    def fetchone(self):
+        row = self.rows.pop(0) if self.rows else None
+        self.connection.unread_result = bool(self.rows)
+        return row
+
+
+class FakePool:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute(self, conn, sql, params):
+        return FakePreparedCursor(conn, self.rows)
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    query_metrics.reset()
+    yield
+    query_metrics.reset()
+
+
+def recorded():
+    statements = query_metrics.snapshot()["statements"]
+    return {s["fingerprint"]: (s["count"], s["rows"]) for s in statements}
+
+
+def test_single_row_prepared_lookup_is_recorded_after_one_fetchone():
+    conn = db_pool.PooledConnection(FakePool([(1, "Alien")]), FakeConnection())
+
+    cursor = conn.execute("SELECT movie_id, title FROM Movie WHERE movie_id = %s", (1,))
+    assert cursor.fetchone() == (1, "Alien")
+
+    assert list(recorded().values()) == [(1, 1)]
+
+
+def test_prepared_result_is_recorded_once_with_every_row():
+    conn = db_pool.PooledConnection(FakePool([(1,), (2,), (3,)]), FakeConnection())
+
+    cursor = conn.execute("SELECT movie_id FROM Movie WHERE genre = %s", ("Drama",))
+    assert cursor.fetchone() == (1,)
+    assert recorded() == {}
+    assert [row for row in cursor] == [(2,), (3,)]
+
+    assert list(recorded().values()) == [(1, 3)]
@@ -0,0 +1,39 @@
+from search_cache import SearchCache
+
+ROWS = [(1, "The Matrix"), (2, "Matilda"), (3, "Mad Max"), (4, "Heat")]
+
+
+def test_longer_term_is_refined_from_a_complete_cached_prefix():
+    cache = SearchCache(fields=(1,))
+    assert cache.get("ma") is None
+    cache.put("ma", ROWS[:3], complete=True, generation=cache.generation)
+
+    assert cache.get("matr") == [(1, "The Matrix")]
+    assert (cache.hits, cache.refinements, cache.misses) == (0, 1, 1)
+    # The refined result is cached under its own key
+    assert cache.get("matr") == [(1, "The Matrix")]
+    assert cache.hits == 1
+
+
+def test_truncated_results_are_not_refined():
+    cache = SearchCache(fields=(1,))
+    cache.put("ma", ROWS[:1], complete=False, generation=cache.generation)
+    assert cache.get("mad") is None
+
+
+def test_results_racing_an_invalidation_are_dropped():
+    cache = SearchCache(fields=(1,))
+    generation = cache.generation
+    cache.invalidate()
+    cache.put("ma", ROWS[:3], complete=True, generation=generation)
+    assert cache.get("ma") is None
+
+
+def test_least_recently_used_term_is_evicted():
+    cache = SearchCache(fields=(1,), capacity=2)
+    for term in ("heat", "mad"):
+        cache.put(term, [], complete=True, generation=cache.generation)
+    cache.get("heat")
+    cache.put("matilda", [], complete=True, generation=cache.generation)
+    assert cache.get("mad") is None
+    assert cache.get("heat") == []
@@ -0,0 +1,68 @@
+from tree_sync import TreeIndex
+
+
+class FakeTree:
+    """The part of ttk.Treeview that TreeIndex uses, over a list of iids"""
+
+    def __init__(self):
+        self.children = []
+        self.values = {}
+
+    def get_children(self):
+        return tuple(self.children)
+
+    def insert(self, parent, index, iid, values):
+        self.children.insert(len(self.children) if index == "end" else index, iid)
+        self.values[iid] = tuple(values)
+        return iid
+
+    def item(self, iid, values):
+        self.values[iid] = tuple(values)
+
+    def exists(self, iid):
+        return iid in self.values
+
+    def delete(self, *iids):
+        for iid in iids:
+            self.children.remove(iid)
+            del self.values[iid]
+
+    def index(self, iid):
+        return self.children.index(iid)
+
+    def move(self, iid, parent, index):
+        self.children.remove(iid)
+        self.children.insert(index, iid)
+
+
+def test_upsert_inserts_new_keys_in_key_order():
+    index = TreeIndex(FakeTree())
+    index.replace([(2, "b"), (5, "e")])
+
+    for row in [(4, "d"), (1, "a"), (9, "i"), (3, "c")]:
+        assert index.upsert(row)
+
+    assert index.keys() == [1, 2, 3, 4, 5, 9]
+
+
+def test_upsert_updates_in_place_and_follows_removals():
+    tree = FakeTree()
+    index = TreeIndex(tree)
+    index.append([(1, "a"), (2, "b"), (3, "c")])
+
+    assert not index.upsert((2, "b"))
+    assert index.upsert((2, "B"))
+    assert tree.values["2"] == (2, "B")
+
+    index.remove(2)
+    index.trim_front(1)
+    index.upsert((2, "b"))
+    index.upsert((0, "z"))
+    assert index.keys() == [0, 2, 3]
+
+
+def test_upsert_appends_when_not_kept_sorted():
+    index = TreeIndex(FakeTree())
+    index.append([(5, "e")])
+    index.upsert((1, "a"), keep_sorted=False)
+    assert index.keys() == [5, 1]